@@ -0,0 +1,386 @@
+# benchmark.py
+#
+# Mede o desempenho de TODAS as funções de acesso a dados do projeto:
+# - example1.py (psycopg, conexão única)
+# - example2.py (psycopg, pool de conexões)
+# - orm.py      (SQLAlchemy)
+#
+# Para cada função mede várias execuções e calcula vazão (operações/s) e
+# latência (p50, p95, p99). O resultado é salvo em JSON para comparar com
+# execuções anteriores e apontar regressões.
+#
+# Uso (dentro da pasta connect_operations):
+#   python benchmark.py --recriar                # cria o banco de teste a partir do init.sql
+#   python benchmark.py --saida atual.json --comparar anterior.json
+#
+# ATENÇÃO: os testes de escrita alteram o banco (e desfazem as alterações no
+# final de cada repetição). Por isso o padrão é um banco SEPARADO
+# ('faculdatabase_bench'), e não o 'faculdatabase' do dia a dia.
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import psycopg
+from psycopg_pool import ConnectionPool
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import example1
+import example2
+import orm
+from conexao import DB_PARAMS, db_url
+
+BANCO_PADRAO = "faculdatabase_bench"
+ARQUIVO_INIT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "facul-database", "init", "init.sql"
+)
+
+# Lista de casos de teste, preenchida pelo decorador '@caso'
+CASOS = []
+
+
+def caso(nome, camada, tipo):
+    """
+    Registra uma função de benchmark.
+    - camada: 'psycopg' ou 'orm' (para comparar lado a lado)
+    - tipo: 'leitura' ou 'escrita'
+    """
+    def registrar(funcao):
+        CASOS.append({"nome": nome, "camada": camada, "tipo": tipo, "funcao": funcao})
+        return funcao
+    return registrar
+
+
+# 1. PREPARAÇÃO DO BANCO DE TESTE
+def recriar_banco(dbname):
+    """
+    Apaga e recria 'dbname' e carrega o init.sql (o mesmo do Docker).
+    Assim todas as execuções partem exatamente dos mesmos dados.
+    """
+    if dbname == DB_PARAMS["dbname"]:
+        raise SystemExit(f"Recusando recriar o banco principal '{dbname}'. Use --dbname.")
+
+    print(f"--- Recriando o banco '{dbname}' a partir do init.sql ---")
+    # CREATE/DROP DATABASE não rodam dentro de transação: autocommit
+    with psycopg.connect(**{**DB_PARAMS, "dbname": "postgres"}, autocommit=True) as conn:
+        conn.execute(f'DROP DATABASE IF EXISTS "{dbname}" WITH (FORCE);')
+        conn.execute(f'CREATE DATABASE "{dbname}";')
+
+    with open(ARQUIVO_INIT, encoding="utf-8") as arquivo:
+        script = arquivo.read()
+    # Sem parâmetros, o psycopg aceita vários comandos em um único execute
+    with psycopg.connect(**{**DB_PARAMS, "dbname": dbname}, autocommit=True) as conn:
+        conn.execute(script)
+
+
+class Contexto:
+    """ Conexões usadas pelos casos de teste, todas apontando para o banco de teste. """
+
+    def __init__(self, dbname):
+        params = {**DB_PARAMS, "dbname": dbname}
+        self.conninfo = psycopg.conninfo.make_conninfo(**params)
+
+        # example1.py: funções recebem a conexão como parâmetro
+        self.conn = psycopg.connect(self.conninfo)
+        # Conexão separada, em autocommit, para preparar/limpar dados sem
+        # entrar na medição
+        self.admin = psycopg.connect(self.conninfo, autocommit=True)
+
+        # example2.py: as funções usam a variável global 'pool' do módulo.
+        # Trocamos pelo pool do banco de teste.
+        self.pool = ConnectionPool(conninfo=self.conninfo, min_size=2, max_size=10, open=True)
+        self.pool.wait()
+        self._pool_original = example2.pool
+        example2.pool = self.pool
+
+        # orm.py: funções recebem a sessão como parâmetro
+        self.engine = create_engine(db_url(dbname=dbname))
+        self.Session = sessionmaker(bind=self.engine)
+
+    def fechar(self):
+        example2.pool = self._pool_original
+        self.pool.close()
+        self.engine.dispose()
+        self.conn.close()
+        self.admin.close()
+
+
+# 2. CASOS DE TESTE: LEITURA
+@caso("listar_cursos", "psycopg", "leitura")
+def _(ctx, medir, i):
+    with medir():
+        example1.listar_cursos(ctx.conn)
+
+
+@caso("buscar_aluno", "psycopg", "leitura")
+def _(ctx, medir, i):
+    with medir():
+        example1.buscar_aluno(ctx.conn, 'A0001')
+
+
+@caso("ver_horario_aluno", "psycopg", "leitura")
+def _(ctx, medir, i):
+    with medir():
+        example1.ver_horario_aluno(ctx.conn, 'A0001', '2025.1')
+
+
+@caso("buscar_aluno_com_join", "orm", "leitura")
+def _(ctx, medir, i):
+    # Uma sessão nova por repetição, como em uma requisição web
+    with ctx.Session() as session:
+        with medir():
+            orm.buscar_aluno_com_join(session, 'A0001')
+
+
+@caso("listar_alunos_do_curso", "orm", "leitura")
+def _(ctx, medir, i):
+    with ctx.Session() as session:
+        with medir():
+            orm.listar_alunos_do_curso(session, 1001)
+
+
+# 3. CASOS DE TESTE: ESCRITA
+# Cada repetição desfaz o que fez (fora da medição), para que todas partam
+# do mesmo estado.
+def _remover_afinidade(ctx, matricula_prof, cod_disciplina):
+    ctx.admin.execute(
+        "DELETE FROM afinidade_professor WHERE matricula_professor = %s AND cod_disciplina = %s;",
+        (matricula_prof, cod_disciplina)
+    )
+
+
+@caso("adicionar_afinidade_professor", "psycopg", "escrita")
+def _(ctx, medir, i):
+    with medir():
+        example1.adicionar_afinidade_professor(ctx.conn, 'P0001', 'D001')
+    _remover_afinidade(ctx, 'P0001', 'D001')
+
+
+@caso("adicionar_afinidade_com_tratamento", "psycopg", "escrita")
+def _(ctx, medir, i):
+    with medir():
+        example2.adicionar_afinidade_com_tratamento('P0001', 'D001')
+    _remover_afinidade(ctx, 'P0001', 'D001')
+
+
+@caso("atualizar_titulacao_professor", "psycopg", "escrita")
+def _(ctx, medir, i):
+    # Alterna entre dois valores para o UPDATE sempre mudar algo
+    with medir():
+        example2.atualizar_titulacao_professor('P0001', 'Mestre' if i % 2 else 'Doutor')
+    if i % 2:
+        ctx.admin.execute("UPDATE professor SET titulacao = 'Graduado' WHERE matricula = 'P0001';")
+
+
+@caso("cadastrar_novos_alunos_em_lote", "psycopg", "escrita")
+def _(ctx, medir, i):
+    novos = _alunos_de_teste(10)
+    with medir():
+        example2.cadastrar_novos_alunos_em_lote(novos)
+    _remover_alunos(ctx, novos)
+
+
+@caso("cadastrar_alunos_via_copy", "psycopg", "escrita")
+def _(ctx, medir, i):
+    novos = _alunos_de_teste(10)
+    with medir():
+        example2.cadastrar_alunos_via_copy(novos)
+    _remover_alunos(ctx, novos)
+
+
+@caso("deletar_afinidade", "psycopg", "escrita")
+def _(ctx, medir, i):
+    novo_id = ctx.admin.execute(
+        "INSERT INTO afinidade_professor (matricula_professor, cod_disciplina, data_inclusao) "
+        "VALUES ('P0001', 'D001', CURRENT_DATE) RETURNING id;"
+    ).fetchone()[0]
+    with medir():
+        example2.deletar_afinidade(novo_id)
+
+
+@caso("criar_novo_aluno", "orm", "escrita")
+def _(ctx, medir, i):
+    with ctx.Session() as session:
+        with medir():
+            orm.criar_novo_aluno(session)
+    ctx.admin.execute("DELETE FROM aluno WHERE matricula = 'A0999';")
+    ctx.admin.execute("DELETE FROM pessoa WHERE cpf = '99988877766';")
+
+
+@caso("atualizar_email_aluno", "orm", "escrita")
+def _(ctx, medir, i):
+    with ctx.Session() as session:
+        with medir():
+            orm.atualizar_email_aluno(session, 'A0001', f"bench{i % 2}@exemplo.com")
+
+
+@caso("deletar_aluno", "orm", "escrita")
+def _(ctx, medir, i):
+    ctx.admin.execute(
+        "INSERT INTO pessoa (cpf, nome, email) VALUES ('99988877766', 'Bench', 'bench.orm@exemplo.com');"
+        "INSERT INTO aluno (matricula, cod_mec, data_inicio, cpf) VALUES ('A0999', 1001, CURRENT_DATE, '99988877766');"
+    )
+    with ctx.Session() as session:
+        with medir():
+            orm.deletar_aluno(session, 'A0999')
+    ctx.admin.execute("DELETE FROM pessoa WHERE cpf = '99988877766';")
+
+
+def _alunos_de_teste(quantidade):
+    # CPFs/matrículas fora da faixa do init.sql
+    return [
+        {
+            "pessoa": (f"9{n:010d}", f"Aluno Bench {n}", f"bench{n}@exemplo.com", '2005-01-01'),
+            "aluno": (f"B{n:05d}", 1001, '2025-01-01', f"9{n:010d}"),
+        }
+        for n in range(quantidade)
+    ]
+
+
+def _remover_alunos(ctx, alunos):
+    matriculas = [al["aluno"][0] for al in alunos]
+    cpfs = [al["pessoa"][0] for al in alunos]
+    ctx.admin.execute("DELETE FROM aluno WHERE matricula = ANY(%s);", (matriculas,))
+    ctx.admin.execute("DELETE FROM pessoa WHERE cpf = ANY(%s);", (cpfs,))
+
+
+# 4. EXECUÇÃO E ESTATÍSTICAS
+def percentil(amostras_ordenadas, p):
+    """ Percentil por interpolação linear (amostras já ordenadas). """
+    if not amostras_ordenadas:
+        return None
+    posicao = (len(amostras_ordenadas) - 1) * p / 100
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(amostras_ordenadas) - 1)
+    return amostras_ordenadas[baixo] + (amostras_ordenadas[alto] - amostras_ordenadas[baixo]) * (posicao - baixo)
+
+
+def rodar_caso(ctx, definicao, repeticoes, aquecimento):
+    if repeticoes < 1:
+        raise ValueError("'repeticoes' precisa ser pelo menos 1.")
+    amostras = []
+
+    @contextlib.contextmanager
+    def medir():
+        inicio = time.perf_counter()
+        yield
+        amostras.append(time.perf_counter() - inicio)
+
+    # As funções do projeto imprimem na tela; descartamos a saída para não
+    # medir o tempo do terminal
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for i in range(aquecimento + repeticoes):
+            definicao["funcao"](ctx, medir, i)
+
+    amostras = sorted(amostras[aquecimento:])
+    total = sum(amostras)
+    return {
+        "camada": definicao["camada"],
+        "tipo": definicao["tipo"],
+        "repeticoes": len(amostras),
+        "vazao_ops_s": len(amostras) / total if total else None,
+        "media_ms": total / len(amostras) * 1000,
+        "p50_ms": percentil(amostras, 50) * 1000,
+        "p95_ms": percentil(amostras, 95) * 1000,
+        "p99_ms": percentil(amostras, 99) * 1000,
+        "max_ms": amostras[-1] * 1000,
+    }
+
+
+def comparar(atual, anterior, tolerancia):
+    """
+    Aponta regressões: casos cujo p50 ou p95 piorou mais que 'tolerancia'
+    (ex: 0.2 = 20%) em relação à execução anterior.
+    """
+    regressoes = []
+    for nome, res in atual["resultados"].items():
+        antes = anterior.get("resultados", {}).get(nome)
+        if not antes:
+            continue
+        for metrica in ("p50_ms", "p95_ms"):
+            if antes[metrica] and res[metrica] > antes[metrica] * (1 + tolerancia):
+                regressoes.append({
+                    "caso": nome,
+                    "metrica": metrica,
+                    "antes": antes[metrica],
+                    "agora": res[metrica],
+                    "variacao": res[metrica] / antes[metrica] - 1,
+                })
+    return regressoes
+
+
+# 5. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das funções de acesso a dados.")
+    parser.add_argument("--dbname", default=BANCO_PADRAO, help="banco usado no teste")
+    parser.add_argument("--recriar", action="store_true", help="recria o banco a partir do init.sql")
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--aquecimento", type=int, default=20)
+    parser.add_argument("--filtro", default="", help="roda só os casos cujo nome contém este texto")
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora aceitável (0.2 = 20%%)")
+    args = parser.parse_args()
+    if args.repeticoes < 1:
+        parser.error("--repeticoes precisa ser pelo menos 1")
+
+    # A linha de base é lida ANTES da execução: com '--comparar' igual a
+    # '--saida', o arquivo antigo seria sobrescrito e comparado consigo mesmo
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+
+    if args.recriar:
+        recriar_banco(args.dbname)
+
+    ctx = Contexto(args.dbname)
+    resultados = {}
+    try:
+        print(f"{'caso':<36} {'camada':<8} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for definicao in CASOS:
+            if args.filtro not in definicao["nome"]:
+                continue
+            res = rodar_caso(ctx, definicao, args.repeticoes, args.aquecimento)
+            resultados[definicao["nome"]] = res
+            print(f"{definicao['nome']:<36} {res['camada']:<8} {res['vazao_ops_s']:>9.1f} "
+                  f"{res['p50_ms']:>8.3f} {res['p95_ms']:>8.3f} {res['p99_ms']:>8.3f}")
+        versao_servidor = ctx.conn.info.server_version
+    finally:
+        ctx.fechar()
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "psycopg": psycopg.__version__,
+            "postgres": versao_servidor,
+            "maquina": platform.node(),
+        },
+        "parametros": {"repeticoes": args.repeticoes, "aquecimento": args.aquecimento},
+        "resultados": resultados,
+    }
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, indent=2)
+    print(f"\n--- Resultados salvos em '{args.saida}' ---")
+
+    if anterior is not None:
+        regressoes = comparar(relatorio, anterior, args.tolerancia)
+        if regressoes:
+            print(f"\n--- {len(regressoes)} REGRESSÕES (tolerância {args.tolerancia:.0%}) ---")
+            for r in regressoes:
+                print(f"  {r['caso']}: {r['metrica']} {r['antes']:.3f} -> {r['agora']:.3f} ms ({r['variacao']:+.0%})")
+            sys.exit(1)
+        print("\n--- Nenhuma regressão encontrada ---")
+
+
+if __name__ == "__main__":
+    main()
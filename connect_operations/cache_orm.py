@@ -0,0 +1,332 @@
+# cache_orm.py
+#
+# Cache de "segundo nível" para as consultas do ORM (orm.py).
+#
+# A 'Session' do SQLAlchemy já guarda os objetos que carregou (o "identity
+# map", o primeiro nível), mas só enquanto ela existe: cada requisição abre
+# uma sessão nova e 'select(Aluno).where(Aluno.matricula == ...)' vai ao
+# banco de novo, mesmo para os alunos mais acessados.
+#
+# Este cache fica FORA das sessões:
+# - é OPCIONAL por consulta: só usa o cache quem pede,
+#       stmt.execution_options(cache_orm=True)
+#       session.get(Aluno, 'A0001', execution_options={"cache_orm": True})
+# - a chave é o SQL COMPILADO + os parâmetros (a mesma consulta com outra
+#   matrícula é outra entrada);
+# - o resultado é guardado serializado (pickle), então cada sessão recebe
+#   cópias novas dos objetos;
+# - dois "backends": memória do processo (LRU) ou um ARQUIVO compartilhado
+#   entre processos (SQLite, da biblioteca padrão);
+# - no 'session.commit()', as tabelas alteradas (pessoa, aluno, curso...)
+#   invalidam as entradas que as leem.
+
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import loading
+
+import orm
+from orm import Aluno, Pessoa, SessionLocal
+
+OPCAO = "cache_orm"
+
+# Tabelas lidas por um SQL: tudo o que vem depois de FROM/JOIN
+# (inclui as tabelas dos 'joinedload' dos perfis de carregamento)
+PADRAO_TABELAS = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?', re.IGNORECASE)
+
+
+# 1. BACKENDS
+class CacheMemoria:
+    """
+    Backend em memória, LRU (as menos usadas saem primeiro).
+    Cada processo tem o seu.
+    """
+
+    def __init__(self, max_itens=1000, ttl=300):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()          # chave -> (valor, tabelas, expira_em)
+        self._geracao = 0
+
+    def geracao(self):
+        with self._lock:
+            return self._geracao
+
+    def obter(self, chave):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            valor, _, expira_em = entrada
+            if expira_em <= time.monotonic():
+                del self._entradas[chave]
+                return None
+            self._entradas.move_to_end(chave)
+            return valor
+
+    def gravar(self, chave, valor, tabelas, geracao):
+        with self._lock:
+            # Alguém invalidou enquanto líamos do banco: o valor pode estar velho
+            if self._geracao != geracao:
+                return False
+            self._entradas[chave] = (valor, frozenset(tabelas), time.monotonic() + self.ttl)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_itens:
+                self._entradas.popitem(last=False)
+            return True
+
+    def invalidar(self, tabelas):
+        with self._lock:
+            self._geracao += 1
+            for chave in [c for c, (_, deps, _) in self._entradas.items() if deps & set(tabelas)]:
+                del self._entradas[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._geracao += 1
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+class CacheArquivo:
+    """
+    Backend em um arquivo SQLite, compartilhado por todos os processos que
+    usarem o mesmo 'caminho' (ex: vários workers da aplicação).
+    Uma invalidação feita por um processo vale para todos.
+    """
+
+    def __init__(self, caminho="cache_orm.sqlite3", ttl=300):
+        self.caminho = caminho
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entradas (chave TEXT PRIMARY KEY, valor BLOB, expira_em REAL);
+            CREATE TABLE IF NOT EXISTS dependencias (chave TEXT, tabela TEXT);
+            CREATE INDEX IF NOT EXISTS dependencias_tabela ON dependencias (tabela);
+            CREATE TABLE IF NOT EXISTS controle (id INTEGER PRIMARY KEY CHECK (id = 1), geracao INTEGER);
+            INSERT OR IGNORE INTO controle VALUES (1, 0);
+        """)
+
+    def geracao(self):
+        with self._lock:
+            return self._conn.execute("SELECT geracao FROM controle;").fetchone()[0]
+
+    def obter(self, chave):
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT valor FROM entradas WHERE chave = ? AND expira_em > ?;", (chave, time.time())
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def gravar(self, chave, valor, tabelas, geracao):
+        with self._lock:
+            # BEGIN IMMEDIATE: a checagem da geração e a gravação são atômicas
+            # também entre processos
+            self._conn.execute("BEGIN IMMEDIATE;")
+            try:
+                if self._conn.execute("SELECT geracao FROM controle;").fetchone()[0] != geracao:
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?);", (chave, valor, time.time() + self.ttl)
+                )
+                self._conn.execute("DELETE FROM dependencias WHERE chave = ?;", (chave,))
+                self._conn.executemany(
+                    "INSERT INTO dependencias VALUES (?, ?);", [(chave, tabela) for tabela in tabelas]
+                )
+                return True
+            finally:
+                self._conn.execute("COMMIT;")
+
+    def invalidar(self, tabelas):
+        marcas = ",".join("?" * len(tabelas))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE;")
+            try:
+                self._conn.execute("UPDATE controle SET geracao = geracao + 1;")
+                self._conn.execute(
+                    f"DELETE FROM entradas WHERE chave IN (SELECT chave FROM dependencias WHERE tabela IN ({marcas}));",
+                    list(tabelas),
+                )
+                self._conn.execute(f"DELETE FROM dependencias WHERE tabela IN ({marcas});", list(tabelas))
+            finally:
+                self._conn.execute("COMMIT;")
+
+    def limpar(self):
+        with self._lock:
+            self._conn.executescript("""
+                BEGIN IMMEDIATE;
+                UPDATE controle SET geracao = geracao + 1;
+                DELETE FROM entradas;
+                DELETE FROM dependencias;
+                COMMIT;
+            """)
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM entradas;").fetchone()[0]
+
+
+# 2. O CACHE DO ORM
+class CacheORM:
+    """
+    Liga um backend às sessões de um 'sessionmaker' (ou de uma 'Session').
+
+        cache = CacheORM(CacheMemoria())
+        cache.instalar(SessionLocal)
+
+    Estatísticas em 'cache.estatisticas()'.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.ignoradas = 0       # pediram cache, mas a sessão tinha alterações pendentes
+        self.invalidacoes = 0
+        self._alvos = []
+
+    # --- ciclo de vida ---
+    def instalar(self, alvo=SessionLocal):
+        event.listen(alvo, "do_orm_execute", self._executar)
+        event.listen(alvo, "after_flush", self._depois_do_flush)
+        event.listen(alvo, "after_commit", self._depois_do_commit)
+        event.listen(alvo, "after_rollback", self._depois_do_rollback)
+        self._alvos.append(alvo)
+
+    def remover(self):
+        for alvo in self._alvos:
+            event.remove(alvo, "do_orm_execute", self._executar)
+            event.remove(alvo, "after_flush", self._depois_do_flush)
+            event.remove(alvo, "after_commit", self._depois_do_commit)
+            event.remove(alvo, "after_rollback", self._depois_do_rollback)
+        self._alvos.clear()
+
+    # --- leitura ---
+    def _executar(self, estado):
+        if not (estado.is_select and estado.execution_options.get(OPCAO)):
+            # Escrita em massa via ORM (update(Aluno)...) não passa pelo flush
+            if estado.is_update or estado.is_delete or estado.is_insert:
+                _pendentes(estado.session).update(t.name for m in estado.all_mappers for t in m.tables)
+            return None
+        # Recarga de atributos expirados/'refresh': sempre do banco
+        if estado.is_column_load:
+            return None
+
+        chave, tabelas = self.chave(estado)
+        if _pendentes(estado.session) & tabelas:
+            # A própria sessão mudou essas tabelas e ainda não fez commit:
+            # o cache mostraria o estado antigo
+            self._contar("ignoradas")
+            return None
+
+        valor = self.backend.obter(chave)
+        if valor is not None:
+            self._contar("acertos")
+            congelado = pickle.loads(valor)
+        else:
+            self._contar("falhas")
+            geracao = self.backend.geracao()
+            congelado = estado.invoke_statement().freeze()
+            self.backend.gravar(chave, pickle.dumps(congelado), tabelas, geracao)
+
+        # Junta os objetos à sessão atual (sem ir ao banco: load=False)
+        return loading.merge_frozen_result(estado.session, estado.statement, congelado, load=False)()
+
+    def chave(self, estado):
+        """ (SQL compilado + parâmetros, tabelas que o SQL lê). """
+        compilado = estado.statement.compile(dialect=estado.session.get_bind().dialect)
+        sql = str(compilado)
+        parametros = {**compilado.params, **(estado.parameters or {})}
+        chave = f"{sql}\n{sorted(parametros.items(), key=lambda item: item[0])!r}"
+        return chave, frozenset(nome.lower() for nome in PADRAO_TABELAS.findall(sql))
+
+    # --- invalidação ---
+    def _depois_do_flush(self, session, contexto_flush):
+        objetos = list(session.new) + list(session.dirty) + list(session.deleted)
+        _pendentes(session).update(
+            tabela.name for objeto in objetos for tabela in inspect(objeto).mapper.tables
+        )
+
+    def _depois_do_commit(self, session):
+        tabelas = session.info.pop(OPCAO, None)
+        if tabelas:
+            self.backend.invalidar(tabelas)
+            self._contar("invalidacoes")
+
+    def _depois_do_rollback(self, session):
+        session.info.pop(OPCAO, None)
+
+    # --- estatísticas ---
+    def _contar(self, nome):
+        with self._lock:
+            setattr(self, nome, getattr(self, nome) + 1)
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "ignoradas": self.ignoradas,
+                "invalidacoes": self.invalidacoes,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+                "entradas": len(self.backend),
+            }
+
+
+def _pendentes(session):
+    """ Tabelas alteradas pela sessão desde o último commit/rollback. """
+    return session.info.setdefault(OPCAO, set())
+
+
+# 3. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    cache = CacheORM(CacheMemoria(max_itens=1000, ttl=300))
+    cache.instalar(SessionLocal)
+
+    print("\n--- 1. Mesma consulta em 3 sessões (1 ida ao banco) ---")
+    for _ in range(3):
+        with SessionLocal() as session:
+            with orm.orcamento_de_queries(1) as contador:
+                orm.buscar_aluno_com_join(session, 'A0001', usar_cache=True)
+            print(f"  Queries enviadas ao banco: {contador.total}")
+
+    print("\n--- 2. session.get() com cache ---")
+    for _ in range(2):
+        with SessionLocal() as session:
+            aluno = session.get(Aluno, 'A0001', execution_options={OPCAO: True})
+            print(f"  {aluno.matricula} (cpf {aluno.cpf})")
+
+    print("\n--- 3. commit em 'pessoa' invalida o cache ---")
+    with SessionLocal() as session:
+        pessoa = session.scalars(select(Pessoa).join(Aluno).where(Aluno.matricula == 'A0001')).one()
+        email_antigo = pessoa.email
+        pessoa.email = "cache.orm@exemplo.com"
+        session.commit()
+    with SessionLocal() as session:
+        orm.buscar_aluno_com_join(session, 'A0001', usar_cache=True)
+        # Desfaz o exemplo
+        session.scalars(select(Pessoa).join(Aluno).where(Aluno.matricula == 'A0001')).one().email = email_antigo
+        session.commit()
+
+    print("\n--- 4. Estatísticas ---")
+    print(f"  {cache.estatisticas()}")
+    cache.remover()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# cache_referencias.py
+#
+# Cache em memória (read-through) para as tabelas de REFERÊNCIA:
+# 'curso', 'disciplina' e 'salas'.
+#
+# Essas tabelas quase nunca mudam, mas são lidas o tempo todo. Com o cache,
+# buscar o nome de um curso pelo 'cod_mec' vira uma consulta a um dicionário.
+#
+# Como evitamos dados velhos (stale)?
+# - Gatilhos no banco (facul-database/init/init_notify_referencias.sql)
+#   mandam um NOTIFY a cada alteração nessas tabelas.
+# - Uma thread fica escutando ('LISTEN') e limpa o cache da tabela alterada.
+# - Além disso, cada entrada tem validade (TTL) e o cache tem tamanho máximo
+#   (as menos usadas saem primeiro: LRU).
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+CANAL = "referencias_alteradas"
+TABELAS = ("curso", "disciplina", "salas")
+ARQUIVO_GATILHOS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "facul-database", "init", "init_notify_referencias.sql"
+)
+
+# Chave especial usada para guardar a tabela inteira (ex: listar_cursos)
+TODOS = "__todos__"
+
+
+# 1. O CACHE
+class CacheReferencias:
+    """
+    Cache read-through: se a chave não está no cache, busca no banco,
+    guarda e devolve. Da próxima vez, devolve direto da memória.
+
+    - 'ttl': validade de cada entrada, em segundos.
+    - 'max_itens': tamanho máximo POR TABELA (LRU).
+    - 'pool': pool de conexões usado para buscar o que não está no cache.
+    """
+
+    def __init__(self, pool, ttl=300, max_itens=1000):
+        self.pool = pool
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._lock = threading.Lock()
+        self._entradas = {tabela: OrderedDict() for tabela in TABELAS}
+        # A "geração" muda a cada invalidação. Serve para não gravar no cache
+        # um valor que foi lido do banco ANTES de uma alteração chegar.
+        self._geracao = {tabela: 0 for tabela in TABELAS}
+        self.acertos = 0
+        self.falhas = 0
+        self._parar = threading.Event()
+        self._ouvinte = None
+
+    # --- Leitura genérica ---
+    def obter(self, tabela, chave, carregar):
+        """
+        Devolve o valor de (tabela, chave). Se não estiver no cache (ou tiver
+        expirado), chama 'carregar(conn)' para buscar no banco.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            entradas = self._entradas[tabela]
+            if chave in entradas:
+                valor, expira_em = entradas[chave]
+                if expira_em > agora:
+                    entradas.move_to_end(chave)  # marcou como "usado agora"
+                    self.acertos += 1
+                    return valor
+                del entradas[chave]
+            self.falhas += 1
+            geracao = self._geracao[tabela]
+
+        with self.pool.connection() as conn:
+            valor = carregar(conn)
+
+        with self._lock:
+            # Só guarda se ninguém invalidou a tabela enquanto líamos
+            if self._geracao[tabela] == geracao:
+                entradas = self._entradas[tabela]
+                entradas[chave] = (valor, time.monotonic() + self.ttl)
+                entradas.move_to_end(chave)
+                while len(entradas) > self.max_itens:
+                    entradas.popitem(last=False)  # remove a menos usada
+        return valor
+
+    def invalidar(self, tabela=None):
+        """ Limpa o cache de uma tabela (ou de todas, se tabela=None). """
+        with self._lock:
+            for nome in ([tabela] if tabela else TABELAS):
+                if nome in self._entradas:
+                    self._entradas[nome].clear()
+                    self._geracao[nome] += 1
+
+    # --- Consultas prontas ---
+    def curso(self, cod_mec):
+        def carregar(conn):
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute("SELECT cod_mec, nome, data_autorizacao, modalidade FROM curso WHERE cod_mec = %s;", (cod_mec,))
+                return cur.fetchone()
+        return self.obter("curso", cod_mec, carregar)
+
+    def nome_curso(self, cod_mec):
+        curso = self.curso(cod_mec)
+        return curso["nome"] if curso else None
+
+    def listar_cursos(self):
+        def carregar(conn):
+            with conn.cursor() as cur:
+                cur.execute("SELECT cod_mec, nome, modalidade FROM curso ORDER BY nome;")
+                return cur.fetchall()
+        return self.obter("curso", TODOS, carregar)
+
+    def disciplina(self, cod_disciplina):
+        def carregar(conn):
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute("SELECT cod_disciplina, nome, carga_horaria, ementa FROM disciplina WHERE cod_disciplina = %s;", (cod_disciplina,))
+                return cur.fetchone()
+        return self.obter("disciplina", cod_disciplina, carregar)
+
+    def sala(self, codigo):
+        def carregar(conn):
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute("SELECT codigo, tipo, capacidade FROM salas WHERE codigo = %s;", (codigo,))
+                return cur.fetchone()
+        return self.obter("salas", codigo, carregar)
+
+    def listar_salas(self):
+        def carregar(conn):
+            with conn.cursor() as cur:
+                cur.execute("SELECT codigo, tipo, capacidade FROM salas ORDER BY codigo;")
+                return cur.fetchall()
+        return self.obter("salas", TODOS, carregar)
+
+    # 2. INVALIDAÇÃO VIA LISTEN/NOTIFY
+    def iniciar_ouvinte(self, conninfo):
+        """
+        Abre uma conexão DEDICADA (fora do pool) e fica escutando o canal.
+        A conexão precisa estar em autocommit: em uma transação aberta, os
+        avisos só seriam lidos depois do COMMIT.
+        """
+        self._parar.clear()
+        self._ouvinte = threading.Thread(target=self._escutar, args=(conninfo,), daemon=True)
+        self._ouvinte.start()
+
+    def parar_ouvinte(self):
+        self._parar.set()
+        if self._ouvinte:
+            self._ouvinte.join()
+
+    def _escutar(self, conninfo):
+        while not self._parar.is_set():
+            try:
+                with psycopg.connect(conninfo, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {CANAL};")
+                    # Avisos enviados enquanto estávamos desconectados se
+                    # perderam: por segurança, começamos com o cache limpo.
+                    self.invalidar()
+                    while not self._parar.is_set():
+                        # 'timeout' deixa o laço checar o '_parar' de vez em quando
+                        for aviso in conn.notifies(timeout=1.0):
+                            self.invalidar(aviso.payload)
+            except psycopg.OperationalError as e:
+                print(f"  AVISO: Ouvinte do cache desconectado, tentando de novo. {e}")
+                self.invalidar()
+                self._parar.wait(1.0)
+
+
+def instalar_gatilhos(conn):
+    """
+    Cria os gatilhos de NOTIFY em um banco que já existia antes deles
+    (os scripts de 'init' só rodam quando o volume do Docker é criado).
+    """
+    with open(ARQUIVO_GATILHOS, encoding="utf-8") as arquivo:
+        conn.execute(arquivo.read())
+
+
+# 3. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    conninfo = psycopg.conninfo.make_conninfo(**DB_PARAMS)
+    pool = ConnectionPool(conninfo=conninfo, min_size=2, max_size=10, open=False)
+
+    with pool:
+        with pool.connection() as conn:
+            instalar_gatilhos(conn)
+
+        cache = CacheReferencias(pool, ttl=300, max_itens=1000)
+        cache.iniciar_ouvinte(conninfo)
+
+        print("\n--- 1. Primeira leitura (vai ao banco) ---")
+        print(f"  Curso 1001: {cache.nome_curso(1001)}")
+        print("\n--- 2. Segunda leitura (vem do cache) ---")
+        print(f"  Curso 1001: {cache.nome_curso(1001)}")
+
+        print("\n--- 3. Alterando o curso (o gatilho invalida o cache) ---")
+        with pool.connection() as conn:
+            with conn.transaction():
+                conn.execute("UPDATE curso SET nome = nome WHERE cod_mec = %s;", (1001,))
+        time.sleep(0.5)  # tempo para o aviso chegar à thread ouvinte
+        print(f"  Curso 1001: {cache.nome_curso(1001)}")
+
+        print(f"\n  Acertos: {cache.acertos} | Falhas: {cache.falhas}")
+        cache.parar_ouvinte()
+
+
+if __name__ == "__main__":
+    main()
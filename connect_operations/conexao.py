@@ -0,0 +1,274 @@
+# conexao.py
+#
+# Configuração ÚNICA de conexão para todos os scripts desta pasta.
+#
+# Antes, o dicionário DB_PARAMS era copiado em vários arquivos, o
+# example2.py criava o pool ao ser importado e o orm.py criava o Engine no
+# import. Aqui:
+# - as configurações vêm de VARIÁVEIS DE AMBIENTE (os nomes padrão do
+#   Postgres), com os valores do docker-compose.yml como padrão;
+# - importar este arquivo NÃO conecta em nada: pools e engines são criados
+#   só no primeiro uso ("preguiçosos"), e o SQLAlchemy só é importado se
+#   alguém pedir um Engine;
+# - 'aquecer()' abre as 'min_size' conexões do pool EM PARALELO e devolve
+#   quanto tempo levou: o custo de "partida a frio" fica visível e acontece
+#   quando a aplicação escolhe (ex: antes de aceitar requisições).
+#
+# Variáveis de ambiente:
+#   PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD
+#   DB_POOL_MIN (padrão 2), DB_POOL_MAX (padrão 10)
+#
+# Uso:
+#   from conexao import DB_PARAMS, obter_pool, obter_engine
+#   fechar_tudo()              # no fim (ou 'await fechar_tudo_async()' com asyncio)
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+# 1. CONFIGURAÇÕES (VARIÁVEIS DE AMBIENTE)
+DB_PARAMS = {
+    "dbname": os.environ.get("PGDATABASE", "faculdatabase"),
+    "user": os.environ.get("PGUSER", "admin"),
+    "password": os.environ.get("PGPASSWORD", "admin123"),
+    "host": os.environ.get("PGHOST", "localhost"),
+    "port": os.environ.get("PGPORT", "5432"),
+}
+POOL_MIN = int(os.environ.get("DB_POOL_MIN", "2"))
+POOL_MAX = int(os.environ.get("DB_POOL_MAX", "10"))
+
+
+def conninfo(**sobrescritas):
+    """ Texto de conexão do psycopg. Ex: conninfo(dbname="faculdatabase_bench"). """
+    return psycopg.conninfo.make_conninfo(**{**DB_PARAMS, **sobrescritas})
+
+
+def db_url(**sobrescritas):
+    """ URL do SQLAlchemy (driver psycopg 3), com os mesmos parâmetros. """
+    from sqlalchemy import URL
+
+    params = {**DB_PARAMS, **sobrescritas}
+    return URL.create(
+        "postgresql+psycopg",
+        username=params["user"],
+        password=params["password"],
+        host=params["host"],
+        port=int(params["port"]),
+        database=params["dbname"],
+    )
+
+
+# 2. POOL PREGUIÇOSO
+class PoolPreguicoso:
+    """
+    Mesmo uso de um 'ConnectionPool' ('with pool.connection() as conn'),
+    mas o pool de verdade só é criado na primeira chamada.
+    - O pool tem pelo menos 'min_size' workers (e no mínimo 3, o padrão do
+      psycopg): as 'min_size' conexões abrem todas em paralelo.
+    - 'opcoes' vão direto para o ConnectionPool (ex: check=...).
+    - Ler 'aberto' ou 'get_stats()' NÃO cria o pool; só os métodos de
+      POOL_METODOS (e 'connection'/'aquecer') criam.
+    - Depois de 'close()', o próximo uso cria um pool novo.
+    """
+
+    # Métodos repassados ao ConnectionPool (criam o pool se preciso)
+    POOL_METODOS = {"check", "wait", "getconn", "putconn", "resize"}
+
+    def __init__(self, min_size=None, max_size=None, **opcoes):
+        self.min_size = POOL_MIN if min_size is None else min_size
+        self.max_size = POOL_MAX if max_size is None else max_size
+        self.opcoes = opcoes
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def obter(self):
+        """ O 'ConnectionPool' de verdade (cria e começa a abrir, sem esperar). """
+        with self._lock:
+            if self._pool is None:
+                opcoes = {"conninfo": conninfo(), "num_workers": max(3, self.min_size), **self.opcoes}
+                self._pool = ConnectionPool(
+                    min_size=self.min_size, max_size=self.max_size, open=False, **opcoes
+                )
+                self._pool.open(wait=False)
+            return self._pool
+
+    def connection(self, *args, **kwargs):
+        return self.obter().connection(*args, **kwargs)
+
+    def aquecer(self, timeout=30.0):
+        """
+        Espera as 'min_size' conexões ficarem prontas.
+        Retorna os segundos gastos; levanta PoolTimeout se não der tempo.
+        """
+        inicio = time.perf_counter()
+        self.obter().wait(timeout=timeout)
+        return time.perf_counter() - inicio
+
+    @property
+    def aberto(self):
+        return self._pool is not None and not self._pool.closed
+
+    def get_stats(self):
+        """ Estatísticas do pool real ({} se ele ainda não foi criado). """
+        return {} if self._pool is None else self._pool.get_stats()
+
+    def configuracao(self):
+        return {"min_size": self.min_size, "max_size": self.max_size, **self.opcoes}
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+    def __getattr__(self, nome):
+        # Só os métodos que precisam de um pool de verdade: ler qualquer
+        # outro atributo não pode abrir conexões escondido
+        if nome not in self.POOL_METODOS:
+            raise AttributeError(f"'{type(self).__name__}' não tem o atributo '{nome}'")
+        return getattr(self.obter(), nome)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pools = {}
+_engines = {}
+_engines_async = {}
+_lock = threading.Lock()
+
+
+def obter_pool(nome="padrao", **opcoes):
+    """
+    O pool compartilhado 'nome' (criado na primeira chamada). Não conecta
+    até o primeiro uso.
+    - Sem 'opcoes', devolve o pool já existente como ele estiver.
+    - Com 'opcoes' diferentes das da criação, levanta ValueError (elas
+      seriam ignoradas em silêncio). Quem precisa de outra configuração
+      usa outro 'nome'.
+    """
+    with _lock:
+        if nome not in _pools:
+            _pools[nome] = PoolPreguicoso(**opcoes)
+        elif opcoes:
+            existente = _pools[nome].configuracao()
+            pedida = PoolPreguicoso(**opcoes).configuracao()
+            if pedida != existente:
+                raise ValueError(
+                    f"O pool '{nome}' já existe com outras opções ({existente}); use outro nome."
+                )
+        return _pools[nome]
+
+
+def aquecer(nome="padrao", timeout=30.0):
+    """ Aquece o pool compartilhado 'nome'. Retorna os segundos gastos. """
+    return obter_pool(nome).aquecer(timeout=timeout)
+
+
+# 3. ENGINE DO SQLALCHEMY (PREGUIÇOSO)
+def obter_engine(**sobrescritas):
+    """
+    Engine compartilhado para os parâmetros dados (um por banco).
+    O pool do Engine segue DB_POOL_MIN/DB_POOL_MAX: 'pool_size' conexões
+    fixas + as extras até o máximo.
+    """
+    from sqlalchemy import create_engine
+
+    url = db_url(**sobrescritas)
+    chave = url.render_as_string(hide_password=False)
+    with _lock:
+        if chave not in _engines:
+            _engines[chave] = create_engine(
+                url, pool_size=POOL_MIN, max_overflow=max(0, POOL_MAX - POOL_MIN)
+            )
+        return _engines[chave]
+
+
+def obter_engine_async(**sobrescritas):
+    """
+    Versão 'asyncio' do 'obter_engine' (create_async_engine), para o
+    orm_async.py. Feche com 'await engine.dispose()'.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = db_url(**sobrescritas)
+    chave = url.render_as_string(hide_password=False)
+    with _lock:
+        if chave not in _engines_async:
+            _engines_async[chave] = create_async_engine(
+                url, pool_size=POOL_MIN, max_overflow=max(0, POOL_MAX - POOL_MIN)
+            )
+        return _engines_async[chave]
+
+
+def aquecer_engine(engine=None, quantidade=None, timeout=30.0):
+    """
+    Abre 'quantidade' conexões do Engine (padrão: o 'pool_size') em paralelo
+    e as devolve ao pool. Retorna os segundos gastos.
+    """
+    engine = engine or obter_engine()
+    quantidade = quantidade or engine.pool.size()
+    # Todas seguram a conexão até as outras abrirem: assim são 'quantidade'
+    # conexões DIFERENTES, e não a mesma reaproveitada
+    barreira = threading.Barrier(quantidade)
+
+    def abrir(_):
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+            barreira.wait(timeout)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=quantidade) as executor:
+        list(executor.map(abrir, range(quantidade)))
+    return time.perf_counter() - inicio
+
+
+def fechar_tudo():
+    """
+    Fecha os pools e os engines SÍNCRONOS criados por este módulo.
+    Os engines assíncronos precisam do event loop: use 'fechar_tudo_async'.
+    """
+    with _lock:
+        pools, engines = list(_pools.values()), list(_engines.values())
+    for pool in pools:
+        pool.close()
+    for engine in engines:
+        engine.dispose()
+
+
+async def fechar_tudo_async():
+    """ Como 'fechar_tudo', mas também fecha os engines assíncronos (dentro do event loop). """
+    with _lock:
+        engines = list(_engines_async.values())
+    for engine in engines:
+        await engine.dispose()
+    fechar_tudo()
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    print(f"\n--- 1. Configuração: {DB_PARAMS['user']}@{DB_PARAMS['host']}:{DB_PARAMS['port']}/{DB_PARAMS['dbname']} ---")
+
+    print(f"\n--- 2. Aquecendo o pool psycopg ({POOL_MIN} conexões em paralelo) ---")
+    pool = obter_pool()
+    print(f"  Pronto em {aquecer() * 1000:.1f} ms")
+    inicio = time.perf_counter()
+    with pool.connection() as conn:
+        conn.execute("SELECT 1;")
+    print(f"  1ª consulta depois do aquecimento: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    print(f"\n--- 3. Aquecendo o Engine do SQLAlchemy ({POOL_MIN} conexões em paralelo) ---")
+    print(f"  Pronto em {aquecer_engine() * 1000:.1f} ms")
+
+    fechar_tudo()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# conflitos_horario.py
+#
+# Detecção de CHOQUE DE HORÁRIO para as ofertas de um semestre.
+#
+# Antes de inserir uma oferta em 'oferta_semestre' é preciso garantir que:
+# - a SALA não está ocupada nesse dia/horário;
+# - o PROFESSOR não está dando outra aula nesse dia/horário.
+# Conferir isso com uma consulta por oferta não escala quando o semestre
+# inteiro (milhares de ofertas) é planejado de uma vez.
+#
+# Aqui carregamos as ofertas do semestre UMA vez e montamos "agendas" em
+# memória: para cada (sala, dia) e (professor, dia), uma lista ORDENADA
+# pelo horário de início. Cada oferta proposta é conferida com busca
+# binária ('bisect') e, se não houver choque, entra na agenda: assim um lote
+# de propostas é validado em uma única passada, inclusive os choques entre
+# as próprias propostas.
+#
+# A mesma regra pode ser garantida pelo banco (opcional):
+#   facul-database/opcional/restricao_conflitos_horario.sql
+
+import bisect
+import os
+from datetime import time
+
+import psycopg
+from psycopg import errors
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+ARQUIVO_RESTRICOES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "facul-database", "opcional", "restricao_conflitos_horario.sql"
+)
+
+
+# 1. AGENDA DE UM RECURSO (SALA OU PROFESSOR) EM UM DIA
+class Agenda:
+    """
+    Intervalos [inicio, fim) de um recurso em um dia, ordenados pelo início.
+    - 'sobrepostos' acha os intervalos que se sobrepõem a um novo.
+    - Encostar não é choque: 08:00-10:00 e 10:00-12:00 podem coexistir.
+    """
+
+    def __init__(self):
+        self.inicios = []   # horario_ini, ordenado (usado pelo bisect)
+        self.itens = []     # (horario_ini, horario_fim, referência), na mesma ordem
+        self.maior_duracao = 0  # em microssegundos
+
+    def adicionar(self, inicio, fim, referencia):
+        posicao = bisect.bisect_right(self.inicios, inicio)
+        self.inicios.insert(posicao, inicio)
+        self.itens.insert(posicao, (inicio, fim, referencia))
+        self.maior_duracao = max(self.maior_duracao, _microssegundos(fim) - _microssegundos(inicio))
+
+    def sobrepostos(self, inicio, fim):
+        """
+        Um intervalo existente (i, f) choca com o novo se i < fim e f > inicio.
+        Como nenhum intervalo dura mais que 'maior_duracao', só precisamos
+        olhar os que começam entre 'inicio - maior_duracao' e 'fim'. Se essa
+        conta passar da meia-noite, a busca começa do primeiro intervalo.
+        """
+        limite = _microssegundos(inicio) - self.maior_duracao
+        primeiro = bisect.bisect_right(self.inicios, _horario(limite)) if limite >= 0 else 0
+        ultimo = bisect.bisect_left(self.inicios, fim)
+        return [
+            referencia
+            for i, f, referencia in self.itens[primeiro:ultimo]
+            if f > inicio
+        ]
+
+
+def _microssegundos(horario):
+    # 'time' não aceita subtração: contamos a partir da meia-noite
+    return ((horario.hour * 60 + horario.minute) * 60 + horario.second) * 1_000_000 + horario.microsecond
+
+
+def _horario(microssegundos):
+    segundos, micro = divmod(microssegundos, 1_000_000)
+    minutos, segundos = divmod(segundos, 60)
+    horas, minutos = divmod(minutos, 60)
+    return time(horas, minutos, segundos, micro)
+
+
+# 2. O MOTOR DE CONFLITOS
+class MotorConflitos:
+    """
+    Agendas de salas e professores de UM semestre.
+    - 'carregar' lê as ofertas já cadastradas (1 consulta) e as afinidades
+      (para saber o professor de cada 'id_afinidade_professor').
+    - 'validar' confere um lote de propostas em uma passada.
+    - 'conflitos_existentes' lista os choques que já estão no banco.
+
+    Cada proposta é um dicionário com as colunas de 'oferta_semestre':
+        {"id_afinidade_professor": 12, "codigo_sala": "S01",
+         "dia_semana": "Seg", "horario_ini": time(8), "horario_fim": time(10)}
+    """
+
+    def __init__(self, semestre):
+        self.semestre = semestre
+        self.salas = {}         # (codigo_sala, dia_semana) -> Agenda
+        self.professores = {}   # (matricula_professor, dia_semana) -> Agenda
+        self.afinidades = {}    # id_afinidade_professor -> matricula_professor
+        self.ofertas = {}       # id -> oferta já cadastrada
+
+    @classmethod
+    def carregar(cls, conn, semestre):
+        motor = cls(semestre)
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, matricula_professor FROM afinidade_professor;")
+            motor.afinidades = dict(cur.fetchall())
+
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute("""
+                SELECT id, id_afinidade_professor, codigo_sala, dia_semana, horario_ini, horario_fim
+                FROM oferta_semestre
+                WHERE semestre = %s
+                ORDER BY id;
+            """, (semestre,))
+            for oferta in cur:
+                motor.ofertas[oferta["id"]] = oferta
+                motor._agendar(oferta, ("oferta", oferta["id"]))
+        return motor
+
+    def _agendar(self, oferta, referencia):
+        if not _tem_horario(oferta):
+            return
+        professor = self.afinidades.get(oferta["id_afinidade_professor"])
+        dia = oferta["dia_semana"]
+        self.salas.setdefault((oferta["codigo_sala"], dia), Agenda()).adicionar(
+            oferta["horario_ini"], oferta["horario_fim"], referencia
+        )
+        self.professores.setdefault((professor, dia), Agenda()).adicionar(
+            oferta["horario_ini"], oferta["horario_fim"], referencia
+        )
+
+    def _choques(self, oferta):
+        """ Lista de choques [{'tipo': 'sala'|'professor', 'com': referência}]. """
+        professor = self.afinidades.get(oferta["id_afinidade_professor"])
+        dia = oferta["dia_semana"]
+        choques = []
+        for tipo, agendas, chave in (
+            ("sala", self.salas, (oferta["codigo_sala"], dia)),
+            ("professor", self.professores, (professor, dia)),
+        ):
+            agenda = agendas.get(chave)
+            if agenda:
+                for referencia in agenda.sobrepostos(oferta["horario_ini"], oferta["horario_fim"]):
+                    choques.append({"tipo": tipo, "com": referencia})
+        return choques
+
+    def validar(self, propostas):
+        """
+        Confere as propostas em ordem. Retorna uma lista (na mesma ordem) de
+        dicionários {"proposta", "valida", "erro", "choques"}:
+        - 'choques' aponta ("oferta", id) para ofertas do banco ou
+          ("proposta", indice) para uma proposta anterior do mesmo lote;
+        - as propostas válidas entram na agenda, então as seguintes já são
+          conferidas contra elas.
+        """
+        resultados = []
+        for indice, proposta in enumerate(propostas):
+            resultado = {"proposta": proposta, "valida": False, "erro": None, "choques": []}
+            resultados.append(resultado)
+
+            if proposta["id_afinidade_professor"] not in self.afinidades:
+                resultado["erro"] = "afinidade_professor não existe"
+                continue
+            if not _tem_horario(proposta):
+                resultado["erro"] = "dia ou horário não informado"
+                continue
+            if proposta["horario_ini"] >= proposta["horario_fim"]:
+                resultado["erro"] = "horario_ini deve ser antes de horario_fim"
+                continue
+
+            resultado["choques"] = self._choques(proposta)
+            if not resultado["choques"]:
+                resultado["valida"] = True
+                self._agendar(proposta, ("proposta", indice))
+        return resultados
+
+    def conflitos_existentes(self):
+        """
+        Pares de ofertas do banco que já se chocam: [(id1, id2, tipo), ...].
+        Úteis antes de instalar a restrição no banco (que falharia com eles).
+        """
+        pares = []
+        for tipo, agendas in (("sala", self.salas), ("professor", self.professores)):
+            for agenda in agendas.values():
+                # Só olha para a frente: cada par aparece uma vez
+                for posicao, (inicio, fim, referencia) in enumerate(agenda.itens):
+                    for i, f, outra in agenda.itens[posicao + 1:]:
+                        if i >= fim:
+                            break
+                        if referencia[0] == outra[0] == "oferta":
+                            pares.append((referencia[1], outra[1], tipo))
+        return pares
+
+
+def _tem_horario(oferta):
+    return all(oferta.get(chave) is not None for chave in ("dia_semana", "horario_ini", "horario_fim"))
+
+
+# 3. CADASTRO DE UM LOTE DE OFERTAS
+def cadastrar_ofertas(pool, semestre, propostas):
+    """
+    Valida as propostas e insere só as válidas, em uma transação.
+    A tabela fica travada para outras ESCRITAS (leituras continuam) entre a
+    carga das agendas e o INSERT, para ninguém cadastrar uma oferta no meio.
+    Retorna (resultados da validação, ids inseridos na ordem das válidas).
+    """
+    with pool.connection() as conn:
+        with conn.transaction():
+            conn.execute("LOCK TABLE oferta_semestre IN SHARE ROW EXCLUSIVE MODE;")
+            motor = MotorConflitos.carregar(conn, semestre)
+            resultados = motor.validar(propostas)
+
+            validas = [r["proposta"] for r in resultados if r["valida"]]
+            ids = []
+            if validas:
+                with conn.cursor() as cur:
+                    cur.executemany("""
+                        INSERT INTO oferta_semestre
+                            (semestre, id_afinidade_professor, codigo_sala, dia_semana, horario_ini, horario_fim)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        RETURNING id;
+                    """, [
+                        (semestre, p["id_afinidade_professor"], p["codigo_sala"],
+                         p["dia_semana"], p["horario_ini"], p["horario_fim"])
+                        for p in validas
+                    ], returning=True)
+                    while True:
+                        ids.append(cur.fetchone()[0])
+                        if not cur.nextset():
+                            break
+    return resultados, ids
+
+
+def instalar_restricoes(conn, semestres=None):
+    """
+    Instala a restrição de exclusão (sala) e o gatilho (professor) no banco.
+    Antes, confere se os dados atuais já têm choques: se tiverem, a
+    instalação falharia, então mostramos quais são e não instalamos.
+    """
+    if semestres is None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT DISTINCT semestre FROM oferta_semestre ORDER BY semestre;")
+            semestres = [linha[0] for linha in cur.fetchall()]
+
+    existentes = []
+    for semestre in semestres:
+        for par in MotorConflitos.carregar(conn, semestre).conflitos_existentes():
+            existentes.append((semestre, *par))
+    if existentes:
+        print(f"  AVISO: {len(existentes)} choque(s) já cadastrado(s); restrições NÃO instaladas.")
+        for semestre, id1, id2, tipo in existentes:
+            print(f"    {semestre}: ofertas {id1} e {id2} ({tipo})")
+        return False
+
+    with open(ARQUIVO_RESTRICOES, encoding="utf-8") as arquivo:
+        conn.execute(arquivo.read())
+    return True
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    pool = ConnectionPool(
+        conninfo=psycopg.conninfo.make_conninfo(**DB_PARAMS),
+        min_size=2,
+        max_size=10,
+        open=False
+    )
+
+    with pool:
+        with pool.connection() as conn:
+            motor = MotorConflitos.carregar(conn, '2025.1')
+
+            print("\n--- 1. Choques já cadastrados em 2025.1 ---")
+            for id1, id2, tipo in motor.conflitos_existentes():
+                print(f"  Ofertas {id1} e {id2} ({tipo})")
+
+            print("\n--- 2. Validando um lote de propostas ---")
+            oferta = next(o for o in motor.ofertas.values() if _tem_horario(o))
+            outra_afinidade = next(
+                id_ for id_, prof in motor.afinidades.items()
+                if prof != motor.afinidades[oferta["id_afinidade_professor"]]
+            )
+            propostas = [
+                # Mesma sala e horário de uma oferta existente
+                {**oferta, "id_afinidade_professor": outra_afinidade},
+                # Mesmo professor, outra sala, mesmo horário
+                {**oferta, "codigo_sala": "S99"},
+                # Sábado: livre, mas a próxima proposta choca com esta
+                {**oferta, "dia_semana": "Sab"},
+                {**oferta, "dia_semana": "Sab", "id_afinidade_professor": outra_afinidade},
+            ]
+            for indice, resultado in enumerate(motor.validar(propostas)):
+                if resultado["valida"]:
+                    print(f"  SUCESSO: proposta {indice} sem choques.")
+                else:
+                    motivos = resultado["erro"] or ", ".join(
+                        f"{c['tipo']} com {c['com'][0]} {c['com'][1]}" for c in resultado["choques"]
+                    )
+                    print(f"  AVISO: proposta {indice} recusada ({motivos}).")
+
+        print("\n--- 3. Restrição no banco (opcional) ---")
+        with pool.connection() as conn:
+            try:
+                instalar_restricoes(conn)
+            except errors.FeatureNotSupported as e:
+                print(f"  FALHA: extensão não disponível. {e}")
+
+
+if __name__ == "__main__":
+    main()
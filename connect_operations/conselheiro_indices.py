@@ -0,0 +1,459 @@
+# conselheiro_indices.py
+#
+# "Conselheiro" de índices baseado no EXPLAIN.
+#
+# O init.sql só cria índices para as chaves estrangeiras (ex:
+# 'idx_oferta_semestre_codigo_sala'). Várias consultas do projeto filtram
+# por outras colunas, como 'oferta_semestre.semestre' no 'ver_horario_aluno'.
+# Com o banco pequeno do init.sql isso não aparece; com o banco gerado pelo
+# gerador_dados.py (dezenas de milhares de linhas), aparece.
+#
+# Para cada consulta do CATÁLOGO abaixo (as mesmas usadas nos módulos desta
+# pasta), o script:
+#   1. roda 'EXPLAIN (ANALYZE, BUFFERS)' e percorre o plano;
+#   2. aponta varreduras sequenciais (Seq Scan) e filtros que descartam muitas
+#      linhas, além dos nós que concentram a maior parte do custo;
+#   3. propõe índices compostos (igualdades primeiro, depois intervalos) e,
+#      quando cabe, "de cobertura" (INCLUDE), pulando os que já existem;
+#   4. cria os índices propostos DENTRO de uma transação, roda o EXPLAIN de
+#      novo e desfaz tudo (ROLLBACK), mostrando o custo antes/depois;
+#   5. grava os índices como SQL de migração.
+#
+# Uso (dentro da pasta connect_operations):
+#   python gerador_dados.py --escala 10 --semestres 4 --dbname faculdatabase_bench
+#   python conselheiro_indices.py --dbname faculdatabase_bench --migracao indices_sugeridos.sql
+#
+# Obs: EXPLAIN ANALYZE EXECUTA a consulta. As escritas do catálogo rodam
+# dentro de um SAVEPOINT que é sempre desfeito.
+
+import argparse
+import re
+
+import psycopg
+from psycopg import errors
+
+import horario_lote
+from escrita_pipeline import OPERACOES
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+BANCO_PADRAO = "faculdatabase_bench"
+
+# Nós que leem uma tabela (e podem ter 'Filter')
+NOS_DE_LEITURA = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+# "coluna operador", com ou sem apelido da tabela e conversão de tipo.
+# Ex: "((os.semestre)::text = '2025.1'::text)" ou "(horario_ini < '10:00'::time)"
+PADRAO_CONDICAO = re.compile(
+    r"(?:\w+\.)?(\w+)\)?(?:::[\w ]+?)?\s*(= ANY|=|<=|>=|<|>|~~)\s"
+)
+OPERADORES_DE_IGUALDADE = {"=", "= ANY"}
+
+
+# 1. CATÁLOGO DE CONSULTAS
+# Cada consulta recebe os parâmetros a partir das 'amostras' do banco
+# (valores que existem de verdade, para o EXPLAIN ANALYZE ser realista).
+CATALOGO = [
+    {
+        "nome": "listar_cursos",
+        "origem": "example1.py",
+        "query": "SELECT cod_mec, nome, modalidade FROM curso ORDER BY nome;",
+        "params": lambda a: None,
+    },
+    {
+        "nome": "buscar_aluno",
+        "origem": "example1.py",
+        "query": """
+            SELECT p.nome, p.email, c.nome AS nome_curso, a.data_inicio
+            FROM aluno a
+            JOIN pessoa p ON a.cpf = p.cpf
+            JOIN curso c ON a.cod_mec = c.cod_mec
+            WHERE a.matricula = %s;
+        """,
+        "params": lambda a: (a["aluno"],),
+    },
+    {
+        "nome": "ver_horario_aluno",
+        "origem": "example1.py",
+        "query": """
+            SELECT d.nome AS disciplina, p.nome AS professor, os.codigo_sala,
+                   os.dia_semana, os.horario_ini, os.horario_fim
+            FROM horario_aluno ha
+            JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+            JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+            JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+            JOIN professor prof ON ap.matricula_professor = prof.matricula
+            JOIN pessoa p ON prof.cpf = p.cpf
+            WHERE ha.matricula_aluno = %s AND os.semestre = %s
+            ORDER BY os.dia_semana, os.horario_ini;
+        """,
+        "params": lambda a: (a["aluno"], a["semestre"]),
+    },
+    {
+        "nome": "ver_horarios_alunos",
+        "origem": "horario_lote.py",
+        "query": horario_lote.QUERY_HORARIOS,
+        "params": lambda a: (a["turma"], a["semestre"]),
+    },
+    {
+        "nome": "ver_horarios_alunos_mat",
+        "origem": "horario_lote.py",
+        "query": horario_lote.QUERY_HORARIOS_MAT,
+        "params": lambda a: (a["turma"], a["semestre"]),
+    },
+    {
+        "nome": "streaming_horarios_semestre",
+        "origem": "streaming.py",
+        "query": """
+            SELECT ha.matricula_aluno, d.nome AS disciplina, p.nome AS professor,
+                   os.codigo_sala, os.dia_semana, os.horario_ini, os.horario_fim
+            FROM horario_aluno ha
+            JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+            JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+            JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+            JOIN professor prof ON ap.matricula_professor = prof.matricula
+            JOIN pessoa p ON prof.cpf = p.cpf
+            WHERE os.semestre = %s
+            ORDER BY ha.matricula_aluno, os.dia_semana, os.horario_ini;
+        """,
+        "params": lambda a: (a["semestre"],),
+    },
+    {
+        # Agenda de uma sala em um dia (base para checar choque de horários)
+        "nome": "agenda_sala",
+        "origem": "choque de horário de sala",
+        "query": """
+            SELECT id, horario_ini, horario_fim
+            FROM oferta_semestre
+            WHERE codigo_sala = %s AND dia_semana = %s AND semestre = %s
+              AND horario_ini < %s AND horario_fim > %s
+            ORDER BY horario_ini;
+        """,
+        "params": lambda a: (a["sala"], a["dia"], a["semestre"], a["fim"], a["ini"]),
+    },
+    {
+        "nome": "listar_salas",
+        "origem": "exercise.py",
+        "query": "SELECT codigo, tipo, capacidade FROM salas ORDER BY codigo;",
+        "params": lambda a: None,
+    },
+    {
+        "nome": "atualizar_titulacao",
+        "origem": "example2.py / escrita_pipeline.py",
+        "query": OPERACOES["atualizar_titulacao"][0],
+        "params": lambda a: ("Doutor", a["professor"]),
+    },
+    {
+        "nome": "encerrar_afinidade",
+        "origem": "escrita_pipeline.py",
+        "query": OPERACOES["encerrar_afinidade"][0],
+        "params": lambda a: (a["afinidade"],),
+    },
+]
+
+
+def amostras(conn):
+    """ Valores reais do banco para preencher os parâmetros do catálogo. """
+    with conn.cursor() as cur:
+        cur.execute("SELECT MAX(semestre) FROM oferta_semestre;")
+        semestre = cur.fetchone()[0]
+        cur.execute("""
+            SELECT ha.matricula_aluno
+            FROM horario_aluno ha JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+            WHERE os.semestre = %s
+            GROUP BY ha.matricula_aluno
+            ORDER BY ha.matricula_aluno
+            LIMIT 40;
+        """, (semestre,))
+        turma = [linha[0] for linha in cur.fetchall()]
+        cur.execute("""
+            SELECT os.codigo_sala, os.dia_semana, os.horario_ini, os.horario_fim,
+                   ap.matricula_professor, ap.id
+            FROM oferta_semestre os JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+            WHERE os.semestre = %s
+            ORDER BY os.id
+            LIMIT 1;
+        """, (semestre,))
+        sala, dia, ini, fim, professor, afinidade = cur.fetchone()
+    return {
+        "semestre": semestre, "aluno": turma[0], "turma": turma,
+        "sala": sala, "dia": dia, "ini": ini, "fim": fim,
+        "professor": professor, "afinidade": afinidade,
+    }
+
+
+# 2. EXPLAIN E LEITURA DO PLANO
+def explicar(conn, query, params):
+    """
+    Roda 'EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON)' e devolve o plano
+    (dicionário). Tudo roda em um SAVEPOINT desfeito no final, então
+    escritas não alteram o banco.
+    """
+    with conn.transaction(force_rollback=True):
+        with conn.cursor() as cur:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON) " + query, params)
+            return cur.fetchone()[0][0]
+
+
+def nos_do_plano(no):
+    """ Percorre todos os nós do plano (o próprio nó e os filhos). """
+    yield no
+    for filho in no.get("Plans", []):
+        yield from nos_do_plano(filho)
+
+
+def resumo(plano):
+    """ Custo estimado, tempo real e blocos lidos de um plano. """
+    raiz = plano["Plan"]
+    return {
+        "custo": raiz["Total Cost"],
+        "tempo_ms": plano["Execution Time"],
+        "blocos": raiz.get("Shared Hit Blocks", 0) + raiz.get("Shared Read Blocks", 0),
+    }
+
+
+def colunas_da_condicao(condicao, colunas_da_tabela):
+    """
+    Extrai as colunas usadas em uma condição do plano ('Filter', 'Index Cond'...).
+    Retorna (colunas de igualdade, colunas de intervalo), sem repetição.
+    """
+    igualdade, intervalo = [], []
+    for coluna, operador in PADRAO_CONDICAO.findall(condicao or ""):
+        if coluna not in colunas_da_tabela:
+            continue
+        destino = igualdade if operador in OPERADORES_DE_IGUALDADE else intervalo
+        if coluna not in igualdade and coluna not in intervalo:
+            destino.append(coluna)
+    return igualdade, intervalo
+
+
+# 3. ANÁLISE E PROPOSTA DE ÍNDICES
+class Conselheiro:
+    """
+    Analisa os planos e acumula os índices propostos.
+    - 'min_linhas': varreduras que leem menos linhas que isso são ignoradas
+      (tabelas pequenas como 'curso' são mais rápidas sem índice).
+    - 'fracao_custo': um nó é "caro" se sozinho responde por essa fração do
+      custo total do plano.
+    - 'max_include': no máximo quantas colunas extras o índice pode levar
+      no INCLUDE para virar um índice de cobertura.
+    """
+
+    def __init__(self, conn, min_linhas=1000, fracao_custo=0.5, max_include=4):
+        self.conn = conn
+        self.min_linhas = min_linhas
+        self.fracao_custo = fracao_custo
+        self.max_include = max_include
+        self.propostas = {}  # (tabela, colunas) -> {"include": [...], "consultas": [...]}
+        self._colunas = {}
+        self._indices = {}
+
+    def colunas(self, tabela):
+        if tabela not in self._colunas:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    "SELECT column_name FROM information_schema.columns WHERE table_name = %s;",
+                    (tabela,)
+                )
+                self._colunas[tabela] = {linha[0] for linha in cur.fetchall()}
+        return self._colunas[tabela]
+
+    def indices_existentes(self, tabela):
+        """ Lista com as colunas-chave de cada índice da tabela, em ordem. """
+        if tabela not in self._indices:
+            with self.conn.cursor() as cur:
+                cur.execute("""
+                    SELECT array_agg(a.attname ORDER BY k.ordem)
+                    FROM pg_index i
+                    CROSS JOIN unnest(i.indkey) WITH ORDINALITY AS k(attnum, ordem)
+                    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                    WHERE i.indrelid = %s::regclass AND k.ordem <= i.indnkeyatts
+                    GROUP BY i.indexrelid;
+                """, (tabela,))
+                self._indices[tabela] = [linha[0] for linha in cur.fetchall()]
+        return self._indices[tabela]
+
+    def ja_existe(self, tabela, chave):
+        # Um índice que começa com as mesmas colunas já atende a consulta
+        return any(indice[:len(chave)] == list(chave) for indice in self.indices_existentes(tabela))
+
+    def analisar(self, nome, plano):
+        """
+        Devolve a lista de alertas do plano e registra os índices propostos.
+        Cada alerta é um dicionário {"tipo", "no", "tabela", "detalhe"}.
+        """
+        alertas = []
+        custo_total = plano["Plan"]["Total Cost"] or 1
+
+        for no in nos_do_plano(plano["Plan"]):
+            tipo = no["Node Type"]
+            tabela = no.get("Relation Name")
+
+            # Custo "próprio" do nó: total menos o dos filhos
+            custo_proprio = no["Total Cost"] - sum(f["Total Cost"] for f in no.get("Plans", []))
+            if custo_proprio >= self.fracao_custo * custo_total and custo_total > 100:
+                alertas.append({
+                    "tipo": "custo_alto", "no": tipo, "tabela": tabela,
+                    "detalhe": f"{custo_proprio:.0f} de {custo_total:.0f} do custo total",
+                })
+
+            if tipo not in NOS_DE_LEITURA:
+                continue
+
+            loops = no.get("Actual Loops", 1) or 1
+            lidas = (no.get("Actual Rows", 0) + no.get("Rows Removed by Filter", 0)) * loops
+            if lidas < self.min_linhas:
+                continue
+
+            if tipo == "Seq Scan":
+                alertas.append({
+                    "tipo": "seq_scan", "no": tipo, "tabela": tabela,
+                    "detalhe": f"{lidas:.0f} linhas lidas, {no.get('Actual Rows', 0) * loops:.0f} aproveitadas"
+                               + (f" (filtro: {no['Filter']})" if no.get("Filter") else ""),
+                })
+            elif no.get("Rows Removed by Filter", 0) > no.get("Actual Rows", 0):
+                alertas.append({
+                    "tipo": "filtro_descarta", "no": tipo, "tabela": tabela,
+                    "detalhe": f"{no['Rows Removed by Filter'] * loops:.0f} linhas descartadas pelo filtro {no['Filter']}",
+                })
+            else:
+                continue
+
+            self._propor(nome, no, tabela)
+
+        return alertas
+
+    def _propor(self, nome, no, tabela):
+        colunas_da_tabela = self.colunas(tabela)
+        # Colunas que o índice atual já usa + colunas do filtro
+        igualdade, intervalo = colunas_da_condicao(
+            no.get("Index Cond") or no.get("Recheck Cond"), colunas_da_tabela
+        )
+        igualdade_filtro, intervalo_filtro = colunas_da_condicao(no.get("Filter"), colunas_da_tabela)
+        igualdade += [c for c in igualdade_filtro if c not in igualdade]
+        intervalo += [c for c in intervalo_filtro if c not in intervalo and c not in igualdade]
+        chave = tuple(igualdade + intervalo)
+        if not chave or self.ja_existe(tabela, chave):
+            return
+
+        # Índice de cobertura: se as demais colunas lidas couberem no INCLUDE,
+        # a consulta pode ser respondida só com o índice (Index Only Scan)
+        saida = []
+        for expressao in no.get("Output", []):
+            coluna = expressao.split(".")[-1]
+            if coluna in colunas_da_tabela and coluna not in chave and coluna not in saida:
+                saida.append(coluna)
+        include = saida if len(saida) <= self.max_include else []
+
+        proposta = self.propostas.setdefault((tabela, chave), {"include": include, "consultas": []})
+        if nome not in proposta["consultas"]:
+            proposta["consultas"].append(nome)
+        # Se outra consulta precisa de outras colunas, junta no mesmo INCLUDE
+        for coluna in include:
+            if coluna not in proposta["include"]:
+                proposta["include"].append(coluna)
+        if len(proposta["include"]) > self.max_include:
+            proposta["include"] = []
+
+    def sql_dos_indices(self, concorrente=False):
+        """ Um 'CREATE INDEX' por proposta (CONCURRENTLY para a migração). """
+        comandos = []
+        for (tabela, chave), proposta in self.propostas.items():
+            nome = f"idx_{tabela}_{'_'.join(chave)}"[:63]
+            comando = (
+                f'CREATE INDEX {"CONCURRENTLY " if concorrente else ""}IF NOT EXISTS "{nome}" '
+                f'ON "{tabela}" ({", ".join(chave)})'
+            )
+            if proposta["include"]:
+                comando += f' INCLUDE ({", ".join(proposta["include"])})'
+            comandos.append((comando + ";", tabela, proposta["consultas"]))
+        return comandos
+
+
+# 4. ANTES / DEPOIS
+def comparar_com_indices(conn, conselheiro, catalogo, params_por_consulta):
+    """
+    Cria os índices propostos em uma transação, refaz os EXPLAINs e desfaz
+    tudo. Retorna {nome da consulta: resumo do plano com os índices}.
+    """
+    depois = {}
+    with conn.transaction(force_rollback=True):
+        tabelas = set()
+        for comando, tabela, _ in conselheiro.sql_dos_indices():
+            conn.execute(comando)
+            tabelas.add(tabela)
+        for tabela in tabelas:
+            conn.execute(f'ANALYZE "{tabela}";')
+        for consulta in catalogo:
+            if consulta["nome"] in params_por_consulta:
+                plano = explicar(conn, consulta["query"], params_por_consulta[consulta["nome"]])
+                depois[consulta["nome"]] = resumo(plano)
+    return depois
+
+
+def gravar_migracao(caminho, conselheiro):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write("-- Índices sugeridos por conselheiro_indices.py\n")
+        arquivo.write("-- CONCURRENTLY não bloqueia escritas, mas não roda dentro de transação:\n")
+        arquivo.write("-- aplique com 'psql -f' (sem --single-transaction).\n\n")
+        for comando, _, consultas in conselheiro.sql_dos_indices(concorrente=True):
+            arquivo.write(f"-- Consultas: {', '.join(consultas)}\n{comando}\n\n")
+
+
+# 5. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Sugere índices a partir do EXPLAIN das consultas do projeto.")
+    parser.add_argument("--dbname", default=BANCO_PADRAO, help="banco analisado (de preferência um banco gerado)")
+    parser.add_argument("--filtro", default="", help="analisa só as consultas cujo nome contém este texto")
+    parser.add_argument("--min-linhas", type=int, default=1000, help="ignora varreduras menores que isso")
+    parser.add_argument("--fracao-custo", type=float, default=0.5, help="fração do custo total que torna um nó 'caro'")
+    parser.add_argument("--migracao", default="indices_sugeridos.sql", help="arquivo com o SQL dos índices")
+    args = parser.parse_args()
+
+    catalogo = [c for c in CATALOGO if args.filtro in c["nome"]]
+
+    with psycopg.connect(**{**DB_PARAMS, "dbname": args.dbname}) as conn:
+        conselheiro = Conselheiro(conn, args.min_linhas, args.fracao_custo)
+        valores = amostras(conn)
+
+        print(f"\n--- 1. Analisando {len(catalogo)} consultas em '{args.dbname}' ---")
+        antes, alertas, params_por_consulta = {}, {}, {}
+        for consulta in catalogo:
+            params = consulta["params"](valores)
+            try:
+                plano = explicar(conn, consulta["query"], params)
+            except errors.UndefinedTable as e:
+                print(f"  AVISO: {consulta['nome']} ignorada ({str(e).splitlines()[0]}).")
+                continue
+            params_por_consulta[consulta["nome"]] = params
+            antes[consulta["nome"]] = resumo(plano)
+            alertas[consulta["nome"]] = conselheiro.analisar(consulta["nome"], plano)
+
+            print(f"\n  {consulta['nome']} ({consulta['origem']}): custo {antes[consulta['nome']]['custo']:.1f}")
+            for alerta in alertas[consulta["nome"]]:
+                print(f"    [{alerta['tipo']}] {alerta['no']} em {alerta['tabela'] or '-'}: {alerta['detalhe']}")
+
+        comandos = conselheiro.sql_dos_indices()
+        print(f"\n--- 2. Índices propostos ({len(comandos)}) ---")
+        if not comandos:
+            print("  Nenhum índice novo a propor.")
+            return
+        for comando, _, consultas in comandos:
+            print(f"  {comando}  -- {', '.join(consultas)}")
+
+        print("\n--- 3. Antes / depois (índices criados e desfeitos em uma transação) ---")
+        depois = comparar_com_indices(conn, conselheiro, catalogo, params_por_consulta)
+        print(f"  {'consulta':<28} {'custo antes':>12} {'custo depois':>13} {'ms antes':>9} {'ms depois':>10} {'blocos':>15}")
+        for nome, a in antes.items():
+            d = depois[nome]
+            marca = " *" if d["custo"] < a["custo"] else ""
+            print(
+                f"  {nome:<28} {a['custo']:>12.1f} {d['custo']:>13.1f} {a['tempo_ms']:>9.2f} {d['tempo_ms']:>10.2f}"
+                f" {a['blocos']:>7} -> {d['blocos']:<5}{marca}"
+            )
+
+        gravar_migracao(args.migracao, conselheiro)
+        print(f"\n  SQL de migração salvo em '{args.migracao}'.")
+
+
+if __name__ == "__main__":
+    main()
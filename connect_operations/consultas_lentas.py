@@ -0,0 +1,281 @@
+# consultas_lentas.py
+#
+# Registro de CONSULTAS LENTAS ("slow query log") do lado da aplicação.
+#
+# As métricas do instrumentacao.py mostram histogramas por query, mas não
+# guardam as execuções em si: quando alguém reclama de lentidão, não dá
+# para saber QUAL chamada demorou, com que parâmetros, nem qual foi o plano.
+#
+# Este registro é OPCIONAL (só vale para as conexões configuradas) e grava
+# uma linha JSON por execução em um arquivo local com rotação:
+# - toda execução acima de 'limite' segundos ("lenta");
+# - uma fração 'amostragem' de TODAS as execuções ("amostra"), para ter a
+#   linha de base do que é normal;
+# - nome da query (o mesmo 'nome_da_query' das métricas), uma "impressão
+#   digital" dos parâmetros (hash: os valores em si não vão para o arquivo),
+#   duração e número de linhas;
+# - opcionalmente o 'EXPLAIN' das mais lentas (acima de 'explicar_acima'),
+#   uma vez por query, para não pesar.
+#
+# Uso:
+#   registro = RegistroLento("consultas_lentas.jsonl", limite=0.1, amostragem=0.01)
+#   pool = ConnectionPool(..., configure=registro.configurar)
+#
+#   python consultas_lentas.py demo
+#   python consultas_lentas.py resumo --top 10
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+import psycopg
+from psycopg import pq, sql
+from psycopg_pool import ConnectionPool
+
+from conexao import conninfo
+from instrumentacao import nome_da_query
+
+ARQUIVO_PADRAO = "consultas_lentas.jsonl"
+
+# EXPLAIN só funciona para estes comandos (e não executa a query)
+VERBOS_COM_PLANO = {"select", "insert", "update", "delete", "with"}
+
+
+def impressao_dos_parametros(params):
+    """ Hash curto dos parâmetros: agrupa execuções iguais sem gravar os valores. """
+    if params is None:
+        return None
+    return hashlib.sha1(repr(params).encode()).hexdigest()[:12]
+
+
+# 1. O REGISTRO
+class RegistroLento:
+    """
+    Grava as execuções lentas (e as amostradas) em JSONL com rotação.
+    - 'limite': segundos a partir dos quais a execução é "lenta".
+    - 'amostragem': fração (0 a 1) de todas as execuções que também é gravada.
+    - 'explicar_acima': segundos a partir dos quais o EXPLAIN é capturado
+      (None = nunca). Cada query é explicada uma vez por processo.
+    - 'max_bytes' / 'arquivos': tamanho de cada arquivo e quantos antigos
+      manter (consultas_lentas.jsonl.1, .2, ...).
+    """
+
+    def __init__(self, caminho=ARQUIVO_PADRAO, limite=0.1, amostragem=0.0, explicar_acima=None,
+                 max_bytes=10 * 1024 * 1024, arquivos=3):
+        self.caminho = caminho
+        self.limite = limite
+        self.amostragem = amostragem
+        self.explicar_acima = explicar_acima
+        self._explicadas = set()
+        self._lock = threading.Lock()
+
+        # O 'logging' já sabe rotacionar arquivos e é seguro entre threads
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._arquivo = RotatingFileHandler(caminho, maxBytes=max_bytes, backupCount=arquivos, encoding="utf-8")
+        self._arquivo.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(self._arquivo)
+
+        registro = self
+
+        class CursorRegistrado(psycopg.Cursor):
+            def execute(self, query, params=None, **kwargs):
+                inicio = time.perf_counter()
+                erro = None
+                try:
+                    return super().execute(query, params, **kwargs)
+                except psycopg.Error as e:
+                    erro = type(e).__name__
+                    raise
+                finally:
+                    registro.observar(self, query, params, time.perf_counter() - inicio, erro)
+
+        self.cursor_factory = CursorRegistrado
+
+    def configurar(self, conn):
+        """ Liga o registro em uma conexão (serve como 'configure=' do pool). """
+        conn.cursor_factory = self.cursor_factory
+
+    def observar(self, cursor, query, params, duracao, erro=None):
+        if duracao >= self.limite:
+            motivo = "lenta"
+        elif self.amostragem and random.random() < self.amostragem:
+            motivo = "amostra"
+        else:
+            return  # caminho comum: uma comparação e pronto
+
+        texto = query.as_string(cursor.connection) if isinstance(query, sql.Composable) else str(query)
+        nome = nome_da_query(texto)
+        entrada = {
+            "ts": time.time(),
+            "motivo": motivo,
+            "nome": nome,
+            "params": impressao_dos_parametros(params),
+            "duracao": duracao,
+            "linhas": max(cursor.rowcount, 0),
+            "query": " ".join(texto.split())[:500],
+        }
+        if erro:
+            entrada["erro"] = erro
+        if self.explicar_acima is not None and duracao >= self.explicar_acima and self._primeira_vez(nome):
+            entrada["plano"] = self._explicar(cursor.connection, texto, params)
+        self._logger.info(json.dumps(entrada, ensure_ascii=False, default=str))
+
+    def _primeira_vez(self, nome):
+        with self._lock:
+            if nome in self._explicadas:
+                return False
+            self._explicadas.add(nome)
+            return True
+
+    def _explicar(self, conn, texto, params):
+        """
+        'EXPLAIN (FORMAT JSON)' com os mesmos parâmetros (só o plano: a query
+        NÃO roda de novo). Usa um cursor comum (sem registro) e um SAVEPOINT,
+        para um erro aqui não estragar a transação da aplicação.
+        """
+        palavras = texto.split(None, 1)  # 'split()' sem separador: aceita "SELECT\n..."
+        if not palavras or palavras[0].lower() not in VERBOS_COM_PLANO:
+            return None
+        # Só com a conexão parada (fora de pipeline, sem comando em
+        # andamento e sem transação com erro)
+        if (conn.info.transaction_status not in (pq.TransactionStatus.IDLE, pq.TransactionStatus.INTRANS)
+                or conn.info.pipeline_status != pq.PipelineStatus.OFF):
+            return None
+        try:
+            with conn.transaction():
+                with psycopg.Cursor(conn) as cur:
+                    cur.execute(f"EXPLAIN (FORMAT JSON) {texto}", params)
+                    return cur.fetchone()[0][0]["Plan"]
+        except psycopg.Error as e:
+            return {"erro": str(e)}
+
+    def close(self):
+        self._logger.removeHandler(self._arquivo)
+        self._arquivo.close()
+
+
+# 2. RELATÓRIO (TOP-N)
+def ler_registros(caminho=ARQUIVO_PADRAO):
+    """ Lê o arquivo atual e os rotacionados (.1, .2, ...). """
+    for arquivo in sorted(glob.glob(f"{glob.escape(caminho)}*")):
+        if arquivo != caminho and not arquivo[len(caminho) + 1:].isdigit():
+            continue
+        with open(arquivo, encoding="utf-8") as entrada:
+            for linha in entrada:
+                if linha.strip():
+                    yield json.loads(linha)
+
+
+def resumir(registros, top=10, ordenar="total"):
+    """
+    Agrupa por nome de query. 'ordenar': 'total' (tempo somado), 'max',
+    'p95' ou 'execucoes'. Retorna as 'top' primeiras.
+    """
+    grupos = {}
+    for r in registros:
+        g = grupos.setdefault(r["nome"], {
+            "nome": r["nome"], "query": r["query"], "duracoes": [], "lentas": 0, "erros": 0,
+            "linhas": 0, "parametros": set(), "plano": None, "pior": None,
+        })
+        g["duracoes"].append(r["duracao"])
+        g["lentas"] += r["motivo"] == "lenta"
+        g["erros"] += "erro" in r
+        g["linhas"] += r["linhas"]
+        g["parametros"].add(r["params"])
+        if r.get("plano"):
+            g["plano"] = r["plano"]
+        if g["pior"] is None or r["duracao"] > g["pior"]:
+            g["pior"] = r["duracao"]
+
+    resumo = []
+    for g in grupos.values():
+        duracoes = sorted(g["duracoes"])
+        resumo.append({
+            "nome": g["nome"],
+            "query": g["query"],
+            "execucoes": len(duracoes),
+            "lentas": g["lentas"],
+            "erros": g["erros"],
+            "total": sum(duracoes),
+            "p95": duracoes[min(len(duracoes) - 1, int(len(duracoes) * 0.95))],
+            "max": g["pior"],
+            "linhas_media": g["linhas"] / len(duracoes),
+            "parametros_distintos": len(g["parametros"]),
+            "plano": g["plano"],
+        })
+    resumo.sort(key=lambda item: item[ordenar], reverse=True)
+    return resumo[:top]
+
+
+def imprimir_resumo(resumo):
+    print(f"  {'query':<32} {'exec':>6} {'lentas':>6} {'total ms':>10} {'p95 ms':>9} {'max ms':>9} {'linhas':>7}")
+    for item in resumo:
+        print(
+            f"  {item['nome']:<32} {item['execucoes']:>6} {item['lentas']:>6} {item['total'] * 1000:>10.1f}"
+            f" {item['p95'] * 1000:>9.2f} {item['max'] * 1000:>9.2f} {item['linhas_media']:>7.0f}"
+        )
+        print(f"    {item['query'][:100]}")
+        plano = item["plano"]
+        if plano and "erro" not in plano:
+            print(f"    plano: {plano['Node Type']} (custo {plano['Total Cost']}, ~{plano['Plan Rows']} linhas)")
+
+
+# 3. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Registro de consultas lentas.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    demo = sub.add_parser("demo", help="roda consultas de exemplo com o registro ligado")
+    demo.add_argument("--dbname", default=None)
+    demo.add_argument("--limite", type=float, default=0.005, help="segundos")
+    demo.add_argument("--amostragem", type=float, default=0.05)
+    demo.add_argument("--arquivo", default=ARQUIVO_PADRAO)
+
+    relatorio = sub.add_parser("resumo", help="top-N do arquivo de registro")
+    relatorio.add_argument("--arquivo", default=ARQUIVO_PADRAO)
+    relatorio.add_argument("--top", type=int, default=10)
+    relatorio.add_argument("--ordenar", choices=["total", "max", "p95", "execucoes"], default="total")
+    args = parser.parse_args()
+
+    if args.comando == "resumo":
+        print(f"\n--- Top {args.top} consultas por '{args.ordenar}' ({args.arquivo}) ---")
+        imprimir_resumo(resumir(ler_registros(args.arquivo), args.top, args.ordenar))
+        return
+
+    registro = RegistroLento(args.arquivo, limite=args.limite, amostragem=args.amostragem,
+                             explicar_acima=args.limite)
+    destino = conninfo(**({"dbname": args.dbname} if args.dbname else {}))
+    with ConnectionPool(conninfo=destino, min_size=2, max_size=10, configure=registro.configurar) as pool:
+        print(f"\n--- 1. Rodando consultas (limite {args.limite * 1000:.0f} ms, amostragem {args.amostragem:.0%}) ---")
+        for i in range(200):
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT cod_mec, nome, modalidade FROM curso ORDER BY nome;")
+                    cur.execute("SELECT matricula, cpf FROM aluno WHERE matricula = %s;", (f"A{i % 200 + 1:04d}",))
+                    if i % 50 == 0:
+                        # Mais pesada: junta todos os horários
+                        cur.execute("""
+                            SELECT ha.matricula_aluno, count(*)
+                            FROM horario_aluno ha
+                            JOIN oferta_semestre os ON os.id = ha.id_oferta_semestre
+                            GROUP BY ha.matricula_aluno;
+                        """)
+                        # Propositalmente lenta (20 ms)
+                        cur.execute("SELECT pg_sleep(0.02);")
+    registro.close()
+    print(f"  Registro gravado em '{args.arquivo}'")
+
+    print("\n--- 2. Resumo ---")
+    imprimir_resumo(resumir(ler_registros(args.arquivo), top=5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# consultas_preparadas.py
+#
+# Registro central de CONSULTAS PREPARADAS (prepared statements).
+#
+# As queries de 'buscar_aluno' e 'ver_horario_aluno' (example1.py) têm vários
+# JOINs. A cada 'cur.execute()' o Postgres precisa:
+#   1. analisar o texto (parse),
+#   2. planejar o melhor jeito de executar (plan),
+#   3. executar.
+#
+# Com 'PREPARE nome AS ...' os passos 1 e 2 acontecem UMA vez por conexão.
+# Depois, basta 'EXECUTE nome(valores)'. Como o pool reaproveita conexões,
+# preparamos tudo no callback 'configure' do pool, que roda uma única vez
+# quando cada conexão nova é aberta.
+
+import threading
+import time
+
+import psycopg
+from psycopg import sql
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+
+# 1. O REGISTRO
+class RegistroConsultas:
+    """
+    Guarda as consultas pelo nome e sabe prepará-las em uma conexão.
+    - As queries usam $1, $2, ... (sintaxe do PREPARE), e não %s.
+    - 'tipos' diz ao Postgres o tipo de cada parâmetro.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.consultas = {}    # nome -> (tipos, sql)
+        self.preparacoes = {}  # nome -> quantas conexões prepararam a query
+        self.execucoes = {}    # nome -> quantas vezes foi executada
+
+    def registrar(self, nome, tipos, query):
+        self.consultas[nome] = (tipos, query)
+        self.preparacoes.setdefault(nome, 0)
+        self.execucoes.setdefault(nome, 0)
+
+    def configurar(self, conn):
+        """
+        Prepara todas as consultas registradas nesta conexão.
+        Use como 'configure=registro.configurar' no ConnectionPool.
+        """
+        with conn.cursor() as cur:
+            for nome, (tipos, query) in self.consultas.items():
+                comando = sql.SQL("PREPARE {} ({}) AS {}").format(
+                    sql.Identifier(nome),
+                    sql.SQL(", ").join(sql.SQL(t) for t in tipos),
+                    sql.SQL(query)
+                )
+                cur.execute(comando)
+                with self._lock:
+                    self.preparacoes[nome] += 1
+        # O pool exige que a conexão volte "parada" (fora de transação)
+        conn.commit()
+
+    def executar(self, cur, nome, params=()):
+        """
+        Executa a consulta preparada 'nome' com os 'params' no cursor 'cur'.
+        Os valores são inseridos com 'sql.Literal', que faz o escape correto
+        (o comando EXECUTE não aceita placeholders do protocolo).
+        """
+        comando = sql.SQL("EXECUTE {}").format(sql.Identifier(nome))
+        if params:
+            comando = sql.SQL("{} ({})").format(
+                comando, sql.SQL(", ").join(sql.Literal(p) for p in params)
+            )
+        cur.execute(comando)
+        with self._lock:
+            self.execucoes[nome] += 1
+        return cur
+
+    def estatisticas(self, conn=None):
+        """
+        Reaproveitamento de plano por consulta:
+        - 'execucoes_por_preparo': quantas execuções cada PREPARE rendeu
+          (quanto maior, mais parse/plan foi economizado);
+        - se 'conn' for passado, inclui também os contadores do próprio
+          Postgres ('pg_prepared_statements', PG 14+) para aquela conexão:
+          planos genéricos (reaproveitados) e planos customizados.
+        """
+        with self._lock:
+            resultado = {
+                nome: {
+                    "preparacoes": self.preparacoes[nome],
+                    "execucoes": self.execucoes[nome],
+                    "execucoes_por_preparo": (
+                        self.execucoes[nome] / self.preparacoes[nome] if self.preparacoes[nome] else 0
+                    ),
+                }
+                for nome in self.consultas
+            }
+        if conn is not None:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT name, generic_plans, custom_plans FROM pg_prepared_statements WHERE name = ANY(%s);",
+                    (list(self.consultas),)
+                )
+                for nome, genericos, customizados in cur.fetchall():
+                    resultado[nome]["planos_genericos"] = genericos
+                    resultado[nome]["planos_customizados"] = customizados
+        return resultado
+
+
+# 2. AS CONSULTAS "QUENTES" DO PROJETO
+registro = RegistroConsultas()
+
+registro.registrar("buscar_aluno", ["varchar"], """
+    SELECT p.nome, p.email, c.nome AS nome_curso, a.data_inicio
+    FROM aluno a
+    JOIN pessoa p ON a.cpf = p.cpf
+    JOIN curso c ON a.cod_mec = c.cod_mec
+    WHERE a.matricula = $1
+""")
+
+registro.registrar("ver_horario_aluno", ["varchar", "varchar"], """
+    SELECT
+        d.nome AS disciplina,
+        p.nome AS professor,
+        os.codigo_sala,
+        os.dia_semana,
+        os.horario_ini,
+        os.horario_fim
+    FROM horario_aluno ha
+    JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+    JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+    JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+    JOIN professor prof ON ap.matricula_professor = prof.matricula
+    JOIN pessoa p ON prof.cpf = p.cpf
+    WHERE ha.matricula_aluno = $1 AND os.semestre = $2
+    ORDER BY os.dia_semana, os.horario_ini
+""")
+
+
+# 3. FUNÇÕES DE LEITURA USANDO O REGISTRO
+def buscar_aluno(conn, matricula):
+    """ Mesmo resultado do 'buscar_aluno' do example1.py, via EXECUTE. """
+    with conn.cursor() as cur:
+        return registro.executar(cur, "buscar_aluno", (matricula,)).fetchone()
+
+
+def ver_horario_aluno(conn, matricula_aluno, semestre):
+    """ Mesmo resultado do 'ver_horario_aluno' do example1.py, via EXECUTE. """
+    with conn.cursor(row_factory=dict_row) as cur:
+        return registro.executar(cur, "ver_horario_aluno", (matricula_aluno, semestre)).fetchall()
+
+
+# 4. BENCHMARK: AD-HOC x PREPARADA
+def benchmark(pool, repeticoes=1000, matricula='A0001', semestre='2025.1'):
+    """
+    Compara a latência média do 'ver_horario_aluno' ad-hoc com a versão
+    preparada, na mesma conexão.
+    Obs: o psycopg prepara sozinho uma query depois de 5 execuções iguais
+    ('prepare_threshold'). Para medir o caminho ad-hoc de verdade, usamos
+    'prepare=False' nele.
+    """
+    query_adhoc = registro.consultas["ver_horario_aluno"][1].replace("$1", "%s").replace("$2", "%s")
+
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                cur.execute(query_adhoc, (matricula, semestre), prepare=False)
+                cur.fetchall()
+            adhoc = (time.perf_counter() - inicio) / repeticoes
+
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                registro.executar(cur, "ver_horario_aluno", (matricula, semestre))
+                cur.fetchall()
+            preparada = (time.perf_counter() - inicio) / repeticoes
+        conn.commit()
+
+        print(f"  Ad-hoc....: {adhoc * 1000:.3f} ms por chamada")
+        print(f"  Preparada.: {preparada * 1000:.3f} ms por chamada")
+        print(f"  Ganho.....: {(1 - preparada / adhoc) * 100:.1f}%")
+        print(f"  Planos....: {registro.estatisticas(conn)}")
+    return {"adhoc_ms": adhoc * 1000, "preparada_ms": preparada * 1000}
+
+
+# 5. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    # 'configure' roda uma vez para cada conexão nova que o pool abrir
+    pool = ConnectionPool(
+        conninfo=psycopg.conninfo.make_conninfo(**DB_PARAMS),
+        min_size=2,
+        max_size=10,
+        configure=registro.configurar,
+        open=False
+    )
+
+    with pool:
+        with pool.connection() as conn:
+            print("\n--- 1. Buscando Aluno (consulta preparada) ---")
+            print(f"  {buscar_aluno(conn, 'A0001')}")
+
+            print("\n--- 2. Horário do Aluno (consulta preparada) ---")
+            for item in ver_horario_aluno(conn, 'A0001', '2025.1'):
+                print(f"  - {item['disciplina']} ({item['dia_semana']} {item['horario_ini']})")
+
+        print("\n--- 3. Benchmark: ad-hoc x preparada ---")
+        benchmark(pool)
+
+
+if __name__ == "__main__":
+    main()
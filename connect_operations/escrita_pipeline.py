@@ -0,0 +1,175 @@
+# escrita_pipeline.py
+#
+# Escritas em lote usando o PIPELINE MODE do psycopg.
+#
+# Normalmente cada 'cur.execute()' espera a resposta do banco antes de
+# mandar o próximo comando: com 500 alterações são 500 idas e voltas pela
+# rede. No modo pipeline, os comandos são enviados um atrás do outro, sem
+# esperar, e as respostas são lidas no final.
+#
+# Problema: se UM comando falha (ex: UniqueViolation), o Postgres descarta
+# todos os seguintes até o próximo ponto de sincronização. Para ainda assim
+# devolver o resultado de CADA item, cada comando roda entre
+# 'SAVEPOINT item' e 'RELEASE item':
+# - se tudo der certo: 1 ida e volta para o lote inteiro;
+# - se o item N falhar: desfazemos só o item N ('ROLLBACK TO SAVEPOINT'),
+#   guardamos o erro e reenviamos do item N+1 em diante.
+# Ou seja, o custo é 1 ida e volta + 1 por item que falhou.
+
+import time
+
+import psycopg
+from psycopg import errors
+from psycopg_pool import ConnectionPool
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+# 1. OPERAÇÕES SUPORTADAS
+# nome -> (query, tipo de resultado)
+#   'id'       -> devolve o valor do RETURNING
+#   'rowcount' -> devolve quantas linhas foram afetadas
+OPERACOES = {
+    "adicionar_afinidade": ("""
+        INSERT INTO afinidade_professor (matricula_professor, cod_disciplina, data_inclusao)
+        VALUES (%s, %s, CURRENT_DATE)
+        RETURNING id;
+    """, "id"),
+    "atualizar_titulacao": (
+        "UPDATE professor SET titulacao = %s WHERE matricula = %s;", "rowcount"
+    ),
+    "encerrar_afinidade": (
+        "UPDATE afinidade_professor SET data_encerramento = CURRENT_DATE WHERE id = %s;", "rowcount"
+    ),
+    "deletar_afinidade": (
+        "DELETE FROM afinidade_professor WHERE id = %s;", "rowcount"
+    ),
+}
+
+
+# 2. EXECUÇÃO EM PIPELINE
+def executar_escritas_em_pipeline(pool, operacoes):
+    """
+    Executa uma lista de operações independentes em UMA transação, no modo
+    pipeline.
+    - 'operacoes' é uma lista de tuplas (nome, parametros), por exemplo:
+        ("adicionar_afinidade", ('P0001', 'D001'))
+        ("atualizar_titulacao", ('Mestre', 'P0001'))
+        ("deletar_afinidade", (697,))
+    - Um item que falha NÃO desfaz os outros (cada um tem seu SAVEPOINT).
+
+    Retorna uma lista (na mesma ordem) de dicionários:
+        {"operacao": ..., "id": ..., "rowcount": ..., "erro": None}
+    onde 'erro' guarda a exceção do item (ex: errors.UniqueViolation).
+    """
+    resultados = [
+        {"operacao": nome, "id": None, "rowcount": None, "erro": None}
+        for nome, _ in operacoes
+    ]
+    idas_e_voltas = 0
+
+    with pool.connection() as conn:
+        with conn.transaction():
+            inicio = 0
+            while inicio < len(operacoes):
+                cursores = []
+                idas_e_voltas += 1
+                erro = None
+                try:
+                    with conn.pipeline():
+                        try:
+                            for nome, params in operacoes[inicio:]:
+                                query, _ = OPERACOES[nome]
+                                conn.execute("SAVEPOINT item")
+                                cur = conn.cursor()
+                                # prepare=False: um erro no meio do lote faria o
+                                # psycopg perder as queries que ele preparou sozinho
+                                cur.execute(query, params, prepare=False)
+                                conn.execute("RELEASE item")
+                                cursores.append(cur)
+                        except psycopg.Error as e:
+                            # O erro pode aparecer antes do fim do laço (o psycopg
+                            # lê respostas enquanto envia). Guardamos e deixamos o
+                            # 'with' sincronizar o pipeline normalmente.
+                            erro = e
+                except psycopg.Error as e:
+                    # Na sincronização do fim do bloco: o erro do item, ou
+                    # 'PipelineAborted' se o erro já tinha aparecido acima
+                    erro = erro or e
+
+                if isinstance(erro, psycopg.OperationalError):
+                    # Conexão perdida: não há o que recuperar
+                    raise erro
+
+                falhou = None
+                if erro:
+                    # O primeiro cursor sem resultado é o item que falhou;
+                    # os anteriores foram executados normalmente.
+                    # (se o erro surgiu antes de o cursor do item entrar na
+                    # lista, o item que falhou é o próximo da lista)
+                    falhou = next(
+                        (i for i, cur in enumerate(cursores) if cur.pgresult is None),
+                        len(cursores)
+                    )
+                    resultados[inicio + falhou]["erro"] = erro
+                    cursores = cursores[:falhou]
+
+                for deslocamento, cur in enumerate(cursores):
+                    resultado = resultados[inicio + deslocamento]
+                    resultado["rowcount"] = cur.rowcount
+                    if OPERACOES[resultado["operacao"]][1] == "id":
+                        resultado["id"] = cur.fetchone()[0]
+
+                if falhou is None:
+                    break
+
+                # Desfaz só o item que falhou e continua do próximo
+                conn.execute("ROLLBACK TO SAVEPOINT item")
+                conn.execute("RELEASE item")
+                inicio += falhou + 1
+
+    for resultado in resultados:
+        resultado["idas_e_voltas"] = idas_e_voltas
+    return resultados
+
+
+# 3. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    pool = ConnectionPool(
+        conninfo=psycopg.conninfo.make_conninfo(**DB_PARAMS),
+        min_size=2,
+        max_size=10,
+        open=False
+    )
+
+    with pool:
+        print("\n--- 1. Lote de escritas em pipeline ---")
+        operacoes = [
+            ("adicionar_afinidade", ('P0001', 'D001')),  # nova
+            ("adicionar_afinidade", ('P0001', 'D007')),  # já existe no init.sql
+            ("adicionar_afinidade", ('P0002', 'D001')),  # nova
+            ("atualizar_titulacao", ('Mestre', 'P0001')),
+            ("atualizar_titulacao", ('Doutor', 'P9999')),  # professor não existe
+        ]
+        inicio = time.perf_counter()
+        resultados = executar_escritas_em_pipeline(pool, operacoes)
+        duracao = time.perf_counter() - inicio
+
+        for (nome, params), res in zip(operacoes, resultados):
+            if isinstance(res["erro"], errors.UniqueViolation):
+                print(f"  AVISO: {nome}{params}: já existe no banco de dados.")
+            elif res["erro"]:
+                print(f"  FALHA: {nome}{params}: {res['erro']}")
+            elif res["id"] is not None:
+                print(f"  SUCESSO: {nome}{params}: novo ID {res['id']}.")
+            else:
+                print(f"  SUCESSO: {nome}{params}: {res['rowcount']} linha(s) alterada(s).")
+        print(f"  {len(operacoes)} operações em {duracao * 1000:.1f} ms ({resultados[0]['idas_e_voltas']} idas e voltas).")
+
+        print("\n--- 2. Desfazendo as afinidades criadas ---")
+        novos_ids = [res["id"] for res in resultados if res["id"] is not None]
+        executar_escritas_em_pipeline(pool, [("deletar_afinidade", (id_,)) for id_ in novos_ids])
+        print(f"  {len(novos_ids)} afinidades removidas.")
+
+
+if __name__ == "__main__":
+    main()
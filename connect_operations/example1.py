@@ -1,15 +1,11 @@
 import psycopg  # A biblioteca moderna para PostgreSQL
 from psycopg.rows import dict_row # Opcional: para retornar resultados como dicionários
 
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
 # 1. DETALHES DA CONEXÃO
-# Estes dados vêm diretamente do seu docker-compose.yml
-DB_PARAMS = {
-    "dbname": "faculdatabase",
-    "user": "admin",
-    "password": "admin123",
-    "host": "localhost",  # 'localhost' funciona pois você mapeou a porta 5432 para o seu host
-    "port": "5432"
-}
+# Os dados vêm do conexao.py: variáveis de ambiente (PGHOST, PGDATABASE...)
+# ou, se não existirem, os valores do seu docker-compose.yml
 
 # 2. FUNÇÃO DE LEITURA (SIMPLES)
 def listar_cursos(conn):
@@ -82,10 +78,12 @@ def buscar_aluno(conn, matricula):
 
 
 # 4. FUNÇÃO DE LEITURA (COMPLEXA - MÚLTIPLOS JOINS)
-def ver_horario_aluno(conn, matricula_aluno, semestre):
+def ver_horario_aluno(conn, matricula_aluno, semestre, materializado=False):
     """
     Monta o horário de um aluno para um semestre específico.
     Demonstra uma consulta complexa, pertinente ao seu esquema.
+    - Com 'materializado=True', lê da tabela 'horario_aluno_mat', que já
+      guarda o resultado dos JOINs (veja init_horario_materializado.sql).
     """
     print(f"\n--- 3. Horário do Aluno ({matricula_aluno}) no Semestre ({semestre}) ---")
     try:
@@ -93,23 +91,32 @@ def ver_horario_aluno(conn, matricula_aluno, semestre):
         # (ex: {'disciplina': 'Banco de Dados', 'professor': ...})
         # Isso é opcional, mas muito mais legível.
         with conn.cursor(row_factory=dict_row) as cur:
-            query = """
-            SELECT 
-                d.nome AS disciplina,
-                p.nome AS professor,
-                os.codigo_sala,
-                os.dia_semana,
-                os.horario_ini,
-                os.horario_fim
-            FROM horario_aluno ha
-            JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
-            JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
-            JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
-            JOIN professor prof ON ap.matricula_professor = prof.matricula
-            JOIN pessoa p ON prof.cpf = p.cpf
-            WHERE ha.matricula_aluno = %s AND os.semestre = %s
-            ORDER BY os.dia_semana, os.horario_ini;
-            """
+            if materializado:
+                # Uma tabela só, lida pelo índice (matricula_aluno, semestre)
+                query = """
+                SELECT disciplina, professor, codigo_sala, dia_semana, horario_ini, horario_fim
+                FROM horario_aluno_mat
+                WHERE matricula_aluno = %s AND semestre = %s
+                ORDER BY dia_semana, horario_ini;
+                """
+            else:
+                query = """
+                SELECT 
+                    d.nome AS disciplina,
+                    p.nome AS professor,
+                    os.codigo_sala,
+                    os.dia_semana,
+                    os.horario_ini,
+                    os.horario_fim
+                FROM horario_aluno ha
+                JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+                JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+                JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+                JOIN professor prof ON ap.matricula_professor = prof.matricula
+                JOIN pessoa p ON prof.cpf = p.cpf
+                WHERE ha.matricula_aluno = %s AND os.semestre = %s
+                ORDER BY os.dia_semana, os.horario_ini;
+                """
             cur.execute(query, (matricula_aluno, semestre))
             horario = cur.fetchall()
             
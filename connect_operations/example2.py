@@ -1,33 +1,29 @@
+import time
+from datetime import date
+from itertools import islice
+
 import psycopg
 from psycopg.rows import dict_row  # Para resultados como dicionários
-from psycopg.pool import ConnectionPool
+from psycopg_pool import ConnectionPool, PoolTimeout  # Pacote "psycopg-pool" (pip install "psycopg[pool]")
 from psycopg import errors # Para capturar erros específicos do Postgres
 
-# 1. DETALHES DA CONEXÃO (igual ao anterior)
-DB_PARAMS = {
-    "dbname": "faculdatabase",
-    "user": "admin",
-    "password": "admin123",
-    "host": "localhost",
-    "port": "5432"
-}
-
-# 2. CRIAÇÃO DO POOL DE CONEXÕES (A FORMA PROFISSIONAL)
-# Este pool será criado uma vez quando a aplicação iniciar.
-# min_size = 2 -> Manter pelo menos 2 conexões abertas o tempo todo.
-# max_size = 10 -> Permitir no máximo 10 conexões simultâneas.
-# **DB_PARAMS -> Passa todos os detalhes do nosso dicionário para o pool.
-try:
-    # O pool é a "caixa" que gerencia as conexões
-    pool = ConnectionPool(
-        conninfo=psycopg.conninfo.make_conninfo(**DB_PARAMS),
-        min_size=2,
-        max_size=10
-    )
-    print("--- Pool de Conexões criado com sucesso ---")
-except psycopg.OperationalError as e:
-    print(f"--- FALHA AO CRIAR POOL --- \nVerifique o Docker e as credenciais.\n{e}")
-    exit()
+from conexao import obter_pool  # Configuração única (conexao.py)
+
+# 1. DETALHES DA CONEXÃO
+# Vêm do conexao.py (variáveis de ambiente ou os valores do docker-compose.yml)
+
+# 2. O POOL DE CONEXÕES (A FORMA PROFISSIONAL)
+# Um pool com nome próprio ("example2") no conexao.py, para o 'check' valer
+# mesmo que outro módulo já tenha criado o pool "padrao":
+# min_size (DB_POOL_MIN, padrão 2) -> Conexões abertas o tempo todo.
+# max_size (DB_POOL_MAX, padrão 10) -> Máximo de conexões simultâneas.
+# É "preguiçoso": importar este arquivo não conecta no banco (nem encerra o
+#   programa se o Docker estiver parado). O pool nasce no primeiro uso ou
+#   no 'aquecer()' do main().
+# check -> Testa cada conexão antes de entregá-la: depois de um restart do
+#   Postgres, as conexões "mortas" são descartadas em vez de gerar erro.
+#   (Retentativas e disjuntor: veja pool_resiliente.py)
+pool = obter_pool("example2", check=ConnectionPool.check_connection)
 
 
 # 3. FUNÇÃO DE ESCRITA (ATUALIZADA)
@@ -141,6 +137,80 @@ def cadastrar_novos_alunos_em_lote(novos_alunos_data):
         print(f"  FALHA: Erro ao inserir alunos em lote: {e}")
 
 
+# 5.1 FUNÇÃO DE CARGA EM MASSA (COPY)
+def _como_data(valor):
+    """ Converte 'AAAA-MM-DD' em date (o formato binário do COPY exige o tipo certo). """
+    return date.fromisoformat(valor) if isinstance(valor, str) else valor
+
+
+def cadastrar_alunos_via_copy(novos_alunos_data, tamanho_lote=5000, binario=True):
+    """
+    Carga em massa de alunos usando 'COPY ... FROM STDIN'.
+    - O 'executemany' faz uma ida e volta ao banco por linha; o COPY
+      envia um fluxo contínuo de linhas em um único comando.
+    - Os dados são enviados em lotes de 'tamanho_lote' alunos. Em cada lote
+      fazemos um COPY em 'pessoa' e depois um em 'aluno' (por causa da FK).
+    - Tudo roda dentro de UMA transação: se um único CPF ou matrícula já
+      existir (UniqueViolation), NADA é gravado (rollback).
+    - 'novos_alunos_data' pode ser uma lista ou um gerador, no mesmo formato
+      de 'cadastrar_novos_alunos_em_lote'.
+
+    Retorna a lista de estatísticas por lote (ou None se houve rollback).
+    """
+    print(f"\n--- 6.1 Cadastrando Alunos em Massa (COPY, lotes de {tamanho_lote}) ---")
+
+    # FORMAT BINARY evita converter tudo para texto, mas exige declarar os tipos
+    formato = "(FORMAT BINARY)" if binario else ""
+    copy_pessoa = f"COPY pessoa (cpf, nome, email, data_nascimento) FROM STDIN {formato}"
+    copy_aluno = f"COPY aluno (matricula, cod_mec, data_inicio, cpf) FROM STDIN {formato}"
+
+    estatisticas = []
+    iterador = iter(novos_alunos_data)
+    try:
+        with pool.connection() as conn:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    while True:
+                        lote = list(islice(iterador, tamanho_lote))
+                        if not lote:
+                            break
+
+                        inicio = time.perf_counter()
+                        with cur.copy(copy_pessoa) as copy:
+                            if binario:
+                                copy.set_types(["text", "text", "text", "date"])
+                            for al in lote:
+                                cpf, nome, email, nascimento = al['pessoa']
+                                copy.write_row((cpf, nome, email, _como_data(nascimento)))
+
+                        with cur.copy(copy_aluno) as copy:
+                            if binario:
+                                copy.set_types(["text", "int4", "date", "text"])
+                            for al in lote:
+                                matricula, cod_mec, data_inicio, cpf = al['aluno']
+                                copy.write_row((matricula, cod_mec, _como_data(data_inicio), cpf))
+                        duracao = time.perf_counter() - inicio
+
+                        # Vazão do lote: quantos alunos (pessoa + aluno) por segundo
+                        vazao = len(lote) / duracao if duracao > 0 else float("inf")
+                        estatisticas.append({
+                            "lote": len(estatisticas) + 1,
+                            "alunos": len(lote),
+                            "segundos": duracao,
+                            "alunos_por_segundo": vazao,
+                        })
+                        print(f"  Lote {len(estatisticas)}: {len(lote)} alunos em {duracao:.3f}s ({vazao:,.0f} alunos/s)")
+
+        total = sum(e["alunos"] for e in estatisticas)
+        print(f"  SUCESSO: {total} novos alunos inseridos via COPY.")
+        return estatisticas
+
+    except errors.UniqueViolation as e:
+        print(f"  FALHA: Um dos CPFs ou Matrículas já existe. Nenhuma alteração foi feita (rollback).")
+    except psycopg.Error as e:
+        print(f"  FALHA: Erro ao inserir alunos via COPY: {e}")
+
+
 # 6. FUNÇÃO DE DELETE
 def deletar_afinidade(afinidade_id):
     """
@@ -174,6 +244,16 @@ def main():
     O bloco 'with pool:' garante que o pool será fechado corretamente
     ao final da execução do programa.
     """
+    # O pool é a "caixa" que gerencia as conexões.
+    # 'aquecer' abre as 'min_size' conexões em paralelo e espera por elas.
+    try:
+        segundos = pool.aquecer(timeout=10)
+        print(f"--- Pool de Conexões criado com sucesso ({segundos * 1000:.0f} ms) ---")
+    except PoolTimeout as e:
+        print(f"--- FALHA AO CRIAR POOL --- \nVerifique o Docker e as credenciais.\n{e}")
+        pool.close()
+        return
+
     with pool:
         # Exemplo 4: Adicionar uma nova (P0001 e D001)
         # (ID 697, com base no seu dump, será o próximo)
@@ -204,6 +284,10 @@ def main():
         ]
         cadastrar_novos_alunos_em_lote(novos_alunos)
 
+        # Exemplo 6.1: O mesmo cadastro via COPY (para turmas inteiras).
+        # Como os alunos acima já existem, isso demonstra o rollback total.
+        cadastrar_alunos_via_copy(novos_alunos)
+
         # Exemplo 7: Deletar a afinidade que criamos no primeiro passo
         # (Seu dump para em 696, então o primeiro INSERT deve ter criado o 697)
         deletar_afinidade(697) # ID 697
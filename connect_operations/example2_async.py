@@ -0,0 +1,205 @@
+import asyncio
+import time
+
+import psycopg
+from psycopg import errors  # Para capturar erros específicos do Postgres
+from psycopg_pool import AsyncConnectionPool
+
+from conexao import POOL_MAX, POOL_MIN, conninfo  # Configuração única (conexao.py)
+
+# 1. CRIAÇÃO DO POOL ASSÍNCRONO
+# É a versão 'asyncio' do ConnectionPool do example2.py.
+# Diferença importante: um pool assíncrono só pode ser aberto com o
+# event loop rodando, por isso criamos com 'open=False' e abrimos no main()
+# com 'async with pool:'.
+# Tamanhos: DB_POOL_MIN / DB_POOL_MAX (padrão 2 e 10), como os outros pools.
+pool = AsyncConnectionPool(
+    conninfo=conninfo(),
+    min_size=POOL_MIN,
+    max_size=POOL_MAX,
+    open=False
+)
+
+TITULACOES_VALIDAS = ('Graduado', 'Especialista', 'Mestre', 'Doutor', 'Pós-Doutor')
+
+
+# 2. FUNÇÃO DE ESCRITA (INSERT)
+async def adicionar_afinidade_com_tratamento(matricula_prof, cod_disciplina):
+    """
+    Mesma operação do example2.py, mas como corrotina.
+    - 'async with pool.connection()' NÃO bloqueia o programa enquanto espera:
+      outras corrotinas continuam rodando.
+    - Retorna o novo ID (ou None se a afinidade já existia / deu erro).
+    """
+    try:
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    query = """
+                    INSERT INTO afinidade_professor (matricula_professor, cod_disciplina, data_inclusao)
+                    VALUES (%s, %s, CURRENT_DATE)
+                    RETURNING id;
+                    """
+                    await cur.execute(query, (matricula_prof, cod_disciplina))
+                    novo_id = (await cur.fetchone())[0]
+                    print(f"  SUCESSO: Afinidade ({matricula_prof} -> {cod_disciplina}) adicionada. Novo ID: {novo_id}.")
+                    return novo_id
+
+    except errors.UniqueViolation:
+        print(f"  AVISO: A afinidade ({matricula_prof} -> {cod_disciplina}) já existe no banco de dados.")
+    except psycopg.Error as e:
+        print(f"  FALHA: Erro inesperado ao adicionar afinidade: {e}")
+
+
+# 3. FUNÇÃO UPDATE
+async def atualizar_titulacao_professor(matricula_prof, nova_titulacao):
+    """
+    Versão assíncrona do UPDATE de titulação.
+    Retorna o número de linhas alteradas (0 se o professor não existe).
+    """
+    if nova_titulacao not in TITULACOES_VALIDAS:
+        print(f"  FALHA: Titulação '{nova_titulacao}' é inválida.")
+        return 0
+
+    try:
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    query = "UPDATE professor SET titulacao = %s WHERE matricula = %s;"
+                    await cur.execute(query, (nova_titulacao, matricula_prof))
+
+                    if cur.rowcount > 0:
+                        print(f"  SUCESSO: Titulação do professor {matricula_prof} atualizada para {nova_titulacao}.")
+                    else:
+                        print(f"  AVISO: Professor {matricula_prof} não encontrado. Nenhuma alteração feita.")
+                    return cur.rowcount
+
+    except psycopg.Error as e:
+        print(f"  FALHA: Erro ao atualizar professor: {e}")
+        return 0
+
+
+# 4. FUNÇÃO DE INSERT EM LOTE
+async def cadastrar_novos_alunos_em_lote(novos_alunos_data):
+    """
+    Versão assíncrona do cadastro em lote (mesmo formato de dados do example2.py).
+    Continua sendo tudo-ou-nada: um UniqueViolation desfaz o lote inteiro.
+    Retorna quantos alunos foram inseridos.
+    """
+    try:
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    query = """
+                    INSERT INTO pessoa (cpf, nome, email, data_nascimento)
+                    VALUES (%s, %s, %s, %s);
+                    """
+                    await cur.executemany(query, [al['pessoa'] for al in novos_alunos_data])
+
+                    query_aluno = """
+                    INSERT INTO aluno (matricula, cod_mec, data_inicio, cpf)
+                    VALUES (%s, %s, %s, %s);
+                    """
+                    await cur.executemany(query_aluno, [al['aluno'] for al in novos_alunos_data])
+
+                    print(f"  SUCESSO: {len(novos_alunos_data)} novos registros de alunos inseridos.")
+                    return len(novos_alunos_data)
+
+    except errors.UniqueViolation:
+        print(f"  FALHA: Um dos CPFs ou Matrículas já existe. Nenhuma alteração foi feita (rollback).")
+    except psycopg.Error as e:
+        print(f"  FALHA: Erro ao inserir alunos em lote: {e}")
+    return 0
+
+
+# 5. FUNÇÃO DE DELETE
+async def deletar_afinidade(afinidade_id):
+    """
+    Versão assíncrona do DELETE de afinidade.
+    Retorna o número de linhas removidas.
+    """
+    try:
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    query = "DELETE FROM afinidade_professor WHERE id = %s;"
+                    await cur.execute(query, (afinidade_id,))
+
+                    if cur.rowcount > 0:
+                        print(f"  SUCESSO: Afinidade ID {afinidade_id} deletada.")
+                    else:
+                        print(f"  AVISO: Nenhuma afinidade com ID {afinidade_id} foi encontrada.")
+                    return cur.rowcount
+
+    except psycopg.Error as e:
+        print(f"  FALHA: Erro ao deletar afinidade: {e}")
+        return 0
+
+
+# 6. EXECUÇÃO CONCORRENTE COM LIMITE (FAN-OUT)
+async def executar_em_lote(operacoes, max_concorrencia=None):
+    """
+    Executa várias operações independentes AO MESMO TEMPO.
+    - 'operacoes' é uma lista de funções sem argumentos que devolvem uma
+      corrotina (ex: lambda: deletar_afinidade(697)). Usamos funções, e não
+      corrotinas prontas, para que nada comece antes de ter uma vaga.
+    - Um 'asyncio.Semaphore' limita quantas rodam de uma vez. Por padrão,
+      o limite é o 'max_size' do pool: mais que isso só ficaria na fila do pool.
+    - O tempo total fica perto do tempo da operação MAIS LENTA, e não da
+      soma de todas (como acontece chamando uma depois da outra).
+
+    Retorna os resultados na mesma ordem das operações. Se alguma levantar
+    exceção, a exceção aparece no lugar do resultado (as outras continuam).
+    """
+    limite = asyncio.Semaphore(max_concorrencia or pool.max_size)
+
+    async def _executar(operacao):
+        async with limite:
+            return await operacao()
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(
+        *(_executar(op) for op in operacoes),
+        return_exceptions=True
+    )
+    duracao = time.perf_counter() - inicio
+    print(f"  {len(operacoes)} operações concluídas em {duracao:.3f}s.")
+    return resultados
+
+
+# 7. FUNÇÃO PRINCIPAL (MAIN)
+async def main():
+    """
+    Orquestra as chamadas. O 'async with pool:' abre o pool (com o event loop
+    já rodando) e garante que ele será fechado no final.
+    """
+    async with pool:
+        print("\n--- 1. Adicionando Afinidades em Paralelo ---")
+        # Todas as afinidades são independentes, então podem rodar juntas.
+        # (P0001 -> D007 já existe no init.sql: vai dar UniqueViolation)
+        novos_ids = await executar_em_lote([
+            lambda: adicionar_afinidade_com_tratamento('P0001', 'D001'),
+            lambda: adicionar_afinidade_com_tratamento('P0001', 'D007'),
+            lambda: adicionar_afinidade_com_tratamento('P0002', 'D001'),
+        ])
+
+        print("\n--- 2. Atualizando Titulações em Paralelo ---")
+        # 'prof=prof' fixa o valor de cada volta do laço dentro da lambda
+        await executar_em_lote([
+            lambda prof=prof: atualizar_titulacao_professor(prof, 'Mestre')
+            for prof in ('P0001', 'P0002', 'P0003', 'P9999')
+        ])
+
+        print("\n--- 3. Desfazendo as Afinidades Criadas ---")
+        await executar_em_lote([
+            lambda id_=id_: deletar_afinidade(id_)
+            for id_ in novos_ids if isinstance(id_, int)
+        ])
+
+        print("\n--- FIM DAS OPERAÇÕES (POOL SERÁ FECHADO) ---")
+
+
+# Ponto de entrada padrão
+if __name__ == "__main__":
+    # 'asyncio.run' cria o event loop, executa o main() e fecha o loop.
+    asyncio.run(main())
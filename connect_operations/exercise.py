@@ -16,14 +16,8 @@ import psycopg
 from psycopg import errors # Útil para tratar erros específicos
 
 # 1. DETALHES DA CONEXÃO (Pré-preenchido)
-# Estes dados vêm do seu docker-compose.yml
-DB_PARAMS = {
-    "dbname": "faculdatabase",
-    "user": "admin",
-    "password": "admin123",
-    "host": "localhost",
-    "port": "5432"
-}
+# Estes dados vêm do conexao.py (variáveis de ambiente ou o docker-compose.yml)
+from conexao import DB_PARAMS
 
 # --------------------------------------------------------------------------
 # EXERCÍCIO 1: LER DADOS (SELECT)
@@ -0,0 +1,260 @@
+# exportacao_colunar.py
+#
+# Exportação de tabelas/consultas em formato COLUNAR (Arrow, Parquet, NumPy).
+#
+# Para análise (notebooks), copiar 'horario_aluno', 'oferta_semestre' ou
+# 'pessoa' com 'fetchall()' cria uma tupla Python por linha e um objeto
+# Python por valor: lento e pesado.
+#
+# Aqui o Postgres envia o resultado com 'COPY (...) TO STDOUT' (CSV) e o
+# leitor de CSV do Arrow (escrito em C++) converte os blocos direto em
+# colunas ("record batches"), sem passar por objetos Python linha a linha.
+# - Cada lote tem no máximo ~'tamanho_bloco' bytes de CSV: a memória fica
+#   limitada mesmo para tabelas enormes.
+# - Os lotes vão sendo gravados no arquivo Parquet um a um.
+# - Colunas ENUM (modalidade_enum, titulacao_enum, tipo_sala_enum,
+#   sexo_enum) viram colunas "dicionário": cada valor distinto é guardado
+#   uma vez e as linhas guardam só um índice.
+#
+# Dependência OPCIONAL (não é usada pelo resto do projeto):
+#   pip install pyarrow numpy
+#
+# Uso (dentro da pasta connect_operations):
+#   python exportacao_colunar.py --pasta exportacao
+#   python exportacao_colunar.py --tabelas pessoa professor --pasta exportacao
+
+import argparse
+import io
+import os
+import time
+
+import psycopg
+from psycopg import sql
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # Pacote opcional: pip install pyarrow
+    pa = None
+
+TABELAS_PADRAO = ["horario_aluno", "oferta_semestre", "pessoa", "professor", "salas", "curso"]
+BLOCO_PADRAO = 4 * 1024 * 1024  # 4 MB de CSV por lote
+
+
+def _exigir_pyarrow():
+    if pa is None:
+        raise ImportError('A exportação colunar precisa do pacote "pyarrow" (pip install pyarrow numpy).')
+
+
+# 1. TIPOS: POSTGRES -> ARROW
+def _tipos_arrow():
+    # Nome do tipo no Postgres -> tipo Arrow. O que não estiver aqui vira texto.
+    # 'numeric' com precisão declarada (ex: numeric(10,2)) vira decimal128
+    # exato (ver 'descrever_colunas'); SEM precisão vira float64, que perde
+    # dígitos depois do ~15º.
+    return {
+        "int2": pa.int16(), "int4": pa.int32(), "int8": pa.int64(),
+        "float4": pa.float32(), "float8": pa.float64(), "numeric": pa.float64(),
+        "bool": pa.bool_(),
+        "date": pa.date32(), "time": pa.time64("us"), "timestamp": pa.timestamp("us"),
+        "text": pa.string(), "varchar": pa.string(), "bpchar": pa.string(),
+    }
+
+
+def descrever_colunas(conn, query, params=None):
+    """
+    Descobre nomes e tipos Arrow das colunas de 'query' sem trazer dados
+    ('LIMIT 0'). Colunas ENUM viram dictionary<int32, string>; 'numeric(p,s)'
+    vira decimal128(p, s).
+    Retorna uma lista de (nome, tipo_arrow).
+    """
+    _exigir_pyarrow()
+    consulta = sql.SQL("SELECT * FROM ({}) AS q LIMIT 0").format(sql.SQL(query.strip().rstrip(";")))
+    with conn.cursor() as cur:
+        cur.execute(consulta, params)
+        descricao = cur.description
+        oids = [coluna.type_code for coluna in descricao]
+        cur.execute(
+            "SELECT oid, typname, typtype = 'e' FROM pg_type WHERE oid = ANY(%s);", (oids,)
+        )
+        tipos_pg = {oid: (nome, enum) for oid, nome, enum in cur.fetchall()}
+
+    tipos = _tipos_arrow()
+    colunas = []
+    for coluna in descricao:
+        nome_tipo, enum = tipos_pg[coluna.type_code]
+        if enum:
+            tipo = pa.dictionary(pa.int32(), pa.string())
+        elif nome_tipo == "numeric" and coluna.precision is not None and coluna.precision <= 38:
+            tipo = pa.decimal128(coluna.precision, coluna.scale or 0)
+        else:
+            tipo = tipos.get(nome_tipo, pa.string())
+        colunas.append((coluna.name, tipo))
+    return colunas
+
+
+# 2. COPY -> LOTES ARROW
+class _LeitorCopy(io.RawIOBase):
+    """
+    Expõe os blocos de um 'COPY ... TO STDOUT' como um arquivo binário.
+    O psycopg entrega o COPY em pedaços pequenos (uma linha cada); aqui
+    juntamos pedaços até encher o pedido de leitura, para o Arrow receber
+    blocos do tamanho que pediu (e não lotes de uma linha).
+    """
+
+    def __init__(self, copy, inicio=b""):
+        self._copy = copy
+        self._buffer = bytearray(inicio)
+        self._fim = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        while len(self._buffer) < len(destino) and not self._fim:
+            bloco = self._copy.read()
+            if bloco:
+                self._buffer += bloco
+            else:
+                self._fim = True  # b"" quando o COPY termina
+        n = min(len(destino), len(self._buffer))
+        destino[:n] = self._buffer[:n]
+        del self._buffer[:n]
+        return n
+
+
+def lotes_arrow(conn, query, params=None, tamanho_bloco=BLOCO_PADRAO):
+    """
+    Gera os resultados de 'query' como 'pyarrow.RecordBatch', lendo
+    ~'tamanho_bloco' bytes por vez do COPY.
+    - Texto NULL e texto vazio continuam diferentes (no CSV do Postgres, NULL
+      é um campo vazio sem aspas e '' é '""').
+    - Texto com quebra de linha (ex: 'disciplina.ementa') vem entre aspas;
+      'newlines_in_values' faz o Arrow não cortar os blocos no meio dele.
+    - Consuma o gerador até o fim: o COPY ocupa a conexão enquanto isso.
+    """
+    colunas = descrever_colunas(conn, query, params)
+    read_options = pa_csv.ReadOptions(
+        column_names=[nome for nome, _ in colunas],
+        block_size=tamanho_bloco,
+        # Sem threads de leitura: o 'COPY' do psycopg só pode ser lido por
+        # uma thread de cada vez
+        use_threads=False,
+    )
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=dict(colunas),
+        null_values=[""],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+        # O CSV do Postgres escreve booleanos como 't' / 'f'
+        true_values=["t"],
+        false_values=["f"],
+    )
+    copy_sql = sql.SQL("COPY ({}) TO STDOUT (FORMAT csv)").format(sql.SQL(query.strip().rstrip(";")))
+
+    with conn.cursor() as cur:
+        with cur.copy(copy_sql, params) as copy:
+            primeiro = copy.read()
+            if not primeiro:
+                # Resultado vazio: o leitor de CSV do Arrow não aceita entrada vazia
+                return
+            leitor = pa_csv.open_csv(
+                _LeitorCopy(copy, primeiro), read_options=read_options,
+                parse_options=parse_options, convert_options=convert_options,
+            )
+            yield from leitor
+
+
+# 3. DESTINOS: PARQUET, TABELA ARROW, NUMPY
+def exportar_parquet(conn, query, caminho, params=None, tamanho_bloco=BLOCO_PADRAO, compressao="zstd"):
+    """
+    Grava o resultado de 'query' em um arquivo Parquet, lote a lote
+    (cada lote vira um "row group"). Retorna quantas linhas foram gravadas.
+    O arquivo é escrito com outro nome e renomeado no final: quem lê nunca
+    vê um Parquet pela metade.
+    """
+    temporario = f"{caminho}.tmp"
+    linhas = 0
+    escritor = None
+    try:
+        for lote in lotes_arrow(conn, query, params, tamanho_bloco):
+            if escritor is None:
+                escritor = pq.ParquetWriter(temporario, lote.schema, compression=compressao)
+            escritor.write_batch(lote)
+            linhas += lote.num_rows
+        if escritor is None:
+            # Resultado vazio: ainda assim gravamos o arquivo com as colunas
+            schema = pa.schema(descrever_colunas(conn, query, params))
+            escritor = pq.ParquetWriter(temporario, schema, compression=compressao)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    os.replace(temporario, caminho)
+    return linhas
+
+
+def tabela_arrow(conn, query, params=None, tamanho_bloco=BLOCO_PADRAO):
+    """ Resultado inteiro como 'pyarrow.Table' (precisa caber na memória). """
+    lotes = list(lotes_arrow(conn, query, params, tamanho_bloco))
+    if not lotes:
+        return pa.schema(descrever_colunas(conn, query, params)).empty_table()
+    return pa.Table.from_batches(lotes)
+
+
+def para_numpy(conn, query, params=None, tamanho_bloco=BLOCO_PADRAO):
+    """
+    Resultado como {coluna: numpy.ndarray}.
+    Números e datas viram arrays nativos; texto e ENUM viram arrays de objetos.
+    """
+    tabela = tabela_arrow(conn, query, params, tamanho_bloco)
+    return {
+        nome: tabela.column(nome).to_numpy()
+        for nome in tabela.column_names
+    }
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Exporta tabelas para Parquet via COPY.")
+    parser.add_argument("--dbname", default=DB_PARAMS["dbname"])
+    parser.add_argument("--tabelas", nargs="+", default=TABELAS_PADRAO)
+    parser.add_argument("--pasta", default="exportacao")
+    parser.add_argument("--tamanho-bloco", type=int, default=BLOCO_PADRAO, help="bytes de CSV por lote")
+    args = parser.parse_args()
+
+    _exigir_pyarrow()
+    os.makedirs(args.pasta, exist_ok=True)
+
+    with psycopg.connect(**{**DB_PARAMS, "dbname": args.dbname}) as conn:
+        print(f"\n--- 1. Exportando {len(args.tabelas)} tabelas para '{args.pasta}' ---")
+        for tabela in args.tabelas:
+            query = sql.SQL("SELECT * FROM {}").format(sql.Identifier(tabela)).as_string(conn)
+            caminho = os.path.join(args.pasta, f"{tabela}.parquet")
+            inicio = time.perf_counter()
+            linhas = exportar_parquet(conn, query, caminho, tamanho_bloco=args.tamanho_bloco)
+            duracao = time.perf_counter() - inicio
+            print(
+                f"  {tabela:<18} {linhas:>8} linhas em {duracao * 1000:>7.1f} ms"
+                f" ({os.path.getsize(caminho) / 1024:.0f} KB)"
+            )
+
+        print("\n--- 2. Esquema de 'professor' (titulacao_enum como dicionário) ---")
+        print(pq.read_schema(os.path.join(args.pasta, "professor.parquet"))
+              if "professor" in args.tabelas else "  (tabela não exportada)")
+
+        print("\n--- 3. Texto com quebras de linha em vários blocos ---")
+        query = "SELECT n, repeat('linha ' || n || E'\\n', 20) AS texto FROM generate_series(1, 500) AS n"
+        tabela = tabela_arrow(conn, query, tamanho_bloco=4096)
+        with conn.cursor() as cur:
+            cur.execute(query)
+            esperado = [texto for _, texto in cur.fetchall()]
+        ok = tabela.column("texto").to_pylist() == esperado
+        print(f"  {tabela.num_rows} linhas em {len(tabela.to_batches())} lotes: {'OK' if ok else 'DIFERENTE'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# gerador_dados.py
+#
+# Gera dados SINTÉTICOS para o esquema da faculdade, em escala configurável.
+#
+# O init.sql tem poucas centenas de linhas (200 alunos, 50 professores,
+# 40 ofertas em um único semestre). Para testar desempenho precisamos de
+# algo parecido com uma universidade real: 100 mil alunos, vários semestres.
+#
+# O fator de escala multiplica o tamanho do init.sql:
+#   --escala 1    ->    200 alunos,    50 professores,    40 ofertas/semestre
+#   --escala 100  ->  20000 alunos,  5000 professores,  4000 ofertas/semestre
+#   --escala 1000 -> 200000 alunos, 50000 professores, 40000 ofertas/semestre
+#
+# Regras respeitadas:
+# - chaves únicas (cpf, email, matrículas, (professor, disciplina),
+#   (aluno, oferta)) nunca se repetem, nem com os dados do init.sql;
+# - os ENUMs (sexo_enum, titulacao_enum, tipo_sala_enum) só recebem valores válidos;
+# - nenhuma sala e nenhum professor tem duas ofertas no mesmo horário;
+# - cursos e disciplinas são os do init.sql.
+#
+# A carga usa COPY (veja 'cadastrar_alunos_via_copy' no example2.py) em UMA
+# transação, e no final ajusta as sequências (setval), como o init.sql faz.
+#
+# Uso (dentro da pasta connect_operations):
+#   python gerador_dados.py --escala 100 --semestres 6
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import psycopg
+from psycopg import errors
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+# 1. VALORES POSSÍVEIS (iguais aos ENUMs do init.sql)
+SEXOS = ('Masculino', 'Feminino', 'Outro', 'Não Informado')
+TITULACOES = ('Graduado', 'Especialista', 'Mestre', 'Doutor', 'Pós-Doutor')
+TIPOS_SALA = ('Sala de Aula', 'Laboratório', 'Auditório')
+DIAS = ('Seg', 'Ter', 'Qua', 'Qui', 'Sex')
+# Blocos de 2 horas, das 08h às 22h
+BLOCOS = tuple((f"{h:02d}:00:00", f"{h + 2:02d}:00:00") for h in range(8, 22, 2))
+
+NOMES = ('Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor',
+         'Isabela', 'João', 'Larissa', 'Lucas', 'Mariana', 'Miguel', 'Natália', 'Pedro',
+         'Rafael', 'Sofia', 'Thiago', 'Valentina')
+SOBRENOMES = ('Almeida', 'Barbosa', 'Cardoso', 'Costa', 'Ferreira', 'Gomes', 'Lima',
+              'Martins', 'Moreira', 'Oliveira', 'Pereira', 'Ribeiro', 'Rocha', 'Santos',
+              'Silva', 'Souza')
+
+# 2. TAMANHO DO init.sql (escala 1)
+BASE_ALUNOS = 200
+BASE_PROFESSORES = 50
+BASE_AFINIDADES = 97
+BASE_SALAS = 10
+BASE_OFERTAS_POR_SEMESTRE = 40
+DISCIPLINAS_POR_ALUNO = 3  # ofertas cursadas por aluno em cada semestre
+
+
+def semestres_ate(ultimo, quantidade):
+    """ Lista 'quantidade' semestres terminando em 'ultimo'. Ex: ('2025.1', 3) -> 2024.1, 2024.2, 2025.1 """
+    ano, periodo = map(int, ultimo.split("."))
+    lista = []
+    for _ in range(quantidade):
+        lista.append(f"{ano}.{periodo}")
+        ano, periodo = (ano, 1) if periodo == 2 else (ano - 1, 2)
+    return lista[::-1]
+
+
+def _data_aleatoria(rng, inicio, fim):
+    return inicio + timedelta(days=rng.randrange((fim - inicio).days))
+
+
+def _nome(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+
+
+# 3. O GERADOR
+class GeradorDados:
+    """
+    Gera as linhas de cada tabela como GERADORES Python: nada é montado em
+    listas gigantes, as linhas vão direto para o COPY.
+    Com a mesma 'semente', os dados gerados são sempre os mesmos.
+    """
+
+    def __init__(self, conn, escala=1, semestres=1, ultimo_semestre='2025.1', semente=42, prefixo='G'):
+        self.rng = random.Random(semente)
+        self.prefixo = prefixo
+        self.n_alunos = BASE_ALUNOS * escala
+        self.n_professores = BASE_PROFESSORES * escala
+        self.n_afinidades = BASE_AFINIDADES * escala
+        self.n_salas = BASE_SALAS * escala
+        self.ofertas_por_semestre = BASE_OFERTAS_POR_SEMESTRE * escala
+        self.semestres = semestres_ate(ultimo_semestre, semestres)
+
+        # O que já existe no banco e precisamos respeitar
+        with conn.cursor() as cur:
+            cur.execute("SELECT cod_mec FROM curso ORDER BY cod_mec;")
+            self.cursos = [linha[0] for linha in cur.fetchall()]
+            cur.execute("SELECT cod_disciplina FROM disciplina ORDER BY cod_disciplina;")
+            self.disciplinas = [linha[0] for linha in cur.fetchall()]
+            # Novos CPFs começam depois do maior CPF existente
+            cur.execute("SELECT COALESCE(MAX(cpf::bigint), 0) FROM pessoa;")
+            self.primeiro_cpf = cur.fetchone()[0] + 1
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM afinidade_professor;")
+            self.primeiro_id_afinidade = cur.fetchone()[0] + 1
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM oferta_semestre;")
+            self.primeiro_id_oferta = cur.fetchone()[0] + 1
+
+        if self.n_afinidades > self.n_professores * len(self.disciplinas):
+            raise ValueError("Afinidades demais para o número de professores x disciplinas.")
+        if self.ofertas_por_semestre > self.n_salas * len(DIAS) * len(BLOCOS):
+            raise ValueError("Ofertas demais para caber nas salas sem conflito de horário.")
+        if self.n_salas < 1 or self.n_professores < self.n_salas:
+            raise ValueError("É preciso ter pelo menos tantos professores quanto salas.")
+
+    # --- Chaves derivadas do número sequencial 'n' ---
+    def cpf(self, n):
+        return f"{self.primeiro_cpf + n:011d}"
+
+    def matricula_aluno(self, n):
+        return f"{self.prefixo}A{n:07d}"
+
+    def matricula_professor(self, n):
+        return f"{self.prefixo}P{n:06d}"
+
+    def codigo_sala(self, n):
+        return f"{self.prefixo}S{n:05d}"
+
+    # --- Linhas de cada tabela ---
+    def pessoas(self):
+        # Primeiro os professores (n = 0 .. P-1), depois os alunos (n = P ..)
+        total = self.n_professores + self.n_alunos
+        # Idades calculadas a partir do último semestre (e não de hoje), para
+        # que a mesma semente gere sempre os mesmos dados
+        ano = int(self.semestres[-1].split(".")[0])
+        for n in range(total):
+            aluno = n >= self.n_professores
+            nascimento = _data_aleatoria(
+                self.rng,
+                date(ano - (30 if aluno else 70), 1, 1),
+                date(ano - (17 if aluno else 25), 1, 1)
+            )
+            yield (
+                self.cpf(n),
+                _nome(self.rng),
+                f"{self.prefixo.lower()}{n}@gerado.exemplo.com",
+                self.rng.choice(SEXOS),
+                nascimento,
+                f"9{self.rng.randrange(10 ** 8):08d}",
+            )
+
+    def professores(self):
+        for n in range(self.n_professores):
+            yield (
+                self.matricula_professor(n),
+                self.rng.choice(TITULACOES),
+                _data_aleatoria(self.rng, date(1995, 1, 1), date(2025, 1, 1)),
+                self.cpf(n),
+            )
+
+    def alunos(self):
+        for n in range(self.n_alunos):
+            yield (
+                self.matricula_aluno(n),
+                self.rng.choice(self.cursos),
+                _data_aleatoria(self.rng, date(2015, 1, 1), date(2025, 1, 1)),
+                self.cpf(self.n_professores + n),
+            )
+
+    def salas(self):
+        for n in range(self.n_salas):
+            yield (self.codigo_sala(n), self.rng.choice(TIPOS_SALA), self.rng.choice((30, 40, 50, 60, 80, 120)))
+
+    def afinidades(self):
+        # A afinidade 'j' pertence ao professor 'j % P': afinidades seguidas
+        # são sempre de professores diferentes (usado nas ofertas abaixo).
+        # Como j // P < número de disciplinas, (professor, disciplina) não repete.
+        for j in range(self.n_afinidades):
+            yield (
+                self.primeiro_id_afinidade + j,
+                self.matricula_professor(j % self.n_professores),
+                self.disciplinas[(j // self.n_professores) % len(self.disciplinas)],
+                _data_aleatoria(self.rng, date(2010, 1, 1), date(2025, 1, 1)),
+                None,
+            )
+
+    def ofertas(self):
+        """
+        A oferta 'k' de cada semestre ocupa a sala 'k % S' no horário 'k // S'.
+        - No mesmo horário, todas as salas são diferentes (sem conflito de sala).
+        - No mesmo horário, as afinidades são seguidas, logo de professores
+          diferentes (sem conflito de professor, pois S <= P).
+        """
+        id_oferta = self.primeiro_id_oferta
+        horarios = [(dia, ini, fim) for dia in DIAS for ini, fim in BLOCOS]
+        for semestre in self.semestres:
+            for k in range(self.ofertas_por_semestre):
+                dia, ini, fim = horarios[k // self.n_salas]
+                yield (
+                    id_oferta,
+                    semestre,
+                    self.primeiro_id_afinidade + k % self.n_afinidades,
+                    self.codigo_sala(k % self.n_salas),
+                    dia, ini, fim,
+                )
+                id_oferta += 1
+
+    def horarios_alunos(self):
+        # Cada aluno cursa DISCIPLINAS_POR_ALUNO ofertas distintas por semestre
+        sequencia = 0
+        for s in range(len(self.semestres)):
+            primeira = self.primeiro_id_oferta + s * self.ofertas_por_semestre
+            ids_semestre = range(primeira, primeira + self.ofertas_por_semestre)
+            for n in range(self.n_alunos):
+                for id_oferta in self.rng.sample(ids_semestre, DISCIPLINAS_POR_ALUNO):
+                    yield (f"{self.prefixo}{sequencia:013d}", self.matricula_aluno(n), id_oferta)
+                    sequencia += 1
+
+
+# 4. CARGA VIA COPY
+# Ordem de carga = ordem das chaves estrangeiras
+TABELAS = (
+    ("pessoa", "cpf, nome, email, sexo, data_nascimento, telefone", "pessoas"),
+    ("professor", "matricula, titulacao, data_admissao, cpf", "professores"),
+    ("aluno", "matricula, cod_mec, data_inicio, cpf", "alunos"),
+    ("salas", "codigo, tipo, capacidade", "salas"),
+    ("afinidade_professor", "id, matricula_professor, cod_disciplina, data_inclusao, data_encerramento", "afinidades"),
+    ("oferta_semestre", "id, semestre, id_afinidade_professor, codigo_sala, dia_semana, horario_ini, horario_fim", "ofertas"),
+    ("horario_aluno", "id, matricula_aluno, id_oferta_semestre", "horarios_alunos"),
+)
+
+
+def carregar(conn, gerador):
+    """
+    Copia todas as tabelas em uma única transação: se algo falhar (ex: o
+    mesmo prefixo já foi usado antes), nada fica pela metade.
+    """
+    with conn.transaction():
+        with conn.cursor() as cur:
+            for tabela, colunas, metodo in TABELAS:
+                inicio = time.perf_counter()
+                linhas = 0
+                # Formato texto: deixa o Postgres converter os ENUMs pelo nome
+                with cur.copy(f'COPY "{tabela}" ({colunas}) FROM STDIN') as copy:
+                    for linha in getattr(gerador, metodo)():
+                        copy.write_row(linha)
+                        linhas += 1
+                duracao = time.perf_counter() - inicio
+                print(f"  {tabela:<20} {linhas:>10} linhas em {duracao:7.2f}s ({linhas / max(duracao, 1e-9):,.0f} linhas/s)")
+
+            # Como passamos os IDs explicitamente, as sequências SERIAL não
+            # andaram. Ajustamos igual ao init.sql: o próximo valor será MAX + 1.
+            for tabela in ("afinidade_professor", "oferta_semestre"):
+                cur.execute(
+                    f"SELECT setval(pg_get_serial_sequence('\"{tabela}\"', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 0) + 1 FROM \"{tabela}\"), false);"
+                )
+
+    # Estatísticas atualizadas para o planejador escolher bons planos
+    with conn.cursor() as cur:
+        for tabela, _, _ in TABELAS:
+            cur.execute(f'ANALYZE "{tabela}";')
+    conn.commit()
+
+
+# 5. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para o banco da faculdade.")
+    parser.add_argument("--escala", type=int, default=1, help="multiplicador do tamanho do init.sql")
+    parser.add_argument("--semestres", type=int, default=1, help="quantos semestres gerar")
+    parser.add_argument("--ultimo-semestre", default="2025.1")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--prefixo", default="G", help="prefixo das matrículas/códigos gerados")
+    parser.add_argument("--dbname", default=DB_PARAMS["dbname"])
+    args = parser.parse_args()
+
+    with psycopg.connect(**{**DB_PARAMS, "dbname": args.dbname}) as conn:
+        gerador = GeradorDados(
+            conn, escala=args.escala, semestres=args.semestres,
+            ultimo_semestre=args.ultimo_semestre, semente=args.semente, prefixo=args.prefixo
+        )
+        print(f"--- Gerando escala {args.escala}x, semestres {gerador.semestres[0]} a {gerador.semestres[-1]} ---")
+        inicio = time.perf_counter()
+        try:
+            carregar(conn, gerador)
+        except errors.UniqueViolation as e:
+            print(f"  FALHA: Dados com o prefixo '{args.prefixo}' já existem. Use outro --prefixo (rollback).\n  {e}")
+            return
+        print(f"--- Carga concluída em {time.perf_counter() - inicio:.1f}s ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# horario_lote.py
+#
+# Horários de VÁRIOS alunos em uma única consulta.
+#
+# O 'ver_horario_aluno' do example1.py busca um aluno por vez. Para montar
+# os horários de uma turma inteira (ou dos orientandos de um professor), o
+# portal chamava a mesma consulta de 5 JOINs centenas de vezes.
+#
+# Aqui passamos TODAS as matrículas de uma vez com '= ANY(%s)' (o psycopg
+# converte a lista Python em um array do Postgres) e agrupamos o resultado
+# por aluno no Python.
+#
+# Por cima disso, 'CacheHorarios' guarda os horários já buscados de cada
+# (semestre, aluno). Em uma nova requisição, só os alunos que ainda não
+# estão no cache vão ao banco, de novo em uma única consulta.
+
+import threading
+import time
+
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+QUERY_HORARIOS = """
+SELECT
+    ha.matricula_aluno,
+    d.nome AS disciplina,
+    p.nome AS professor,
+    os.codigo_sala,
+    os.dia_semana,
+    os.horario_ini,
+    os.horario_fim
+FROM horario_aluno ha
+JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+JOIN professor prof ON ap.matricula_professor = prof.matricula
+JOIN pessoa p ON prof.cpf = p.cpf
+WHERE ha.matricula_aluno = ANY(%s) AND os.semestre = %s
+ORDER BY ha.matricula_aluno, os.dia_semana, os.horario_ini;
+"""
+
+# Mesma consulta na tabela desnormalizada (veja init_horario_materializado.sql)
+QUERY_HORARIOS_MAT = """
+SELECT matricula_aluno, disciplina, professor, codigo_sala, dia_semana, horario_ini, horario_fim
+FROM horario_aluno_mat
+WHERE matricula_aluno = ANY(%s) AND semestre = %s
+ORDER BY matricula_aluno, dia_semana, horario_ini;
+"""
+
+
+# 1. CONSULTA EM LOTE
+def ver_horarios_alunos(conn, matriculas, semestre, materializado=False):
+    """
+    Busca os horários de todos os alunos de 'matriculas' no 'semestre'.
+    Retorna um dicionário {matricula: [itens do horário]}, com TODAS as
+    matrículas pedidas (lista vazia para quem não tem horário).
+    Cada item tem as mesmas chaves do 'ver_horario_aluno' do example1.py.
+    - Com 'materializado=True', lê da tabela 'horario_aluno_mat' (sem JOINs).
+    """
+    # 'dict.fromkeys' remove repetidas mantendo a ordem
+    matriculas = list(dict.fromkeys(matriculas))
+    horarios = {matricula: [] for matricula in matriculas}
+    if not matriculas:
+        return horarios
+
+    with conn.cursor(row_factory=dict_row) as cur:
+        query = QUERY_HORARIOS_MAT if materializado else QUERY_HORARIOS
+        cur.execute(query, (matriculas, semestre))
+        for item in cur:
+            horarios[item.pop("matricula_aluno")].append(item)
+    return horarios
+
+
+# 2. CACHE (MEMOIZAÇÃO) POR SEMESTRE
+class CacheHorarios:
+    """
+    Guarda o horário de cada (semestre, matrícula) por 'ttl' segundos.
+    - 'buscar' devolve os horários pedidos; os que faltam no cache vêm do
+      banco em UMA consulta.
+    - 'invalidar' descarta um semestre (ex: depois de uma rematrícula) ou tudo.
+    - Cada semestre guarda no máximo 'max_alunos'; passando disso, saem os
+      horários guardados há mais tempo.
+    """
+
+    def __init__(self, pool, ttl=600, max_alunos=100_000, materializado=False):
+        self.pool = pool
+        self.materializado = materializado
+        self.ttl = ttl
+        self.max_alunos = max_alunos
+        self._lock = threading.Lock()
+        self._semestres = {}  # semestre -> {matricula: (horario, expira_em)}
+        # "Gerações": mudam a cada 'invalidar'. Uma leitura do banco que
+        # começou ANTES de uma invalidação não é gravada no cache (seriam
+        # horários de antes da rematrícula)
+        self._geracao_geral = 0
+        self._geracoes = {}  # semestre -> contador
+        self.acertos = 0
+        self.falhas = 0
+
+    def buscar(self, matriculas, semestre):
+        matriculas = list(dict.fromkeys(matriculas))
+        agora = time.monotonic()
+        resultado = {}
+        faltando = []
+
+        with self._lock:
+            cache = self._semestres.setdefault(semestre, {})
+            for matricula in matriculas:
+                entrada = cache.get(matricula)
+                if entrada and entrada[1] > agora:
+                    resultado[matricula] = entrada[0]
+                else:
+                    faltando.append(matricula)
+            self.acertos += len(matriculas) - len(faltando)
+            self.falhas += len(faltando)
+            geracao = (self._geracao_geral, self._geracoes.get(semestre, 0))
+
+        if faltando:
+            with self.pool.connection() as conn:
+                novos = ver_horarios_alunos(conn, faltando, semestre, self.materializado)
+            expira_em = time.monotonic() + self.ttl
+            with self._lock:
+                # Invalidado durante a leitura: devolve, mas não guarda
+                if geracao == (self._geracao_geral, self._geracoes.get(semestre, 0)):
+                    cache = self._semestres.setdefault(semestre, {})
+                    for matricula, horario in novos.items():
+                        # 'pop' antes de gravar: o dicionário mantém a ordem de
+                        # inserção, então os mais antigos ficam sempre no começo
+                        cache.pop(matricula, None)
+                        cache[matricula] = (horario, expira_em)
+                    while len(cache) > self.max_alunos:
+                        del cache[next(iter(cache))]
+            resultado.update(novos)
+
+        # Devolve na ordem em que as matrículas foram pedidas
+        return {matricula: resultado[matricula] for matricula in matriculas}
+
+    def invalidar(self, semestre=None):
+        with self._lock:
+            if semestre is None:
+                self._semestres.clear()
+                self._geracao_geral += 1
+            else:
+                self._semestres.pop(semestre, None)
+                self._geracoes[semestre] = self._geracoes.get(semestre, 0) + 1
+
+
+# 3. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    pool = ConnectionPool(
+        conninfo=psycopg.conninfo.make_conninfo(**DB_PARAMS),
+        min_size=2,
+        max_size=10,
+        open=False
+    )
+
+    with pool:
+        turma = [f"A{n:04d}" for n in range(1, 41)]  # 40 alunos do init.sql
+
+        print(f"\n--- 1. Horários de {len(turma)} alunos em uma consulta ---")
+        with pool.connection() as conn:
+            inicio = time.perf_counter()
+            horarios = ver_horarios_alunos(conn, turma, '2025.1')
+            print(f"  {sum(map(len, horarios.values()))} aulas em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        for item in horarios['A0001']:
+            print(f"  A0001 -> {item['disciplina']} ({item['dia_semana']} {item['horario_ini']})")
+
+        print("\n--- 2. Mesma turma, agora com cache ---")
+        cache = CacheHorarios(pool)
+        cache.buscar(turma, '2025.1')                   # vai ao banco
+        cache.buscar(turma[:20] + ['A0050'], '2025.1')  # só o A0050 vai ao banco
+        print(f"  Acertos: {cache.acertos} | Falhas: {cache.falhas}")
+
+
+if __name__ == "__main__":
+    main()
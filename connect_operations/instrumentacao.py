@@ -0,0 +1,352 @@
+# instrumentacao.py
+#
+# Mede ONDE o tempo é gasto quando usamos o pool de conexões:
+# - esperando uma conexão livre no pool (checkout), ou
+# - executando a query no banco.
+#
+# Tudo é guardado em memória, em histogramas de "baldes" fixos: registrar
+# uma medida custa só uma busca binária e algumas somas, então dá para
+# deixar ligado em produção.
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import lru_cache
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+# 1. LIMITES DOS BALDES DO HISTOGRAMA (em segundos)
+# De 0,1 ms até 10 s. Cada medida cai no primeiro balde >= a ela.
+# O último balde (infinito) pega tudo o que passar de 10 s.
+BALDES_PADRAO = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"),
+)
+
+
+# 2. HISTOGRAMA
+class Histograma:
+    """
+    Histograma de latências com baldes fixos (igual ao do Prometheus).
+    Os percentis (p50/p95/p99) são estimados pelo limite superior do balde
+    onde o percentil cai: não é exato, mas o erro é limitado pelo balde.
+    Se o percentil cair no balde infinito, o resultado é o maior limite
+    FINITO (10 s): o valor real é maior que isso, mas 'inf' não cabe no JSON.
+    """
+
+    def __init__(self, baldes=BALDES_PADRAO):
+        self.baldes = baldes
+        self.contagens = [0] * len(baldes)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.baldes, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def percentil(self, p):
+        """ Retorna o limite do balde que contém o percentil 'p' (0 a 100). """
+        if self.total == 0:
+            return None
+        alvo = self.total * p / 100
+        acumulado = 0
+        for limite, contagem in zip(self.baldes, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                break
+        if limite == float("inf"):
+            return max((b for b in self.baldes if b != float("inf")), default=None)
+        return limite
+
+    def resumo(self):
+        return {
+            "total": self.total,
+            "soma_segundos": self.soma,
+            "p50": self.percentil(50),
+            "p95": self.percentil(95),
+            "p99": self.percentil(99),
+        }
+
+
+# 3. NOME NORMALIZADO DE UMA QUERY
+_ESPACOS = re.compile(r"\s+")
+_COMENTARIOS = re.compile(r"--[^\n]*")
+_TABELA = re.compile(r"\b(?:from|into|update|copy)\s+\"?(\w+)", re.IGNORECASE)
+
+
+def nome_da_query(query):
+    """
+    Gera um nome curto e estável para uma query, para usar como chave das
+    métricas. Ex: 'select_aluno_1a2b3c4d'.
+    - verbo + primeira tabela deixam o nome legível;
+    - um hash do texto normalizado (sem comentários e espaços extras) separa
+      queries diferentes sobre a mesma tabela.
+    Como os valores vêm pelos placeholders (%s), a mesma query sempre gera o
+    mesmo nome, independente dos parâmetros.
+    """
+    if not isinstance(query, str):
+        # psycopg.sql.Composed / SQL: usamos a representação em texto
+        query = str(query)
+    return _nome_da_query(query)
+
+
+@lru_cache(maxsize=1024)
+def _nome_da_query(query):
+    # O cache evita refazer regex + hash a cada execução da mesma query
+    texto = _ESPACOS.sub(" ", _COMENTARIOS.sub("", query)).strip().rstrip(";").lower()
+    verbo = texto.split(" ", 1)[0] if texto else "vazia"
+    tabela = _TABELA.search(texto)
+    resumo = hashlib.sha1(texto.encode()).hexdigest()[:8]
+    return f"{verbo}_{tabela.group(1) if tabela else 'sem_tabela'}_{resumo}"
+
+
+# 4. COLETOR DE MÉTRICAS
+class Metricas:
+    """
+    Guarda todas as métricas do pool e das queries.
+    É seguro para várias threads usarem ao mesmo tempo (um Lock protege as
+    atualizações, que são bem rápidas).
+    """
+
+    def __init__(self, baldes=BALDES_PADRAO):
+        self._lock = threading.Lock()
+        self._baldes = baldes
+        self.espera_checkout = Histograma(baldes)
+        self.latencia_queries = {}  # nome da query -> Histograma
+        self.linhas_queries = {}    # nome da query -> total de linhas
+        self.erros_queries = {}     # nome da query -> total de erros
+        self.saturacao_atual = 0.0
+        self.saturacao_maxima = 0.0
+        self.requisicoes_esperando = 0
+
+        # Cursor que reporta para ESTE coletor (veja 'instrumentar_pool').
+        # Mede 'execute', 'executemany' (lotes) e 'copy' (o bloco inteiro,
+        # do início do COPY até o fim do 'with')
+        metricas = self
+
+        class CursorInstrumentado(psycopg.Cursor):
+            def execute(self, query, params=None, **kwargs):
+                with metricas.medir_query(query, self):
+                    return super().execute(query, params, **kwargs)
+
+            def executemany(self, query, params_seq, **kwargs):
+                with metricas.medir_query(query, self):
+                    return super().executemany(query, params_seq, **kwargs)
+
+            @contextmanager
+            def copy(self, statement, params=None, **kwargs):
+                with metricas.medir_query(statement, self):
+                    with super().copy(statement, params, **kwargs) as copy:
+                        yield copy
+
+        self.cursor_factory = CursorInstrumentado
+
+    @contextmanager
+    def medir_query(self, query, cursor):
+        """ Mede o bloco e registra a query (com erro, se der exceção do banco). """
+        inicio = time.perf_counter()
+        try:
+            yield
+        except psycopg.Error:
+            self.registrar_query(query, time.perf_counter() - inicio, 0, erro=True)
+            raise
+        self.registrar_query(query, time.perf_counter() - inicio, max(cursor.rowcount, 0))
+
+    def registrar_checkout(self, espera, pool):
+        # get_stats() só copia alguns contadores do pool, é barato
+        stats = pool.get_stats()
+        em_uso = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+        saturacao = em_uso / stats["pool_max"] if stats.get("pool_max") else 0.0
+        with self._lock:
+            self.espera_checkout.observar(espera)
+            self.saturacao_atual = saturacao
+            self.saturacao_maxima = max(self.saturacao_maxima, saturacao)
+            self.requisicoes_esperando = stats.get("requests_waiting", 0)
+
+    def registrar_query(self, query, duracao, linhas, erro=False):
+        nome = nome_da_query(query)
+        with self._lock:
+            if nome not in self.latencia_queries:
+                self.latencia_queries[nome] = Histograma(self._baldes)
+                self.linhas_queries[nome] = 0
+                self.erros_queries[nome] = 0
+            self.latencia_queries[nome].observar(duracao)
+            self.linhas_queries[nome] += linhas
+            if erro:
+                self.erros_queries[nome] += 1
+
+    # 5. EXPORTAÇÃO: JSON
+    def para_json(self):
+        """ Retorna um 'retrato' (snapshot) das métricas como dicionário. """
+        with self._lock:
+            return {
+                "gerado_em": time.time(),
+                "pool": {
+                    "espera_checkout": self.espera_checkout.resumo(),
+                    "saturacao_atual": self.saturacao_atual,
+                    "saturacao_maxima": self.saturacao_maxima,
+                    "requisicoes_esperando": self.requisicoes_esperando,
+                },
+                "queries": {
+                    nome: {
+                        **hist.resumo(),
+                        "linhas": self.linhas_queries[nome],
+                        "erros": self.erros_queries[nome],
+                    }
+                    for nome, hist in self.latencia_queries.items()
+                },
+            }
+
+    # 6. EXPORTAÇÃO: FORMATO TEXTO DO PROMETHEUS
+    def para_prometheus(self):
+        """
+        Gera as métricas no formato texto do Prometheus (o mesmo lido pelo
+        'textfile collector' do node_exporter).
+        """
+        linhas = []
+
+        def _histograma(nome, hist, rotulos=""):
+            acumulado = 0
+            for limite, contagem in zip(hist.baldes, hist.contagens):
+                acumulado += contagem
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                sep = "," if rotulos else ""
+                linhas.append(f'{nome}_bucket{{{rotulos}{sep}le="{le}"}} {acumulado}')
+            chaves = f"{{{rotulos}}}" if rotulos else ""
+            linhas.append(f"{nome}_sum{chaves} {hist.soma}")
+            linhas.append(f"{nome}_count{chaves} {hist.total}")
+
+        with self._lock:
+            linhas.append("# HELP db_pool_checkout_wait_seconds Tempo esperando uma conexão do pool.")
+            linhas.append("# TYPE db_pool_checkout_wait_seconds histogram")
+            _histograma("db_pool_checkout_wait_seconds", self.espera_checkout)
+
+            linhas.append("# HELP db_pool_saturation Fração das conexões máximas em uso.")
+            linhas.append("# TYPE db_pool_saturation gauge")
+            linhas.append(f"db_pool_saturation {self.saturacao_atual}")
+            linhas.append("# HELP db_pool_saturation_max Maior saturação observada.")
+            linhas.append("# TYPE db_pool_saturation_max gauge")
+            linhas.append(f"db_pool_saturation_max {self.saturacao_maxima}")
+            linhas.append("# HELP db_pool_requests_waiting Pedidos na fila do pool.")
+            linhas.append("# TYPE db_pool_requests_waiting gauge")
+            linhas.append(f"db_pool_requests_waiting {self.requisicoes_esperando}")
+
+            linhas.append("# HELP db_query_duration_seconds Latência de execução das queries.")
+            linhas.append("# TYPE db_query_duration_seconds histogram")
+            for nome, hist in self.latencia_queries.items():
+                _histograma("db_query_duration_seconds", hist, f'query="{nome}"')
+
+            linhas.append("# HELP db_query_rows_total Linhas retornadas/afetadas pelas queries.")
+            linhas.append("# TYPE db_query_rows_total counter")
+            for nome, total in self.linhas_queries.items():
+                linhas.append(f'db_query_rows_total{{query="{nome}"}} {total}')
+
+            linhas.append("# HELP db_query_errors_total Queries que terminaram em erro.")
+            linhas.append("# TYPE db_query_errors_total counter")
+            for nome, total in self.erros_queries.items():
+                linhas.append(f'db_query_errors_total{{query="{nome}"}} {total}')
+
+        return "\n".join(linhas) + "\n"
+
+    def salvar(self, caminho, formato="prometheus"):
+        """
+        Grava as métricas em arquivo ('prometheus' ou 'json').
+        Escreve num arquivo temporário e depois renomeia, para que quem estiver
+        lendo nunca veja um arquivo pela metade.
+        """
+        conteudo = self.para_prometheus() if formato == "prometheus" else json.dumps(self.para_json(), indent=2, allow_nan=False)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
+
+
+# 7. POOL INSTRUMENTADO
+class PoolInstrumentado:
+    """
+    Envolve um ConnectionPool e mede cada 'pool.connection()'.
+    Use no lugar do pool original:
+
+        pool = PoolInstrumentado(ConnectionPool(...), metricas)
+        with pool.connection() as conn:
+            with conn.cursor() as cur:   # este cursor também é medido
+                cur.execute(...)
+
+    Qualquer outro atributo (open, close, get_stats, ...) é repassado para o
+    pool original.
+    """
+
+    def __init__(self, pool, metricas):
+        self.pool = pool
+        self.metricas = metricas
+
+    @contextmanager
+    def connection(self, timeout=None):
+        inicio = time.perf_counter()
+        with self.pool.connection(timeout=timeout) as conn:
+            self.metricas.registrar_checkout(time.perf_counter() - inicio, self.pool)
+            cursor_original = conn.cursor_factory
+            conn.cursor_factory = self.metricas.cursor_factory
+            try:
+                yield conn
+            finally:
+                # Devolve a conexão ao pool do jeito que ela veio
+                conn.cursor_factory = cursor_original
+
+    def __getattr__(self, nome):
+        return getattr(self.pool, nome)
+
+    def __enter__(self):
+        self.pool.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self.pool.__exit__(*exc)
+
+
+def instrumentar_pool(pool, metricas=None):
+    """ Atalho: retorna (pool_instrumentado, metricas). """
+    metricas = metricas or Metricas()
+    return PoolInstrumentado(pool, metricas), metricas
+
+
+# 8. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    """
+    Cria um pool instrumentado, roda algumas consultas e exporta as métricas.
+    """
+    pool, metricas = instrumentar_pool(ConnectionPool(
+        conninfo=psycopg.conninfo.make_conninfo(**DB_PARAMS),
+        min_size=2,
+        max_size=10,
+        open=False
+    ))
+
+    with pool:
+        for _ in range(50):
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT cod_mec, nome, modalidade FROM curso ORDER BY nome;")
+                    cur.fetchall()
+                    cur.execute("SELECT matricula, cpf FROM aluno WHERE matricula = %s;", ('A0001',))
+                    cur.fetchall()
+                    with cur.copy("COPY (SELECT codigo, tipo FROM salas) TO STDOUT") as copy:
+                        for _ in copy.rows():
+                            pass
+
+    print(json.dumps(metricas.para_json(), indent=2, allow_nan=False))
+    metricas.salvar("metricas_db.prom")
+    print("\n--- Métricas salvas em 'metricas_db.prom' ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# linhas_compactas.py
+#
+# "Row factories" compactas para o psycopg.
+#
+# O 'dict_row' (usado no 'ver_horario_aluno' e nos leitores com pool) cria
+# um DICIONÁRIO por linha. Com listas grandes (todos os horários do
+# semestre, todas as pessoas) esses dicionários dominam memória e CPU.
+#
+# Aqui geramos, para cada "formato" de consulta (a tupla com os nomes das
+# colunas), uma CLASSE com '__slots__': cada linha guarda só os valores,
+# sem o dicionário interno, e o acesso continua por nome:
+#     item.disciplina   ou   item['disciplina']   (igual ao dict_row)
+# A classe é criada uma vez por formato e reaproveitada ('lru_cache').
+#
+# O 'main' compara tuple_row, dict_row, namedtuple_row e slots_row:
+#   python linhas_compactas.py --dbname faculdatabase_bench
+
+import argparse
+import gc
+import keyword
+import time
+import tracemalloc
+from functools import lru_cache
+
+import psycopg
+from psycopg.rows import dict_row, namedtuple_row, tuple_row
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+
+# 1. CLASSES GERADAS POR FORMATO DE CONSULTA
+def _nome_valido(nome, posicao):
+    # Colunas sem nome válido (ex: '?column?') viram 'coluna_N'
+    if nome.isidentifier() and not keyword.iskeyword(nome) and not nome.startswith("_"):
+        return nome
+    return f"coluna_{posicao}"
+
+
+class LinhaBase:
+    """ Comportamento comum das classes geradas (acesso por nome e por chave). """
+
+    __slots__ = ()
+    _campos = ()
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            try:
+                return getattr(self, chave)
+            except AttributeError:
+                raise KeyError(chave) from None
+        # Também aceita índice, como uma tupla
+        return getattr(self, self._campos[chave])
+
+    def __iter__(self):
+        return (getattr(self, campo) for campo in self._campos)
+
+    def __len__(self):
+        return len(self._campos)
+
+    def __eq__(self, outra):
+        if type(outra) is not type(self):
+            return NotImplemented
+        return tuple(self) == tuple(outra)
+
+    def __hash__(self):
+        # Definir '__eq__' apaga o '__hash__' herdado: sem isto, as linhas não
+        # poderiam ir para um 'set' nem ser chave de dicionário (as tuplas
+        # podem). Não altere uma linha depois de usá-la como chave.
+        return hash(tuple(self))
+
+    def __repr__(self):
+        valores = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self._campos)
+        return f"{type(self).__name__}({valores})"
+
+    def _asdict(self):
+        return {campo: getattr(self, campo) for campo in self._campos}
+
+
+@lru_cache(maxsize=256)
+def classe_para_colunas(colunas):
+    """
+    Cria (uma vez por tupla de nomes) uma classe com '__slots__' cujo
+    construtor recebe a sequência de valores da linha.
+    O '__init__' é gerado como 'self.a, self.b = valores': uma única
+    atribuição desempacotada, bem mais rápida que um laço com setattr.
+    """
+    campos = []
+    for posicao, nome in enumerate(colunas):
+        nome = _nome_valido(nome, posicao)
+        # Duas colunas com o mesmo nome (ex: dois 'nome' em um JOIN sem AS)
+        campos.append(nome if nome not in campos else f"{nome}_{posicao}")
+
+    if campos:
+        alvos = ", ".join(f"self.{campo}" for campo in campos)
+        codigo = f"def __init__(self, valores):\n    {alvos}, = valores\n"
+    else:
+        # Resultado sem colunas (ex: 'SELECT FROM t')
+        codigo = "def __init__(self, valores):\n    pass\n"
+    namespace = {}
+    # Os nomes já foram validados acima, então o código gerado é seguro
+    exec(codigo, namespace)
+
+    return type("Linha", (LinhaBase,), {
+        "__slots__": tuple(campos),
+        "_campos": tuple(campos),
+        "__init__": namespace["__init__"],
+    })
+
+
+# 2. A ROW FACTORY
+def slots_row(cursor):
+    """
+    Row factory para 'conn.cursor(row_factory=slots_row)'.
+    Devolve a classe gerada para as colunas do resultado: o psycopg chama
+    'Classe(valores)' para cada linha.
+    """
+    if cursor.description is None:
+        # Comando sem resultado (ex: INSERT sem RETURNING)
+        return lambda valores: valores
+    return classe_para_colunas(tuple(coluna.name for coluna in cursor.description))
+
+
+# 3. MICRO-BENCHMARK
+FABRICAS = {
+    "tuple_row": tuple_row,
+    "dict_row": dict_row,
+    "namedtuple_row": namedtuple_row,
+    "slots_row": slots_row,
+}
+
+QUERY_BENCHMARK = """
+SELECT
+    ha.matricula_aluno,
+    d.nome AS disciplina,
+    p.nome AS professor,
+    os.codigo_sala,
+    os.dia_semana,
+    os.horario_ini,
+    os.horario_fim
+FROM horario_aluno ha
+JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+JOIN professor prof ON ap.matricula_professor = prof.matricula
+JOIN pessoa p ON prof.cpf = p.cpf;
+"""
+
+
+def medir(conn, row_factory, query=QUERY_BENCHMARK, repeticoes=5):
+    """
+    Mede uma row factory. Retorna {"linhas", "bytes_por_linha", "ms_decodificacao"}.
+    - Memória: pico do 'tracemalloc' ao manter todas as linhas em uma lista,
+      descontando o que já existia antes.
+    - Tempo: o menor dos 'repeticoes' 'fetchall()' (a consulta já foi
+      executada; só medimos a conversão das linhas).
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        with conn.cursor(row_factory=row_factory) as cur:
+            cur.execute(query)
+            inicio = time.perf_counter()
+            cur.fetchall()
+            tempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    with conn.cursor(row_factory=row_factory) as cur:
+        cur.execute(query)
+        tracemalloc.start()
+        linhas = cur.fetchall()
+        memoria, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "linhas": len(linhas),
+        "bytes_por_linha": memoria / max(len(linhas), 1),
+        "ms_decodificacao": min(tempos) * 1000,
+    }
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Compara row factories do psycopg.")
+    parser.add_argument("--dbname", default=DB_PARAMS["dbname"], help="use um banco gerado para ter mais linhas")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with psycopg.connect(**{**DB_PARAMS, "dbname": args.dbname}) as conn:
+        print("\n--- 1. Uma linha de cada tipo ---")
+        for nome, fabrica in FABRICAS.items():
+            with conn.cursor(row_factory=fabrica) as cur:
+                cur.execute("SELECT cod_mec, nome, modalidade FROM curso ORDER BY nome LIMIT 1;")
+                print(f"  {nome:<15} {cur.fetchone()!r}")
+
+        print(f"\n--- 2. Memória e tempo de decodificação (melhor de {args.repeticoes}) ---")
+        print(f"  {'fábrica':<15} {'linhas':>8} {'bytes/linha':>12} {'ms':>9}")
+        for nome, fabrica in FABRICAS.items():
+            r = medir(conn, fabrica, repeticoes=args.repeticoes)
+            print(f"  {nome:<15} {r['linhas']:>8} {r['bytes_por_linha']:>12.0f} {r['ms_decodificacao']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# orm_async.py
+#
+# Versão 'asyncio' do orm.py (AsyncSession do SQLAlchemy).
+#
+# O orm.py é síncrono: numa aplicação web assíncrona ele precisa rodar em
+# uma "thread pool" para não travar o event loop. Aqui os MESMOS models
+# (Pessoa, Curso, Aluno) são usados com um Engine assíncrono e 'AsyncSession':
+# enquanto uma requisição espera o banco, as outras continuam rodando.
+#
+# Diferença importante: no modo async NÃO existe "lazy loading" implícito.
+# Acessar 'aluno.pessoa' sem ter carregado a relação daria erro
+# ('MissingGreenlet'), porque o ORM precisaria ir ao banco escondido,
+# dentro de um simples acesso a atributo. Por isso:
+# - toda consulta diz o que carregar (os PERFIS_CARREGAMENTO do orm.py);
+# - 'raiseload("*")' faz qualquer relação esquecida levantar um erro CLARO;
+# - 'expire_on_commit=False': depois do commit os atributos continuam
+#   legíveis (senão, ler 'aluno.matricula' dispararia um SELECT).
+#
+# Dependência: pip install "sqlalchemy[asyncio]" (instala o 'greenlet')
+#
+# Uso (dentro da pasta connect_operations):
+#   python orm_async.py                      # CRUD de exemplo
+#   python orm_async.py --requisicoes 2000   # + comparação síncrono x assíncrono
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import joinedload, raiseload
+
+import conexao
+from orm import Aluno, Pessoa, SessionLocal, com_perfil
+
+# 1. SETUP DO ORM ASSÍNCRONO
+# A fábrica de sessões só é criada no primeiro uso (veja conexao.py)
+@cache
+def _fabrica_sessoes():
+    return async_sessionmaker(conexao.obter_engine_async(), expire_on_commit=False)
+
+
+def AsyncSessionLocal():
+    """ Nova 'AsyncSession' (use com 'async with'). """
+    return _fabrica_sessoes()()
+
+
+def explicito(stmt, perfil):
+    """ Perfil de carregamento + 'raiseload' para todo o resto. """
+    return com_perfil(stmt, perfil).options(raiseload("*"))
+
+
+# 2. OPERAÇÕES CRUD (ASSÍNCRONAS)
+async def criar_novo_aluno(session):
+    """ Exemplo de INSERT (mesmos dados do orm.py) """
+    print("\n--- 1. Criando Novo Aluno (INSERT) ---")
+
+    nova_pessoa = Pessoa(
+        cpf="99988877766",
+        nome="Joana D'Arc",
+        email="joana.orm@exemplo.com",
+        data_nascimento="1412-01-06"
+    )
+    novo_aluno = Aluno(
+        matricula="A0999",
+        data_inicio="2025-01-01",
+        cod_mec=1001, # Ciência da Computação
+        pessoa=nova_pessoa
+    )
+
+    try:
+        session.add(novo_aluno)  # 'add' não vai ao banco: não tem 'await'
+        await session.commit()
+        print(f"  SUCESSO: Aluno '{nova_pessoa.nome}' criado.")
+        return True
+    except Exception as e:
+        await session.rollback()
+        print(f"  FALHA: Erro ao criar aluno (talvez já exista). {e}")
+        return False
+
+
+async def carregar_aluno(session, matricula):
+    """ Aluno com pessoa e curso (1 SELECT com JOIN), sem imprimir nada. """
+    stmt = explicito(select(Aluno).where(Aluno.matricula == matricula), "aluno_detalhe")
+    return (await session.scalars(stmt)).first()
+
+
+async def buscar_aluno_com_join(session, matricula):
+    """ Exemplo de SELECT com JOIN (perfil 'aluno_detalhe') """
+    print(f"\n--- 2. Buscando Aluno '{matricula}' (SELECT + JOIN) ---")
+
+    aluno = await carregar_aluno(session, matricula)
+    if aluno:
+        print(f"  Encontrado: {aluno.matricula}")
+        # Tudo já veio no SELECT: aqui não há nenhum 'await'
+        print(f"  Nome....: {aluno.pessoa.nome}")
+        print(f"  Email...: {aluno.pessoa.email}")
+        print(f"  Curso...: {aluno.curso.nome}")
+        print(f"  Modalide: {aluno.curso.modalidade}")
+    else:
+        print(f"  Aluno '{matricula}' não encontrado.")
+    return aluno
+
+
+async def atualizar_email_aluno(session, matricula, novo_email):
+    """ Exemplo de UPDATE """
+    print(f"\n--- 3. Atualizando Email do Aluno '{matricula}' (UPDATE) ---")
+
+    try:
+        # No orm.py, 'aluno.pessoa' vinha por lazy loading. Aqui a pessoa
+        # precisa vir junto (joinedload), senão o acesso levanta erro.
+        stmt = (
+            select(Aluno)
+            .where(Aluno.matricula == matricula)
+            .options(joinedload(Aluno.pessoa, innerjoin=True), raiseload("*"))
+        )
+        aluno = (await session.scalars(stmt)).first()
+
+        if not aluno:
+            print(f"  AVISO: Aluno '{matricula}' não encontrado.")
+            return False
+
+        print(f"  Email antigo: {aluno.pessoa.email}")
+        aluno.pessoa.email = novo_email
+        await session.commit()
+        print(f"  Email novo..: {aluno.pessoa.email}")
+        print("  SUCESSO: Email atualizado.")
+        return True
+
+    except Exception as e:
+        await session.rollback()
+        print(f"  FALHA: Erro ao atualizar (talvez o email já exista). {e}")
+        return False
+
+
+async def deletar_aluno(session, matricula):
+    """ Exemplo de DELETE """
+    print(f"\n--- 4. Deletando Aluno '{matricula}' (DELETE) ---")
+
+    try:
+        aluno = await session.get(Aluno, matricula, options=[raiseload("*")])
+
+        if not aluno:
+            print(f"  AVISO: Aluno '{matricula}' não encontrado.")
+            return False
+
+        # A 'pessoa' associada NÃO é deletada (igual ao orm.py)
+        await session.delete(aluno)
+        await session.commit()
+        print(f"  SUCESSO: Aluno '{matricula}' deletado.")
+        return True
+
+    except Exception as e:
+        await session.rollback()
+        print(f"  FALHA: Erro ao deletar aluno. {e}")
+        return False
+
+
+# 3. COMPARAÇÃO: SÍNCRONO (THREADS) x ASSÍNCRONO
+# Cada "requisição" abre uma sessão, busca a ficha de um aluno
+# (perfil 'aluno_detalhe') e fecha a sessão: o caso típico de uma API.
+# Obs: com o banco na mesma máquina, quase todo o tempo é CPU do ORM, e o
+# caminho async (que troca de corrotina a cada ida ao banco) pode sair até
+# mais lento. O ganho dele aparece quando a latência de rede domina e,
+# principalmente, no event loop que nunca fica bloqueado.
+def _requisicoes_sincronas(matriculas, concorrencia):
+    def requisicao(matricula):
+        with SessionLocal() as session:
+            stmt = com_perfil(select(Aluno).where(Aluno.matricula == matricula), "aluno_detalhe")
+            return session.scalars(stmt).first()
+
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        return list(executor.map(requisicao, matriculas))
+
+
+async def _requisicoes_assincronas(matriculas, concorrencia):
+    limite = asyncio.Semaphore(concorrencia)
+
+    async def requisicao(matricula):
+        async with limite:
+            async with AsyncSessionLocal() as session:
+                return await carregar_aluno(session, matricula)
+
+    return await asyncio.gather(*(requisicao(m) for m in matriculas))
+
+
+async def comparar_concorrencia(requisicoes=1000, concorrencia=20):
+    """
+    Mesmo volume de requisições pelos dois caminhos; retorna as
+    requisições por segundo de cada um. Os dois usam o mesmo tamanho de
+    pool (DB_POOL_MIN/DB_POOL_MAX do conexao.py) e são aquecidos antes.
+    """
+    async with AsyncSessionLocal() as session:
+        existentes = (await session.scalars(select(Aluno.matricula).order_by(Aluno.matricula))).all()
+    matriculas = [existentes[i % len(existentes)] for i in range(requisicoes)]
+
+    # Aquecimento: as conexões já abertas não entram na medição
+    _requisicoes_sincronas(matriculas[:concorrencia], concorrencia)
+    await _requisicoes_assincronas(matriculas[:concorrencia], concorrencia)
+
+    loop = asyncio.get_running_loop()
+    inicio = time.perf_counter()
+    # Em outra thread, para não travar o event loop (como numa app async real)
+    await loop.run_in_executor(None, _requisicoes_sincronas, matriculas, concorrencia)
+    sincrono = requisicoes / (time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await _requisicoes_assincronas(matriculas, concorrencia)
+    assincrono = requisicoes / (time.perf_counter() - inicio)
+
+    return {"sincrono": sincrono, "assincrono": assincrono}
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+async def main():
+    parser = argparse.ArgumentParser(description="CRUD do ORM com AsyncSession.")
+    parser.add_argument("--requisicoes", type=int, default=0, help="roda a comparação com N requisições")
+    parser.add_argument("--concorrencia", type=int, default=20)
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        # 1. INSERT (Descomente para rodar)
+        # await criar_novo_aluno(session)
+
+        # 2. SELECT
+        await buscar_aluno_com_join(session, 'A0001')
+
+        # 3. UPDATE
+        # await atualizar_email_aluno(session, 'A0001', 'rafael.martins.novo@exemplo.com')
+
+        # 4. DELETE (Descomente o aluno criado para poder deletar)
+        # await deletar_aluno(session, 'A0999')
+
+    if args.requisicoes:
+        print(f"\n--- 5. {args.requisicoes} requisições, {args.concorrencia} ao mesmo tempo ---")
+        resultado = await comparar_concorrencia(args.requisicoes, args.concorrencia)
+        print(f"  Síncrono (threads): {resultado['sincrono']:>8.1f} req/s")
+        print(f"  Assíncrono........: {resultado['assincrono']:>8.1f} req/s")
+
+    # Os Engines assíncronos precisam ser fechados DENTRO do event loop
+    await conexao.fechar_tudo_async()
+    print("\n--- FIM DAS OPERAÇÕES (SESSÃO FECHADA) ---")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
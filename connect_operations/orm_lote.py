@@ -0,0 +1,232 @@
+# orm_lote.py
+#
+# Operações EM MASSA no ORM (orm.py) para 'Aluno' e 'Pessoa'.
+#
+# 'criar_novo_aluno' e 'deletar_aluno' tratam UM objeto por vez: 'session.add'
+# ou 'session.delete' + commit. Para cada objeto o ORM faz a contabilidade
+# completa da "unit of work" (identity map, histórico de atributos, ordem
+# de dependências) e manda um comando por linha. Numa matrícula em massa ou
+# na limpeza dos formados, isso vira milhares de idas e voltas ao banco.
+#
+# Aqui os comandos são montados direto a partir de listas de dicionários,
+# sem criar objetos na sessão:
+# - INSERT: 'insert(Pessoa).returning(Pessoa.cpf)' com uma lista usa o
+#   "insertmanyvalues" do SQLAlchemy (um INSERT com VÁRIAS linhas em VALUES).
+#   O RETURNING é necessário: sem ele, o dialeto do psycopg manda um
+#   'executemany' de INSERTs de UMA linha cada. Obs: com o banco na mesma
+#   máquina, esse 'executemany' (que o psycopg manda em "pipeline") chega a
+#   ser mais rápido; o VALUES com várias linhas ganha quando cada ida e
+#   volta pela rede custa caro;
+# - UPDATE por chave primária: 'session.execute(update(Aluno), [...])';
+# - UPDATE/DELETE de um conjunto: 'WHERE matricula IN (...)';
+# - tudo em pedaços de 'tamanho_lote' linhas e em UMA transação
+#   (ou entra tudo, ou nada).
+#
+# Uso (dentro da pasta connect_operations):
+#   python orm_lote.py --quantidade 1000 --tamanho-lote 500
+
+import argparse
+import time
+from itertools import islice
+
+from sqlalchemy import delete, insert, select, update
+
+from orm import Aluno, Pessoa, SessionLocal
+
+TAMANHO_LOTE_PADRAO = 1000
+
+# Comandos em massa NÃO atualizam objetos já carregados na sessão
+# (seria preciso procurar cada um no identity map)
+SEM_SINCRONIZAR = {"synchronize_session": False}
+
+
+def _em_lotes(itens, tamanho):
+    iterador = iter(itens)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+# 1. INSERT EM MASSA
+def cadastrar_alunos_em_lote(session, novos_alunos_data, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Mesmo formato de dados do 'cadastrar_novos_alunos_em_lote' (example2.py):
+        {"pessoa": (cpf, nome, email, data_nascimento),
+         "aluno": (matricula, cod_mec, data_inicio, cpf)}
+    Para cada lote: 1 INSERT de várias pessoas + 1 INSERT de vários alunos.
+    Faz o commit no final; em caso de erro, nada fica gravado.
+    Retorna quantos alunos foram inseridos.
+    """
+    total = 0
+    try:
+        for lote in _em_lotes(novos_alunos_data, tamanho_lote):
+            # O RETURNING faz o SQLAlchemy montar 'VALUES (...), (...), ...'
+            session.scalars(insert(Pessoa).returning(Pessoa.cpf), [
+                dict(zip(("cpf", "nome", "email", "data_nascimento"), al["pessoa"])) for al in lote
+            ]).all()
+            total += len(session.scalars(insert(Aluno).returning(Aluno.matricula), [
+                dict(zip(("matricula", "cod_mec", "data_inicio", "cpf"), al["aluno"])) for al in lote
+            ]).all())
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return total
+
+
+# 2. UPDATE EM MASSA
+def atualizar_em_lote(session, modelo, linhas, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    UPDATE por chave primária: cada dicionário traz a chave (ex: 'cpf' para
+    Pessoa) e as colunas que mudam. Ex:
+        atualizar_em_lote(session, Pessoa, [{"cpf": "...", "email": "..."}])
+    Retorna quantas linhas foram enviadas.
+    """
+    total = 0
+    try:
+        for lote in _em_lotes(linhas, tamanho_lote):
+            session.execute(update(modelo), lote)
+            total += len(lote)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return total
+
+
+def transferir_alunos_de_curso(session, matriculas, cod_mec, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    O MESMO valor para vários alunos: 'UPDATE aluno SET cod_mec = ...
+    WHERE matricula IN (...)', um comando por lote. Retorna quantos mudaram.
+    """
+    total = 0
+    try:
+        for lote in _em_lotes(matriculas, tamanho_lote):
+            stmt = update(Aluno).where(Aluno.matricula.in_(lote)).values(cod_mec=cod_mec)
+            total += session.execute(stmt, execution_options=SEM_SINCRONIZAR).rowcount
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return total
+
+
+# 3. DELETE EM MASSA
+def deletar_alunos_em_lote(session, matriculas, com_pessoa=False, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    'DELETE FROM aluno WHERE matricula IN (...)', um comando por lote.
+    - 'com_pessoa=True': apaga também as pessoas desses alunos (o
+      'deletar_aluno' do orm.py deixa a pessoa no banco).
+    - Alunos com horários ('horario_aluno') são barrados pela chave
+      estrangeira: o erro desfaz TUDO (rollback).
+    Retorna quantos alunos foram apagados.
+    """
+    total = 0
+    try:
+        for lote in _em_lotes(matriculas, tamanho_lote):
+            stmt = delete(Aluno).where(Aluno.matricula.in_(lote)).returning(Aluno.cpf)
+            cpfs = session.scalars(stmt, execution_options=SEM_SINCRONIZAR).all()
+            total += len(cpfs)
+            if com_pessoa and cpfs:
+                session.execute(delete(Pessoa).where(Pessoa.cpf.in_(cpfs)), execution_options=SEM_SINCRONIZAR)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return total
+
+
+# 4. COMPARAÇÃO: UM OBJETO POR VEZ x EM MASSA
+def _gerar_alunos(quantidade, inicio_cpf):
+    return [
+        {
+            "pessoa": (f"{inicio_cpf + n:011d}", f"Aluno Lote ORM {n}", f"lote.orm.{inicio_cpf + n}@exemplo.com", "2005-01-01"),
+            "aluno": (f"L{n:07d}", 1001, "2025-01-01", f"{inicio_cpf + n:011d}"),
+        }
+        for n in range(quantidade)
+    ]
+
+
+def _por_objeto(session, alunos):
+    """ O caminho do orm.py: add/commit, update/commit, delete/commit por aluno. """
+    tempos = {}
+    inicio = time.perf_counter()
+    for al in alunos:
+        cpf, nome, email, nascimento = al["pessoa"]
+        matricula, cod_mec, data_inicio, _ = al["aluno"]
+        session.add(Aluno(
+            matricula=matricula, cod_mec=cod_mec, data_inicio=data_inicio,
+            pessoa=Pessoa(cpf=cpf, nome=nome, email=email, data_nascimento=nascimento),
+        ))
+        session.commit()
+    tempos["insert"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for al in alunos:
+        pessoa = session.get(Pessoa, al["pessoa"][0])
+        pessoa.email = "novo." + pessoa.email
+        session.commit()
+    tempos["update"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for al in alunos:
+        aluno = session.get(Aluno, al["aluno"][0])
+        pessoa = aluno.pessoa
+        session.delete(aluno)
+        session.delete(pessoa)
+        session.commit()
+    tempos["delete"] = time.perf_counter() - inicio
+    return tempos
+
+
+def _em_massa(session, alunos, tamanho_lote):
+    tempos = {}
+    inicio = time.perf_counter()
+    cadastrar_alunos_em_lote(session, alunos, tamanho_lote)
+    tempos["insert"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    atualizar_em_lote(session, Pessoa, [
+        {"cpf": al["pessoa"][0], "email": "novo." + al["pessoa"][2]} for al in alunos
+    ], tamanho_lote)
+    tempos["update"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    deletar_alunos_em_lote(session, [al["aluno"][0] for al in alunos], com_pessoa=True, tamanho_lote=tamanho_lote)
+    tempos["delete"] = time.perf_counter() - inicio
+    return tempos
+
+
+def comparar(quantidade=1000, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """ Mesmos alunos pelos dois caminhos; retorna os tempos (s) de cada etapa. """
+    with SessionLocal() as session:
+        maior_cpf = session.scalar(select(Pessoa.cpf).order_by(Pessoa.cpf.desc()).limit(1))
+    alunos = _gerar_alunos(quantidade, int(maior_cpf or 0) + 1)
+
+    with SessionLocal() as session:
+        por_objeto = _por_objeto(session, alunos)
+    with SessionLocal() as session:
+        em_massa = _em_massa(session, alunos, tamanho_lote)
+    return {"por_objeto": por_objeto, "em_massa": em_massa}
+
+
+# 5. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Compara o ORM objeto a objeto com as operações em massa.")
+    parser.add_argument("--quantidade", type=int, default=1000)
+    parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_PADRAO)
+    args = parser.parse_args()
+
+    print(f"\n--- 1. {args.quantidade} alunos: um objeto por vez x em massa (lotes de {args.tamanho_lote}) ---")
+    resultado = comparar(args.quantidade, args.tamanho_lote)
+    print(f"  {'etapa':<8} {'por objeto':>14} {'em massa':>14} {'ganho':>8}")
+    for etapa in ("insert", "update", "delete"):
+        lento = resultado["por_objeto"][etapa]
+        rapido = resultado["em_massa"][etapa]
+        print(
+            f"  {etapa:<8} {args.quantidade / lento:>10.0f} l/s {args.quantidade / rapido:>10.0f} l/s"
+            f" {lento / rapido:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+# paginacao.py
+#
+# Paginação por CHAVE ("keyset" ou "seek") para as listagens.
+#
+# 'listar_cursos' (example1.py) e as outras listagens trazem TUDO com
+# 'ORDER BY ... fetchall()'. A tela pagina milhares de alunos, e a paginação
+# com OFFSET fica mais lenta a cada página: 'OFFSET 20000 LIMIT 20' lê (e
+# joga fora) 20.000 linhas antes de devolver as 20 que interessam.
+#
+# Aqui a próxima página começa DEPOIS da última linha vista:
+#   WHERE (nome, cod_mec) > ('Engenharia...', 1002) ORDER BY nome, cod_mec LIMIT 20
+# Com um índice na mesma ordem (init_indices_paginacao.sql), o Postgres
+# desce direto até esse ponto: a página 1.000 custa o mesmo que a página 1.
+#
+# A chave da última linha vai para a tela como um "cursor" OPACO (texto
+# base64), que o cliente só devolve no pedido seguinte.
+# - A chave precisa ser ÚNICA (por isso 'nome' vem com 'cod_mec' ou 'cpf').
+# - Funciona para o psycopg (LISTAGENS abaixo) e para o ORM ('paginar_orm').
+#
+# Uso (dentro da pasta connect_operations):
+#   python paginacao.py --dbname faculdatabase_bench
+
+import argparse
+import base64
+import json
+import os
+import time
+
+import psycopg
+from psycopg import sql
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import contains_eager
+
+from conexao import DB_PARAMS, obter_engine  # Configuração única (conexao.py)
+from orm import Aluno, Pessoa, SessionLocal
+
+ARQUIVO_INDICES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "facul-database", "init", "init_indices_paginacao.sql"
+)
+
+TAMANHO_PADRAO = 20
+
+
+# 1. O CURSOR OPACO
+def codificar_cursor(listagem, valores):
+    """ (nome da listagem, valores da chave) -> texto base64 para a URL. """
+    dados = json.dumps({"l": listagem, "k": list(valores)}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(listagem, cursor):
+    """
+    Texto base64 -> valores da chave. ValueError se o cursor estiver
+    corrompido ou for de OUTRA listagem.
+    """
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if dados["l"] == listagem:
+            return dados["k"]
+    except (ValueError, TypeError, KeyError):
+        pass
+    raise ValueError(f"Cursor inválido para a listagem '{listagem}'.")
+
+
+# 2. LISTAGENS (PSYCOPG)
+# - "colunas": o que cada linha traz;
+# - "chave": colunas da ordenação (todas precisam estar em "colunas");
+# - "filtro" (opcional): condição fixa, com parâmetros nomeados.
+LISTAGENS = {
+    "cursos": {
+        "colunas": ["cod_mec", "nome", "modalidade"],
+        "de": "curso",
+        "chave": ["nome", "cod_mec"],
+    },
+    "alunos": {
+        "colunas": ["a.matricula", "p.nome", "a.cod_mec"],
+        "de": "aluno a JOIN pessoa p ON p.cpf = a.cpf",
+        "chave": ["a.matricula"],
+    },
+    "alunos_por_nome": {
+        "colunas": ["a.matricula", "p.nome", "a.cod_mec", "p.cpf"],
+        "de": "pessoa p JOIN aluno a ON a.cpf = p.cpf",
+        "chave": ["p.nome", "p.cpf"],
+    },
+    "alunos_do_curso": {
+        "colunas": ["a.matricula", "p.nome", "p.cpf"],
+        "de": "pessoa p JOIN aluno a ON a.cpf = p.cpf",
+        "filtro": "a.cod_mec = %(cod_mec)s",
+        "chave": ["p.nome", "p.cpf"],
+    },
+    "salas": {
+        "colunas": ["codigo", "tipo", "capacidade"],
+        "de": "salas",
+        "chave": ["codigo"],
+    },
+    "disciplinas": {
+        "colunas": ["cod_disciplina", "nome", "carga_horaria"],
+        "de": "disciplina",
+        "chave": ["cod_disciplina"],
+    },
+}
+
+
+def _montar_query(listagem, com_cursor):
+    # As partes vêm do dicionário LISTAGENS (código, nunca do usuário)
+    definicao = LISTAGENS[listagem]
+    condicoes = [definicao["filtro"]] if "filtro" in definicao else []
+    if com_cursor:
+        marcas = ", ".join(f"%(k{i})s" for i in range(len(definicao["chave"])))
+        condicoes.append(f"({', '.join(definicao['chave'])}) > ({marcas})")
+    return sql.SQL("SELECT {} FROM {}{} ORDER BY {} LIMIT %(limite)s").format(
+        sql.SQL(", ".join(definicao["colunas"])),
+        sql.SQL(definicao["de"]),
+        sql.SQL(" WHERE " + " AND ".join(condicoes) if condicoes else ""),
+        sql.SQL(", ".join(definicao["chave"])),
+    )
+
+
+def listar_pagina(conn, listagem, cursor=None, tamanho=TAMANHO_PADRAO, **filtros):
+    """
+    Uma página de 'listagem' (ver LISTAGENS).
+    - 'cursor': o 'proximo' da página anterior (None = primeira página).
+    - 'filtros': parâmetros do "filtro" da listagem (ex: cod_mec=1001).
+
+    Retorna {"linhas": [...], "proximo": cursor da página seguinte ou None}.
+    """
+    definicao = LISTAGENS[listagem]
+    params = {**filtros, "limite": tamanho + 1}  # 1 a mais: existe próxima página?
+    if cursor is not None:
+        valores = decodificar_cursor(listagem, cursor)
+        params.update({f"k{i}": valor for i, valor in enumerate(valores)})
+
+    with conn.cursor() as cur:
+        cur.execute(_montar_query(listagem, cursor is not None), params)
+        linhas = cur.fetchall()
+
+    proximo = None
+    if len(linhas) > tamanho:
+        linhas = linhas[:tamanho]
+        posicoes = [definicao["colunas"].index(coluna) for coluna in definicao["chave"]]
+        proximo = codificar_cursor(listagem, [linhas[-1][i] for i in posicoes])
+    return {"linhas": linhas, "proximo": proximo}
+
+
+def listar_tudo(conn, listagem, tamanho=500, **filtros):
+    """ Percorre todas as páginas (gerador), sem OFFSET. """
+    cursor = None
+    while True:
+        pagina = listar_pagina(conn, listagem, cursor, tamanho, **filtros)
+        yield from pagina["linhas"]
+        cursor = pagina["proximo"]
+        if cursor is None:
+            return
+
+
+# 3. PAGINAÇÃO NO ORM
+def paginar_orm(session, stmt, chave, cursor=None, tamanho=TAMANHO_PADRAO):
+    """
+    Uma página de um 'select()' do ORM (orm.py).
+    - 'chave': colunas da ordenação, ex: (Pessoa.nome, Pessoa.cpf); as
+      tabelas delas precisam estar no 'stmt' (ex: '.join(Pessoa)').
+    - O 'stmt' NÃO deve ter 'order_by': a ordem é a da chave.
+
+        stmt = select(Aluno).join(Aluno.pessoa)
+        pagina = paginar_orm(session, stmt, (Pessoa.nome, Pessoa.cpf))
+
+    Retorna {"linhas": [objetos], "proximo": cursor ou None}.
+    """
+    listagem = ",".join(str(coluna) for coluna in chave)  # ex: "pessoa.nome,pessoa.cpf"
+    consulta = stmt.add_columns(*chave).order_by(*chave).limit(tamanho + 1)
+    if cursor is not None:
+        consulta = consulta.where(tuple_(*chave) > tuple_(*decodificar_cursor(listagem, cursor)))
+
+    linhas = session.execute(consulta).all()
+    proximo = None
+    if len(linhas) > tamanho:
+        linhas = linhas[:tamanho]
+        proximo = codificar_cursor(listagem, linhas[-1][-len(chave):])
+    # Devolve só a entidade (as colunas da chave foram acrescentadas aqui)
+    return {"linhas": [linha[0] for linha in linhas], "proximo": proximo}
+
+
+def instalar_indices(conn):
+    """
+    Cria os índices da paginação em um banco que já existia antes deles
+    (os scripts de 'init' só rodam quando o volume do Docker é criado).
+    """
+    with open(ARQUIVO_INDICES, encoding="utf-8") as arquivo:
+        conn.execute(arquivo.read())
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+def _pagina_com_offset(conn, numero, tamanho):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT a.matricula, p.nome, a.cod_mec, p.cpf FROM pessoa p JOIN aluno a ON a.cpf = p.cpf "
+            "ORDER BY p.nome, p.cpf LIMIT %s OFFSET %s;",
+            (tamanho, (numero - 1) * tamanho),
+        )
+        return cur.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Demonstra a paginação por chave (keyset).")
+    parser.add_argument("--dbname", default=DB_PARAMS["dbname"])
+    parser.add_argument("--tamanho", type=int, default=TAMANHO_PADRAO)
+    args = parser.parse_args()
+
+    with psycopg.connect(**{**DB_PARAMS, "dbname": args.dbname}) as conn:
+        instalar_indices(conn)
+        conn.commit()
+
+        print("\n--- 1. Primeiras páginas de cursos ---")
+        pagina = listar_pagina(conn, "cursos", tamanho=2)
+        for numero in (1, 2):
+            for cod_mec, nome, modalidade in pagina["linhas"]:
+                print(f"  Página {numero}: [{cod_mec}] {nome} ({modalidade})")
+            if pagina["proximo"] is None:
+                break
+            print(f"  cursor: {pagina['proximo']}")
+            pagina = listar_pagina(conn, "cursos", pagina["proximo"], tamanho=2)
+
+        print("\n--- 2. Alunos por nome: keyset x OFFSET, página a página ---")
+        cursor, numero = None, 0
+        primeira = ultima = None
+        while True:
+            numero += 1
+            inicio = time.perf_counter()
+            pagina = listar_pagina(conn, "alunos_por_nome", cursor, args.tamanho)
+            duracao = time.perf_counter() - inicio
+            if numero == 1:
+                primeira = duracao
+            ultima = duracao
+            if pagina["proximo"] is None:
+                break
+            cursor = pagina["proximo"]
+        inicio = time.perf_counter()
+        _pagina_com_offset(conn, 1, args.tamanho)
+        offset_primeira = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        _pagina_com_offset(conn, numero, args.tamanho)
+        offset_ultima = time.perf_counter() - inicio
+        print(f"  {numero} páginas de {args.tamanho}")
+        print(f"  Keyset: página 1 em {primeira * 1000:.2f} ms | página {numero} em {ultima * 1000:.2f} ms")
+        print(f"  OFFSET: página 1 em {offset_primeira * 1000:.2f} ms | página {numero} em {offset_ultima * 1000:.2f} ms")
+
+    print("\n--- 3. Mesma paginação no ORM ---")
+    with SessionLocal(bind=obter_engine(dbname=args.dbname)) as session:
+        # 'contains_eager': a pessoa vem do mesmo JOIN usado na ordenação
+        stmt = select(Aluno).join(Aluno.pessoa).options(contains_eager(Aluno.pessoa))
+        pagina = paginar_orm(session, stmt, (Pessoa.nome, Pessoa.cpf), tamanho=3)
+        pagina = paginar_orm(session, stmt, (Pessoa.nome, Pessoa.cpf), pagina["proximo"], tamanho=3)
+        for aluno in pagina["linhas"]:
+            print(f"  Página 2: {aluno}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+# pool_resiliente.py
+#
+# Pool de conexões que aguenta QUEDAS do Postgres.
+#
+# Quando o container do Postgres reinicia:
+# - as conexões paradas no pool morrem, mas o pool continua entregando-as
+#   e cada chamada termina em 'OperationalError';
+# - enquanto o servidor está fora, cada chamada fica esperando o 'timeout'
+#   do pool (30 s por padrão) antes de falhar: a latência dispara.
+#
+# Este módulo junta quatro mecanismos:
+# 1. CHECAGEM: cada conexão é testada antes de ser entregue
+#    ('check=ConnectionPool.check_connection') e uma thread verifica o
+#    servidor e as conexões paradas de tempos em tempos. O próprio pool
+#    reabre as conexões em segundo plano quando o servidor volta.
+# 2. RETENTATIVAS com "backoff" exponencial + aleatório ("jitter"), só para
+#    operações marcadas como IDEMPOTENTES (repetir não muda o resultado) e
+#    sempre dentro de um PRAZO total.
+# 3. DISJUNTOR ("circuit breaker"): depois de N falhas seguidas, as chamadas
+#    falham NA HORA por alguns segundos, em vez de enfileirar atrás de um
+#    servidor morto. Depois disso, uma chamada de teste decide se fecha.
+# 4. MÉTRICAS: taxa de erro recente, número de quedas e tempo de cada
+#    "failover" (da primeira falha até a primeira operação bem-sucedida).
+
+import random
+import threading
+import time
+from collections import deque
+
+import psycopg
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+
+class CircuitoAberto(psycopg.OperationalError):
+    """
+    O disjuntor está aberto: a operação nem foi tentada.
+    É um 'OperationalError', então os 'except psycopg.Error' existentes
+    continuam tratando o caso.
+    """
+
+
+def erro_de_conexao(erro, conn=None):
+    """
+    O erro foi de CONEXÃO (servidor fora, conexão caída)? Só esses contam
+    para o disjuntor e são repetidos.
+    Cuidado: 'QueryCanceled' (statement_timeout), 'DeadlockDetected',
+    'SerializationFailure' etc. também são 'OperationalError', mas o
+    servidor RESPONDEU: são erros de SQL.
+    """
+    if isinstance(erro, PoolTimeout):
+        return True
+    if conn is not None and (conn.broken or conn.closed):
+        return True
+    sqlstate = getattr(erro, "sqlstate", None)
+    if sqlstate is None:
+        # Sem código do servidor: falha do lado do cliente (ex: conexão recusada)
+        return isinstance(erro, psycopg.OperationalError)
+    # Classe 08 (connection exception) e 57P01-57P03 (servidor desligando)
+    return sqlstate.startswith("08") or sqlstate.startswith("57P0")
+
+
+def idempotente(funcao):
+    """
+    Marca uma operação como segura para repetir, por exemplo:
+
+        @idempotente
+        def buscar_curso(conn, cod_mec): ...
+    """
+    funcao.idempotente = True
+    return funcao
+
+
+# 1. DISJUNTOR (CIRCUIT BREAKER)
+class Disjuntor:
+    """
+    Estados:
+    - 'fechado': tudo normal, as chamadas passam;
+    - 'aberto': 'falhas_para_abrir' falhas seguidas; as chamadas falham na
+      hora durante 'tempo_aberto' segundos;
+    - 'meio_aberto': passado esse tempo, UMA chamada de teste é liberada. Se
+      der certo, fecha; se falhar, abre de novo.
+    """
+
+    def __init__(self, falhas_para_abrir=5, tempo_aberto=5.0):
+        self.falhas_para_abrir = falhas_para_abrir
+        self.tempo_aberto = tempo_aberto
+        self.estado = "fechado"
+        self.falhas_seguidas = 0
+        self.aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        with self._lock:
+            if self.estado == "fechado":
+                return
+            if self.estado == "aberto" and time.monotonic() - self.aberto_em >= self.tempo_aberto:
+                self.estado = "meio_aberto"
+            if self.estado == "meio_aberto" and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return
+            restante = max(0.0, self.tempo_aberto - (time.monotonic() - self.aberto_em))
+            raise CircuitoAberto(f"Banco indisponível (disjuntor aberto, nova tentativa em {restante:.1f}s).")
+
+    def sucesso(self):
+        with self._lock:
+            self.estado = "fechado"
+            self.falhas_seguidas = 0
+            self._teste_em_andamento = False
+
+    def abrir(self):
+        """ Abre na hora (ex: a checagem de saúde viu o servidor fora do ar). """
+        with self._lock:
+            if self.estado != "aberto":
+                self.estado = "aberto"
+                self.aberto_em = time.monotonic()
+            self._teste_em_andamento = False
+
+    def falha(self):
+        with self._lock:
+            self.falhas_seguidas += 1
+            if self.estado == "meio_aberto" or self.falhas_seguidas >= self.falhas_para_abrir:
+                self.estado = "aberto"
+                self.aberto_em = time.monotonic()
+            self._teste_em_andamento = False
+
+
+# 2. MÉTRICAS DE DISPONIBILIDADE
+class MetricasResiliencia:
+    """
+    - taxa de erro nas últimas 'janela' segundos;
+    - quedas: quantas vezes passamos de "funcionando" para "falhando";
+    - failover: segundos entre a primeira falha de uma queda e a primeira
+      operação bem-sucedida depois dela.
+    """
+
+    def __init__(self, janela=60.0):
+        self.janela = janela
+        self.operacoes = 0
+        self.erros = 0
+        self.retentativas = 0
+        self.rejeitadas = 0
+        self.quedas = 0
+        self.tempos_failover = []
+        self._recentes = deque()  # (instante, deu_certo)
+        self._inicio_queda = None
+        self._lock = threading.Lock()
+
+    def registrar(self, deu_certo):
+        agora = time.monotonic()
+        with self._lock:
+            self.operacoes += 1
+            self._recentes.append((agora, deu_certo))
+            if deu_certo:
+                if self._inicio_queda is not None:
+                    self.tempos_failover.append(agora - self._inicio_queda)
+                    self._inicio_queda = None
+            else:
+                self.erros += 1
+                if self._inicio_queda is None:
+                    self._inicio_queda = agora
+                    self.quedas += 1
+
+    def registrar_retentativa(self):
+        with self._lock:
+            self.retentativas += 1
+
+    def registrar_rejeicao(self):
+        with self._lock:
+            self.rejeitadas += 1
+
+    def taxa_de_erro(self):
+        limite = time.monotonic() - self.janela
+        with self._lock:
+            while self._recentes and self._recentes[0][0] < limite:
+                self._recentes.popleft()
+            if not self._recentes:
+                return 0.0
+            return sum(1 for _, ok in self._recentes if not ok) / len(self._recentes)
+
+    def para_json(self):
+        taxa = self.taxa_de_erro()
+        with self._lock:
+            return {
+                "operacoes": self.operacoes,
+                "erros": self.erros,
+                "retentativas": self.retentativas,
+                "rejeitadas_pelo_disjuntor": self.rejeitadas,
+                "taxa_de_erro": taxa,
+                "quedas": self.quedas,
+                "em_queda": self._inicio_queda is not None,
+                "ultimo_failover_s": self.tempos_failover[-1] if self.tempos_failover else None,
+                "maior_failover_s": max(self.tempos_failover, default=None),
+            }
+
+    def para_prometheus(self):
+        """ Mesmo formato do instrumentacao.py (texto do Prometheus). """
+        dados = self.para_json()
+        linhas = [
+            "# HELP db_operations_total Operações executadas pelo pool resiliente.",
+            "# TYPE db_operations_total counter",
+            f"db_operations_total {dados['operacoes']}",
+            "# HELP db_operation_errors_total Operações que terminaram em erro.",
+            "# TYPE db_operation_errors_total counter",
+            f"db_operation_errors_total {dados['erros']}",
+            "# HELP db_operation_retries_total Retentativas de operações idempotentes.",
+            "# TYPE db_operation_retries_total counter",
+            f"db_operation_retries_total {dados['retentativas']}",
+            "# HELP db_circuit_rejected_total Operações recusadas com o disjuntor aberto.",
+            "# TYPE db_circuit_rejected_total counter",
+            f"db_circuit_rejected_total {dados['rejeitadas_pelo_disjuntor']}",
+            "# HELP db_error_rate Fração de operações com erro na janela recente.",
+            "# TYPE db_error_rate gauge",
+            f"db_error_rate {dados['taxa_de_erro']}",
+            "# HELP db_outages_total Quedas detectadas.",
+            "# TYPE db_outages_total counter",
+            f"db_outages_total {dados['quedas']}",
+            "# HELP db_failover_seconds Duração da última queda (até a 1ª operação bem-sucedida).",
+            "# TYPE db_failover_seconds gauge",
+            f"db_failover_seconds {dados['ultimo_failover_s'] or 0}",
+        ]
+        return "\n".join(linhas) + "\n"
+
+
+# 3. O POOL RESILIENTE
+class PoolResiliente:
+    """
+    Envolve um ConnectionPool com checagem de saúde, retentativas e disjuntor.
+    Em vez de 'with pool.connection() as conn: ...', a operação é uma função
+    que recebe a conexão:
+
+        pool.executar(buscar_curso, 1001, prazo=2.0)
+
+    - Se a função for '@idempotente' (ou 'idempotente=True'), falhas de
+      CONEXÃO são repetidas com espera aleatória crescente até o 'prazo'.
+    - Erros de dados/SQL (ex: UniqueViolation, QueryCanceled, deadlock)
+      nunca são repetidos nem abrem o disjuntor (ver 'erro_de_conexao').
+    - Operações não idempotentes nunca são repetidas: se a conexão caiu no
+      meio do COMMIT, não dá para saber se a escrita aconteceu.
+    """
+
+    def __init__(self, conninfo, min_size=2, max_size=10, intervalo_verificacao=2.0,
+                 prazo_padrao=5.0, timeout_checkout=1.0, espera_base=0.05, espera_maxima=1.0,
+                 disjuntor=None, metricas=None):
+        self.pool = ConnectionPool(
+            conninfo=conninfo,
+            min_size=min_size,
+            max_size=max_size,
+            # Testa a conexão (um "ping") antes de entregá-la: conexões mortas
+            # por um restart do servidor são descartadas e substituídas
+            check=ConnectionPool.check_connection,
+            # Falhas ao abrir conexões não desistem nunca: o pool continua
+            # tentando em segundo plano até o servidor voltar
+            reconnect_timeout=float("inf"),
+            open=False,
+        )
+        self.intervalo_verificacao = intervalo_verificacao
+        self.prazo_padrao = prazo_padrao
+        self.timeout_checkout = timeout_checkout
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.disjuntor = disjuntor or Disjuntor()
+        self.metricas = metricas or MetricasResiliencia()
+        self.servidor_no_ar = None
+        self._parar = threading.Event()
+        self._monitor = None
+
+    # --- ciclo de vida ---
+    def open(self, wait=False, timeout=30.0):
+        self.pool.open(wait=wait, timeout=timeout)
+        self._parar.clear()
+        self._monitor = threading.Thread(target=self._monitorar, daemon=True)
+        self._monitor.start()
+
+    def close(self):
+        self._parar.set()
+        if self._monitor:
+            self._monitor.join()
+        self.pool.close()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- checagem de saúde em segundo plano ---
+    def _monitorar(self):
+        while not self._parar.wait(self.intervalo_verificacao):
+            self.verificar_saude()
+
+    def verificar_saude(self):
+        """
+        Testa o servidor com uma conexão NOVA (fora do pool, para não esperar
+        na fila) e, se ele estiver no ar, pede ao pool para checar as conexões
+        paradas ('pool.check()' descarta as mortas e repõe o mínimo).
+        Um servidor de volta fecha o disjuntor sem esperar o 'tempo_aberto'.
+        """
+        try:
+            with psycopg.connect(self.pool.conninfo, connect_timeout=2) as conn:
+                conn.execute("SELECT 1;")
+        except psycopg.OperationalError:
+            # Não adianta deixar as chamadas esperando uma conexão do pool
+            self.servidor_no_ar = False
+            self.disjuntor.abrir()
+            return False
+
+        voltou = self.servidor_no_ar is False
+        self.servidor_no_ar = True
+        self.pool.check()
+        if voltou:
+            self.disjuntor.sucesso()
+        return True
+
+    # --- execução ---
+    def executar(self, operacao, *args, idempotente=None, prazo=None, **kwargs):
+        """
+        Executa 'operacao(conn, *args, **kwargs)' em uma transação e devolve
+        o resultado. Levanta 'CircuitoAberto' se o disjuntor estiver aberto.
+        """
+        if idempotente is None:
+            idempotente = getattr(operacao, "idempotente", False)
+        limite = time.monotonic() + (prazo or self.prazo_padrao)
+        tentativa = 0
+
+        while True:
+            try:
+                self.disjuntor.permitir()
+            except CircuitoAberto:
+                self.metricas.registrar_rejeicao()
+                self.metricas.registrar(False)
+                raise
+
+            restante = limite - time.monotonic()
+            conn = None
+            try:
+                # A espera por uma conexão é curta e nunca passa do prazo:
+                # sobra tempo para as retentativas
+                with self.pool.connection(timeout=max(min(restante, self.timeout_checkout), 0.01)) as conn:
+                    with conn.transaction():
+                        resultado = operacao(conn, *args, **kwargs)
+            except (psycopg.Error, PoolTimeout) as e:
+                if not erro_de_conexao(e, conn):
+                    # Erro de SQL/dados (inclusive timeout de query e
+                    # deadlock): o servidor respondeu, a conexão está saudável
+                    self.disjuntor.sucesso()
+                    self.metricas.registrar(True)
+                    raise
+                # Problema de CONEXÃO: conta para o disjuntor
+                self.disjuntor.falha()
+                self.metricas.registrar(False)
+                tentativa += 1
+                espera = random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** tentativa))
+                if not idempotente or time.monotonic() + espera >= limite:
+                    raise
+                self.metricas.registrar_retentativa()
+                time.sleep(espera)
+                continue
+            except Exception:
+                # Erro da própria função: o servidor não tem culpa
+                self.disjuntor.sucesso()
+                self.metricas.registrar(True)
+                raise
+
+            self.disjuntor.sucesso()
+            self.metricas.registrar(True)
+            return resultado
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+@idempotente
+def contar_alunos(conn):
+    return conn.execute("SELECT COUNT(*) FROM aluno;").fetchone()[0]
+
+
+@idempotente
+def consulta_demorada(conn):
+    # Estoura o statement_timeout: 'QueryCanceled' (um OperationalError)
+    conn.execute("SET LOCAL statement_timeout = '50ms';")
+    conn.execute("SELECT pg_sleep(1);")
+
+
+def demonstrar_erros_de_sql(pool, vezes=10):
+    """
+    Erros de SQL seguidos (aqui, timeout de query) NÃO abrem o disjuntor,
+    mesmo passando de 'falhas_para_abrir', e não são repetidos.
+    """
+    print(f"\n--- {vezes} timeouts de query seguidos ---")
+    for _ in range(vezes):
+        try:
+            pool.executar(consulta_demorada)
+        except psycopg.errors.QueryCanceled:
+            pass
+    print(f"  Disjuntor: {pool.disjuntor.estado} | retentativas: {pool.metricas.retentativas}")
+
+
+def main():
+    """
+    Faz uma consulta por segundo. Reinicie o Postgres no meio
+    ('docker compose restart') para ver o disjuntor e o failover.
+    Ctrl+C para sair.
+    """
+    with PoolResiliente(psycopg.conninfo.make_conninfo(**DB_PARAMS), prazo_padrao=2.0) as pool:
+        demonstrar_erros_de_sql(pool)
+
+        print("\n--- Consultando uma vez por segundo (Ctrl+C para sair) ---")
+        try:
+            while True:
+                try:
+                    print(f"  SUCESSO: {pool.executar(contar_alunos)} alunos.")
+                except CircuitoAberto as e:
+                    print(f"  AVISO: {e}")
+                except (psycopg.OperationalError, PoolTimeout) as e:
+                    print(f"  FALHA: {str(e).splitlines()[0]}")
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        print("\n--- Métricas ---")
+        print(pool.metricas.para_prometheus())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# roteamento.py
+#
+# Roteamento de LEITURAS e ESCRITAS entre o servidor principal e réplicas.
+#
+# No example2.py todo o tráfego passa por UM pool, ligado ao servidor
+# principal. No pico de matrículas, consultas como 'buscar_aluno' disputam
+# conexões com as escritas.
+#
+# 'PoolRoteado' mantém um pool para o PRINCIPAL e um para cada RÉPLICA
+# (servidores em "streaming replication", somente leitura):
+# - escritas vão sempre para o principal;
+# - leituras vão para a réplica com MENOR ATRASO, desde que o atraso esteja
+#   abaixo de 'max_atraso' segundos; sem réplica boa, vão para o principal;
+# - uma thread em segundo plano mede o atraso de cada réplica;
+# - "read-your-writes": depois de uma escrita, a 'Sessao' guarda a posição
+#   do WAL (LSN) do commit. As leituras dessa sessão só vão para réplicas que
+#   já aplicaram essa posição; senão, vão para o principal.
+#
+# Teste local com uma réplica de verdade (porta 5433):
+#   pg_basebackup -h localhost -p 5432 -U admin -D /tmp/replica -R -X stream
+#   pg_ctl -D /tmp/replica -o "-p 5433" start
+#   python roteamento.py --replica "host=localhost port=5433 dbname=faculdatabase user=admin password=admin123"
+
+import argparse
+import random
+import threading
+from contextlib import ExitStack, contextmanager
+
+import psycopg
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+from example1 import buscar_aluno
+
+# Atraso da réplica em segundos. Se ela já aplicou tudo o que recebeu, o
+# atraso é 0 (mesmo que o principal esteja parado há horas sem escritas).
+QUERY_ATRASO = """
+SELECT
+    CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END,
+    CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END;
+"""
+
+
+def lsn_para_int(lsn):
+    """ '0/16B3748' -> inteiro (para comparar posições do WAL). """
+    alto, baixo = str(lsn).split("/")
+    return (int(alto, 16) << 32) | int(baixo, 16)
+
+
+# 1. SESSÃO (READ-YOUR-WRITES)
+class Sessao:
+    """
+    Guarda a posição do WAL da última escrita feita por este usuário/requisição.
+    - 'fixada=True' manda TODAS as leituras da sessão para o principal.
+    """
+
+    def __init__(self, fixada=False):
+        self.fixada = fixada
+        self.ultimo_lsn = 0
+
+
+# 2. ESTADO DE UMA RÉPLICA
+class Replica:
+    def __init__(self, nome, pool):
+        self.nome = nome
+        self.pool = pool
+        self.disponivel = False   # só recebe leituras depois da 1ª medição
+        self.atraso = None        # segundos
+        self.lsn_aplicado = 0     # posição do WAL já aplicada
+        self.erro = None
+
+
+# 3. O POOL ROTEADO
+class PoolRoteado:
+    """
+    Pools do principal e das réplicas, com escolha da réplica pelo atraso.
+    Use 'connection(somente_leitura=True)' para leituras e
+    'connection()' para escritas; o resto é igual ao 'ConnectionPool'.
+    """
+
+    def __init__(self, conninfo_principal, conninfos_replicas=(), max_atraso=5.0,
+                 intervalo_verificacao=1.0, min_size=2, max_size=10, timeout_replica=2.0):
+        self.max_atraso = max_atraso
+        self.intervalo_verificacao = intervalo_verificacao
+        self.timeout_replica = timeout_replica
+        self.principal = ConnectionPool(
+            conninfo=conninfo_principal, min_size=min_size, max_size=max_size, open=False
+        )
+        self.replicas = [
+            Replica(f"replica_{i}", ConnectionPool(
+                conninfo=conninfo,
+                min_size=min_size,
+                max_size=max_size,
+                # Uma réplica já recusa escritas; o 'read_only' deixa isso
+                # explícito também quando a "réplica" é um servidor comum (testes)
+                kwargs={"options": "-c default_transaction_read_only=on"},
+                open=False,
+            ))
+            for i, conninfo in enumerate(conninfos_replicas, start=1)
+        ]
+        self.contadores = {"escritas": 0, "leituras_replica": 0, "leituras_principal": 0, "fallbacks": 0}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._monitor = None
+
+    # --- ciclo de vida ---
+    def open(self):
+        self.principal.open(wait=True)
+        for replica in self.replicas:
+            # Réplica fora do ar não impede a aplicação de subir
+            replica.pool.open(wait=False)
+        self.verificar_replicas()
+        self._parar.clear()
+        self._monitor = threading.Thread(target=self._monitorar, daemon=True)
+        self._monitor.start()
+
+    def close(self):
+        self._parar.set()
+        if self._monitor:
+            self._monitor.join()
+        for replica in self.replicas:
+            replica.pool.close()
+        self.principal.close()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- monitoramento do atraso ---
+    def verificar_replicas(self):
+        """ Mede atraso e LSN aplicado de cada réplica (uma consulta por réplica). """
+        for replica in self.replicas:
+            try:
+                with replica.pool.connection(timeout=self.timeout_replica) as conn:
+                    atraso, lsn = conn.execute(QUERY_ATRASO).fetchone()
+                with self._lock:
+                    replica.atraso = float(atraso)
+                    replica.lsn_aplicado = lsn_para_int(lsn)
+                    replica.disponivel = True
+                    replica.erro = None
+            except (psycopg.OperationalError, PoolTimeout) as e:
+                with self._lock:
+                    replica.disponivel = False
+                    replica.erro = str(e)
+
+    def _monitorar(self):
+        while not self._parar.wait(self.intervalo_verificacao):
+            self.verificar_replicas()
+
+    def escolher_replica(self, sessao=None):
+        """
+        Réplica disponível, com atraso <= 'max_atraso' e (se houver sessão)
+        que já aplicou a última escrita dela. Entre as boas, a de menor atraso
+        (empate: sorteio). None se nenhuma servir.
+        """
+        if sessao is not None and sessao.fixada:
+            return None
+        minimo_lsn = sessao.ultimo_lsn if sessao is not None else 0
+        with self._lock:
+            candidatas = [
+                r for r in self.replicas
+                if r.disponivel and r.atraso <= self.max_atraso and r.lsn_aplicado >= minimo_lsn
+            ]
+            if not candidatas:
+                return None
+            menor = min(r.atraso for r in candidatas)
+            return random.choice([r for r in candidatas if r.atraso == menor])
+
+    # --- conexões ---
+    @contextmanager
+    def connection(self, somente_leitura=False, sessao=None):
+        """
+        Conexão roteada.
+        - Escrita: principal. Ao final (depois do commit), guarda o LSN na sessão.
+        - Leitura: réplica escolhida; se ela não entregar conexão a tempo,
+          é marcada como indisponível e a leitura vai para o principal.
+        """
+        with ExitStack() as pilha:
+            conn = None
+            if somente_leitura:
+                replica = self.escolher_replica(sessao)
+                if replica is not None:
+                    try:
+                        conn = pilha.enter_context(replica.pool.connection(timeout=self.timeout_replica))
+                        self._contar("leituras_replica")
+                    except (psycopg.OperationalError, PoolTimeout) as e:
+                        with self._lock:
+                            replica.disponivel = False
+                            replica.erro = str(e)
+                        self._contar("fallbacks")
+                if conn is None:
+                    self._contar("leituras_principal")
+            else:
+                self._contar("escritas")
+
+            if conn is None:
+                conn = pilha.enter_context(self.principal.connection())
+            yield conn
+
+            if not somente_leitura and sessao is not None:
+                # Confirma o que o chamador fez e anota até onde o WAL foi
+                conn.commit()
+                lsn = conn.execute("SELECT pg_current_wal_lsn();").fetchone()[0]
+                sessao.ultimo_lsn = max(sessao.ultimo_lsn, lsn_para_int(lsn))
+
+    def _contar(self, nome):
+        with self._lock:
+            self.contadores[nome] += 1
+
+    def estado(self):
+        with self._lock:
+            return {
+                **self.contadores,
+                "replicas": [
+                    {"nome": r.nome, "disponivel": r.disponivel, "atraso": r.atraso, "erro": r.erro}
+                    for r in self.replicas
+                ],
+            }
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    parser = argparse.ArgumentParser(description="Demonstra o roteamento principal/réplicas.")
+    parser.add_argument("--replica", action="append", default=[], help="conninfo de uma réplica (pode repetir)")
+    parser.add_argument("--max-atraso", type=float, default=5.0)
+    args = parser.parse_args()
+
+    conninfo = psycopg.conninfo.make_conninfo(**DB_PARAMS)
+    # Sem réplicas informadas, usamos o próprio principal como "réplica"
+    replicas = args.replica or [conninfo]
+
+    with PoolRoteado(conninfo, replicas, max_atraso=args.max_atraso) as pool:
+        print("\n--- 1. Leitura roteada para a réplica ---")
+        with pool.connection(somente_leitura=True) as conn:
+            buscar_aluno(conn, 'A0001')
+
+        print("\n--- 2. Escrita + leitura na mesma sessão (read-your-writes) ---")
+        sessao = Sessao()
+        with pool.connection(sessao=sessao) as conn:
+            novo_id = conn.execute("""
+                INSERT INTO afinidade_professor (matricula_professor, cod_disciplina, data_inclusao)
+                VALUES ('P0001', 'D001', CURRENT_DATE) RETURNING id;
+            """).fetchone()[0]
+        with pool.connection(somente_leitura=True, sessao=sessao) as conn:
+            achou = conn.execute("SELECT 1 FROM afinidade_professor WHERE id = %s;", (novo_id,)).fetchone()
+            print(f"  Afinidade {novo_id} visível na leitura seguinte: {'SIM' if achou else 'NÃO'}")
+        with pool.connection() as conn:
+            conn.execute("DELETE FROM afinidade_professor WHERE id = %s;", (novo_id,))
+
+        print("\n--- 3. Estado do roteamento ---")
+        estado = pool.estado()
+        print(f"  Escritas: {estado['escritas']} | Leituras na réplica: {estado['leituras_replica']}"
+              f" | no principal: {estado['leituras_principal']} | fallbacks: {estado['fallbacks']}")
+        for replica in estado["replicas"]:
+            print(f"  {replica['nome']}: disponível={replica['disponivel']} atraso={replica['atraso']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+# sincronizacao.py
+#
+# Sincronização EM MASSA de 'afinidade_professor' e 'oferta_semestre'.
+#
+# Importar as afinidades do sistema de RH chamando
+# 'adicionar_afinidade_com_tratamento' (example2.py) linha a linha custa uma
+# ida e volta por linha e, para cada afinidade que já existe, uma exceção
+# 'UniqueViolation' seguida de ROLLBACK.
+#
+# Aqui o conjunto inteiro é:
+#   1. copiado com COPY para uma tabela TEMPORÁRIA ("staging"), que some no
+#      fim da transação ('ON COMMIT DROP');
+#   2. aplicado em UM comando SQL: 'INSERT ... ON CONFLICT DO UPDATE' para
+#      inserir/atualizar e, opcionalmente, o encerramento das linhas que não
+#      vieram no conjunto. Os 'WITH' (CTEs) juntam tudo e devolvem as contagens.
+#
+# As ofertas são identificadas pela chave natural (semestre, afinidade,
+# dia, horário de início) criada em init_oferta_chave_natural.sql.
+
+import os
+import time
+from datetime import date, time as hora
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+ARQUIVO_CHAVE_NATURAL = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "facul-database", "init", "init_oferta_chave_natural.sql"
+)
+
+
+# 1. AFINIDADES
+QUERY_MERGE_AFINIDADES = """
+WITH entrada AS (
+    -- Uma linha por (professor, disciplina). Sem data informada, mantém a
+    -- data que já está no banco (ou usa hoje, se a afinidade for nova).
+    SELECT DISTINCT ON (s.matricula_professor, s.cod_disciplina)
+        s.matricula_professor,
+        s.cod_disciplina,
+        COALESCE(s.data_inclusao, ap.data_inclusao, CURRENT_DATE) AS data_inclusao
+    FROM stg_afinidade s
+    LEFT JOIN afinidade_professor ap
+        ON ap.matricula_professor = s.matricula_professor AND ap.cod_disciplina = s.cod_disciplina
+    ORDER BY s.matricula_professor, s.cod_disciplina, s.data_inclusao DESC NULLS LAST
+),
+validas AS (
+    -- Professor ou disciplina inexistentes quebrariam a chave estrangeira
+    -- (e o comando inteiro): essas linhas são contadas como rejeitadas
+    SELECT e.*
+    FROM entrada e
+    JOIN professor p ON p.matricula = e.matricula_professor
+    JOIN disciplina d ON d.cod_disciplina = e.cod_disciplina
+),
+gravadas AS (
+    INSERT INTO afinidade_professor AS ap (matricula_professor, cod_disciplina, data_inclusao)
+    SELECT matricula_professor, cod_disciplina, data_inclusao FROM validas
+    ON CONFLICT (matricula_professor, cod_disciplina) DO UPDATE
+        SET data_inclusao = EXCLUDED.data_inclusao,
+            data_encerramento = NULL
+        -- Só conta como atualizada se algo mudou (ou se estava encerrada)
+        WHERE ap.data_encerramento IS NOT NULL
+           OR ap.data_inclusao IS DISTINCT FROM EXCLUDED.data_inclusao
+    -- xmax = 0: a linha acabou de ser inserida (não é uma atualização)
+    RETURNING (xmax = 0) AS inserida
+),
+encerradas AS (
+    UPDATE afinidade_professor ap
+    SET data_encerramento = CURRENT_DATE
+    WHERE %(encerrar)s
+      AND ap.data_encerramento IS NULL
+      AND (%(professores)s::varchar[] IS NULL OR ap.matricula_professor = ANY(%(professores)s::varchar[]))
+      AND NOT EXISTS (
+          SELECT 1 FROM entrada e
+          WHERE e.matricula_professor = ap.matricula_professor AND e.cod_disciplina = ap.cod_disciplina
+      )
+    RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM gravadas WHERE inserida),
+    (SELECT count(*) FROM gravadas WHERE NOT inserida),
+    (SELECT count(*) FROM validas),
+    (SELECT count(*) FROM entrada),
+    (SELECT count(*) FROM encerradas);
+"""
+
+
+def sincronizar_afinidades(pool, afinidades, encerrar_ausentes=False, professores=None):
+    """
+    Aplica um conjunto de afinidades em uma transação.
+    - 'afinidades': iterável de (matricula_professor, cod_disciplina, data_inclusao);
+      'data_inclusao' pode ser None.
+    - Afinidades que já existem são atualizadas (e reabertas, se estavam encerradas).
+    - 'encerrar_ausentes=True': afinidades ativas que NÃO vieram no conjunto
+      recebem 'data_encerramento = hoje'. Com 'professores' (lista de
+      matrículas), só as desses professores (sincronização parcial).
+
+    Retorna {"inseridas", "atualizadas", "inalteradas", "rejeitadas", "encerradas"}.
+    """
+    with pool.connection() as conn:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TEMP TABLE stg_afinidade (
+                        matricula_professor varchar(20),
+                        cod_disciplina varchar(10),
+                        data_inclusao date
+                    ) ON COMMIT DROP;
+                """)
+                with cur.copy("COPY stg_afinidade FROM STDIN") as copy:
+                    for linha in afinidades:
+                        copy.write_row(linha)
+
+                cur.execute(QUERY_MERGE_AFINIDADES, {
+                    "encerrar": encerrar_ausentes,
+                    "professores": list(professores) if professores is not None else None,
+                })
+                inseridas, atualizadas, validas, entrada, encerradas = cur.fetchone()
+
+    return {
+        "inseridas": inseridas,
+        "atualizadas": atualizadas,
+        "inalteradas": validas - inseridas - atualizadas,
+        "rejeitadas": entrada - validas,
+        "encerradas": encerradas,
+    }
+
+
+# 2. OFERTAS DO SEMESTRE
+QUERY_MERGE_OFERTAS = """
+WITH entrada AS (
+    -- A oferta chega com professor + disciplina; o banco guarda o id da afinidade
+    SELECT DISTINCT ON (ap.id, s.dia_semana, s.horario_ini)
+        ap.id AS id_afinidade_professor,
+        s.codigo_sala, s.dia_semana, s.horario_ini, s.horario_fim
+    FROM stg_oferta s
+    JOIN afinidade_professor ap
+        ON ap.matricula_professor = s.matricula_professor AND ap.cod_disciplina = s.cod_disciplina
+    JOIN salas sa ON sa.codigo = s.codigo_sala
+    ORDER BY ap.id, s.dia_semana, s.horario_ini
+),
+gravadas AS (
+    INSERT INTO oferta_semestre AS os
+        (semestre, id_afinidade_professor, codigo_sala, dia_semana, horario_ini, horario_fim)
+    SELECT %(semestre)s, id_afinidade_professor, codigo_sala, dia_semana, horario_ini, horario_fim
+    FROM entrada
+    ON CONFLICT (semestre, id_afinidade_professor, dia_semana, horario_ini) DO UPDATE
+        SET codigo_sala = EXCLUDED.codigo_sala,
+            horario_fim = EXCLUDED.horario_fim
+        WHERE (os.codigo_sala, os.horario_fim) IS DISTINCT FROM (EXCLUDED.codigo_sala, EXCLUDED.horario_fim)
+    RETURNING (xmax = 0) AS inserida
+),
+ausentes AS (
+    SELECT os.id, EXISTS (SELECT 1 FROM horario_aluno ha WHERE ha.id_oferta_semestre = os.id) AS com_alunos
+    FROM oferta_semestre os
+    WHERE %(remover)s
+      AND os.semestre = %(semestre)s
+      AND NOT EXISTS (
+          SELECT 1 FROM entrada e
+          WHERE e.id_afinidade_professor = os.id_afinidade_professor
+            AND e.dia_semana IS NOT DISTINCT FROM os.dia_semana
+            AND e.horario_ini IS NOT DISTINCT FROM os.horario_ini
+      )
+),
+removidas AS (
+    -- Ofertas com alunos matriculados ficam (a chave estrangeira de
+    -- 'horario_aluno' impediria o DELETE e desfaria tudo)
+    DELETE FROM oferta_semestre os
+    USING ausentes a
+    WHERE os.id = a.id AND NOT a.com_alunos
+    RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM gravadas WHERE inserida),
+    (SELECT count(*) FROM gravadas WHERE NOT inserida),
+    (SELECT count(*) FROM entrada),
+    (SELECT count(*) FROM stg_oferta),
+    (SELECT count(*) FROM removidas),
+    (SELECT count(*) FROM ausentes WHERE com_alunos);
+"""
+
+
+def sincronizar_ofertas(pool, semestre, ofertas, remover_ausentes=False):
+    """
+    Aplica a grade de um semestre em uma transação.
+    - 'ofertas': iterável de (matricula_professor, cod_disciplina, codigo_sala,
+      dia_semana, horario_ini, horario_fim).
+    - Uma oferta que já existe (mesma afinidade, dia e início) tem sala e
+      horário de fim atualizados.
+    - 'remover_ausentes=True': ofertas do semestre que NÃO vieram na grade são
+      apagadas ('oferta_semestre' não tem data de encerramento), exceto as que
+      já têm alunos matriculados, que são apenas contadas.
+
+    Retorna {"inseridas", "atualizadas", "inalteradas", "rejeitadas",
+             "removidas", "mantidas_com_alunos"}.
+    """
+    with pool.connection() as conn:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TEMP TABLE stg_oferta (
+                        matricula_professor varchar(20),
+                        cod_disciplina varchar(10),
+                        codigo_sala varchar(20),
+                        dia_semana char(3),
+                        horario_ini time,
+                        horario_fim time
+                    ) ON COMMIT DROP;
+                """)
+                with cur.copy("COPY stg_oferta FROM STDIN") as copy:
+                    for linha in ofertas:
+                        copy.write_row(linha)
+
+                cur.execute(QUERY_MERGE_OFERTAS, {"semestre": semestre, "remover": remover_ausentes})
+                inseridas, atualizadas, validas, total, removidas, com_alunos = cur.fetchone()
+
+    return {
+        "inseridas": inseridas,
+        "atualizadas": atualizadas,
+        "inalteradas": validas - inseridas - atualizadas,
+        # Sem afinidade/sala correspondente ou repetidas na própria entrada
+        "rejeitadas": total - validas,
+        "removidas": removidas,
+        "mantidas_com_alunos": com_alunos,
+    }
+
+
+def instalar_chave_natural(conn):
+    """
+    Cria o índice único das ofertas em um banco que já existia antes dele
+    (os scripts de 'init' só rodam quando o volume do Docker é criado).
+    """
+    with open(ARQUIVO_CHAVE_NATURAL, encoding="utf-8") as arquivo:
+        conn.execute(arquivo.read())
+
+
+# 3. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    pool = ConnectionPool(
+        conninfo=psycopg.conninfo.make_conninfo(**DB_PARAMS),
+        min_size=2,
+        max_size=10,
+        open=False
+    )
+
+    with pool:
+        with pool.connection() as conn:
+            instalar_chave_natural(conn)
+            originais = conn.execute(
+                "SELECT matricula_professor, cod_disciplina, data_inclusao FROM afinidade_professor "
+                "WHERE matricula_professor = 'P0001' AND data_encerramento IS NULL;"
+            ).fetchall()
+
+        print("\n--- 1. Sincronizando as afinidades do P0001 (vindas do RH) ---")
+        do_rh = originais[1:] + [
+            ('P0001', 'D001', date(2025, 2, 1)),  # nova
+            ('P0001', 'D999', None),              # disciplina não existe
+        ]
+        inicio = time.perf_counter()
+        contagens = sincronizar_afinidades(pool, do_rh, encerrar_ausentes=True, professores=['P0001'])
+        print(f"  {contagens} em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+        print("\n--- 2. Reenviando o conjunto original (reabre a encerrada) ---")
+        print(f"  {sincronizar_afinidades(pool, originais, encerrar_ausentes=True, professores=['P0001'])}")
+
+        print("\n--- 3. Grade do semestre 2025.2 ---")
+        grade = [
+            ('P0001', 'D001', 'S01', 'Seg', hora(8), hora(10)),
+            ('P0001', 'D001', 'S02', 'Qua', hora(8), hora(10)),
+        ]
+        print(f"  Envio:   {sincronizar_ofertas(pool, '2025.2', grade)}")
+        grade[1] = ('P0001', 'D001', 'S03', 'Qua', hora(8), hora(10))  # troca de sala
+        print(f"  Reenvio: {sincronizar_ofertas(pool, '2025.2', grade[1:], remover_ausentes=True)}")
+
+        # Desfaz o exemplo
+        with pool.connection() as conn:
+            conn.execute(
+                "DELETE FROM oferta_semestre WHERE semestre = '2025.2' AND id_afinidade_professor IN "
+                "(SELECT id FROM afinidade_professor WHERE matricula_professor = 'P0001' AND cod_disciplina = 'D001');"
+            )
+            conn.execute(
+                "DELETE FROM afinidade_professor WHERE matricula_professor = 'P0001' AND cod_disciplina = 'D001';"
+            )
+
+
+if __name__ == "__main__":
+    main()
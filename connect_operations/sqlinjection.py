@@ -8,13 +8,7 @@
 
 import psycopg
 
-DB_PARAMS = {
-    "dbname": "faculdatabase",
-    "user": "admin",
-    "password": "admin123",
-    "host": "localhost",
-    "port": "5432"
-}
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
 
 def buscar_aluno_vulneravel(conn, matricula_input_usuario):
     """
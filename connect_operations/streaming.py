@@ -0,0 +1,142 @@
+# streaming.py
+#
+# Leitura de resultados GRANDES sem carregar tudo na memória.
+#
+# O 'cur.fetchall()' usado no example1.py traz o resultado inteiro para o
+# Python de uma vez. Com tabelas grandes ('horario_aluno', 'pessoa') isso
+# pode consumir toda a memória do processo.
+#
+# Aqui usamos CURSORES NOMEADOS (server-side): o resultado fica guardado no
+# Postgres e o Python busca só um pedaço ('itersize' linhas) por vez.
+# A memória usada fica constante, não importa o tamanho do resultado.
+
+import itertools
+from contextlib import nullcontext
+
+import psycopg
+from psycopg.rows import dict_row
+
+from conexao import DB_PARAMS  # Configuração única (conexao.py)
+
+# Cada cursor nomeado precisa de um nome único dentro da conexão
+_contador_cursores = itertools.count(1)
+
+
+# 1. GERADOR LINHA A LINHA
+def ler_em_streaming(conn, query, params=None, itersize=2000, row_factory=None):
+    """
+    Gera as linhas de 'query' uma a uma, buscando 'itersize' linhas do
+    servidor por vez.
+    - 'row_factory' pode ser None (tuplas) ou, por exemplo, 'dict_row'.
+    - Cursores nomeados só existem dentro de uma transação. Se a conexão NÃO
+      estiver em autocommit, o psycopg abre a transação sozinho; se estiver,
+      o gerador abre uma com 'conn.transaction()'.
+    - O cursor é fechado no servidor quando o gerador termina ou é descartado
+      (ex: um 'break' no meio do 'for').
+    """
+    nome = f"streaming_{next(_contador_cursores)}"
+    with _transacao_se_autocommit(conn):
+        with conn.cursor(name=nome, row_factory=row_factory) as cur:
+            # 'itersize' = quantas linhas cada ida ao servidor traz
+            cur.itersize = itersize
+            cur.execute(query, params)
+            yield from cur
+
+
+# 2. GERADOR EM LOTES
+def ler_em_lotes(conn, query, params=None, tamanho_lote=2000, row_factory=None):
+    """
+    Igual ao 'ler_em_streaming', mas entrega LISTAS de até 'tamanho_lote'
+    linhas (usando 'fetchmany'). Útil para processar ou gravar em blocos.
+    """
+    nome = f"streaming_{next(_contador_cursores)}"
+    with _transacao_se_autocommit(conn):
+        with conn.cursor(name=nome, row_factory=row_factory) as cur:
+            cur.execute(query, params)
+            while True:
+                lote = cur.fetchmany(tamanho_lote)
+                if not lote:
+                    break
+                yield lote
+
+
+def _transacao_se_autocommit(conn):
+    # Em autocommit não existe transação implícita, então criamos uma.
+    # Fora de autocommit, um 'nullcontext' não faz nada.
+    if conn.autocommit:
+        return conn.transaction()
+    return nullcontext()
+
+
+# 3. RELATÓRIOS DE TABELA INTEIRA
+def streaming_horarios_semestre(conn, semestre, itersize=2000, row_factory=dict_row):
+    """
+    Versão "tabela inteira" do 'ver_horario_aluno': todos os horários de
+    todos os alunos no semestre, sem 'fetchall()'.
+    """
+    query = """
+    SELECT
+        ha.matricula_aluno,
+        d.nome AS disciplina,
+        p.nome AS professor,
+        os.codigo_sala,
+        os.dia_semana,
+        os.horario_ini,
+        os.horario_fim
+    FROM horario_aluno ha
+    JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+    JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+    JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+    JOIN professor prof ON ap.matricula_professor = prof.matricula
+    JOIN pessoa p ON prof.cpf = p.cpf
+    WHERE os.semestre = %s
+    ORDER BY ha.matricula_aluno, os.dia_semana, os.horario_ini;
+    """
+    return ler_em_streaming(conn, query, (semestre,), itersize, row_factory)
+
+
+def streaming_pessoas(conn, itersize=2000, row_factory=None):
+    """ Todas as pessoas cadastradas, em streaming. """
+    query = "SELECT cpf, nome, email, data_nascimento FROM pessoa ORDER BY cpf;"
+    return ler_em_streaming(conn, query, itersize=itersize, row_factory=row_factory)
+
+
+def streaming_cursos(conn, itersize=2000, row_factory=None):
+    """ Equivalente em streaming do 'listar_cursos' do example1.py. """
+    query = "SELECT cod_mec, nome, modalidade FROM curso ORDER BY nome;"
+    return ler_em_streaming(conn, query, itersize=itersize, row_factory=row_factory)
+
+
+def streaming_salas(conn, itersize=2000, row_factory=None):
+    """ Equivalente em streaming do 'exercicio_1_ler_salas' do exercise.py. """
+    query = "SELECT codigo, tipo, capacidade FROM salas ORDER BY codigo;"
+    return ler_em_streaming(conn, query, itersize=itersize, row_factory=row_factory)
+
+
+# 4. FUNÇÃO PRINCIPAL (MAIN)
+def main():
+    try:
+        with psycopg.connect(**DB_PARAMS) as conn:
+            print("--- CONEXÃO BEM-SUCEDIDA! ---")
+
+            print("\n--- 1. Cursos (tuplas, linha a linha) ---")
+            for curso in streaming_cursos(conn):
+                print(f"  -> [{curso[0]}] {curso[1]} (Modalidade: {curso[2]})")
+
+            print("\n--- 2. Horários de 2025.1 (dicionários, linha a linha) ---")
+            total = 0
+            for item in streaming_horarios_semestre(conn, '2025.1', itersize=500):
+                total += 1
+            print(f"  {total} horários lidos sem carregar a tabela inteira.")
+
+            print("\n--- 3. Pessoas em lotes de 100 ---")
+            query = "SELECT cpf, nome FROM pessoa ORDER BY cpf;"
+            for numero, lote in enumerate(ler_em_lotes(conn, query, tamanho_lote=100), start=1):
+                print(f"  Lote {numero}: {len(lote)} pessoas (primeira: {lote[0][1]})")
+
+    except psycopg.OperationalError as e:
+        print(f"\n--- ERRO DE CONEXÃO ---\nDetalhe: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+-- --------------------------------------------------------
+-- Horário dos alunos "materializado" (desnormalizado)
+-- --------------------------------------------------------
+--
+-- O horário de um aluno exige 5 JOINs:
+--   horario_aluno -> oferta_semestre -> afinidade_professor
+--                 -> disciplina / professor -> pessoa
+-- Como os horários quase não mudam durante o semestre, guardamos o
+-- resultado pronto na tabela "horario_aluno_mat", com índice em
+-- (matricula_aluno, semestre). A leitura vira um único SELECT por índice
+-- (veja 'ver_horario_aluno(..., materializado=True)' no example1.py).
+--
+-- A tabela é mantida INCREMENTALMENTE por gatilhos: cada alteração nas
+-- tabelas de origem atualiza apenas as linhas afetadas, na mesma transação.
+-- (Obs: em cargas muito grandes de horario_aluno, os gatilhos por linha
+-- deixam a carga mais lenta.)
+--
+-- Para aplicar em um banco que já existe:
+--   psql -h localhost -U admin -d faculdatabase -f init_horario_materializado.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "horario_aluno_mat" (
+  "id_horario" varchar(15) NOT NULL PRIMARY KEY,
+  "matricula_aluno" varchar(20) NOT NULL,
+  "semestre" varchar(8) NOT NULL,
+  "id_oferta_semestre" integer NOT NULL,
+  "cod_disciplina" varchar(10) NOT NULL,
+  "disciplina" varchar(255) NOT NULL,
+  "matricula_professor" varchar(20) NOT NULL,
+  "professor" varchar(255) NOT NULL,
+  "codigo_sala" varchar(20) NOT NULL,
+  "dia_semana" char(3) DEFAULT NULL,
+  "horario_ini" time DEFAULT NULL,
+  "horario_fim" time DEFAULT NULL
+);
+
+-- Índice principal da leitura
+CREATE INDEX IF NOT EXISTS "idx_horario_aluno_mat_matricula_semestre"
+  ON "horario_aluno_mat" ("matricula_aluno", "semestre");
+-- Índices usados pelos gatilhos para achar as linhas afetadas
+CREATE INDEX IF NOT EXISTS "idx_horario_aluno_mat_id_oferta_semestre" ON "horario_aluno_mat" ("id_oferta_semestre");
+CREATE INDEX IF NOT EXISTS "idx_horario_aluno_mat_cod_disciplina" ON "horario_aluno_mat" ("cod_disciplina");
+CREATE INDEX IF NOT EXISTS "idx_horario_aluno_mat_matricula_professor" ON "horario_aluno_mat" ("matricula_professor");
+
+-- Recalcula as linhas de um conjunto de horários (apaga e insere de novo)
+CREATE OR REPLACE FUNCTION horario_mat_recalcular(ids varchar[]) RETURNS void AS $$
+BEGIN
+  DELETE FROM horario_aluno_mat WHERE id_horario = ANY(ids);
+  INSERT INTO horario_aluno_mat
+  SELECT ha.id, ha.matricula_aluno, os.semestre, os.id,
+         d.cod_disciplina, d.nome, prof.matricula, p.nome,
+         os.codigo_sala, os.dia_semana, os.horario_ini, os.horario_fim
+  FROM horario_aluno ha
+  JOIN oferta_semestre os ON ha.id_oferta_semestre = os.id
+  JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+  JOIN disciplina d ON ap.cod_disciplina = d.cod_disciplina
+  JOIN professor prof ON ap.matricula_professor = prof.matricula
+  JOIN pessoa p ON prof.cpf = p.cpf
+  WHERE ha.id = ANY(ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- horario_aluno: matrícula/cancelamento de um aluno em uma oferta
+CREATE OR REPLACE FUNCTION horario_mat_horario_aluno() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM horario_aluno_mat WHERE id_horario = OLD.id;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM horario_mat_recalcular(ARRAY[NEW.id]);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "horario_aluno_mat_sync" ON "horario_aluno";
+CREATE TRIGGER "horario_aluno_mat_sync"
+  AFTER INSERT OR UPDATE OR DELETE ON "horario_aluno"
+  FOR EACH ROW EXECUTE FUNCTION horario_mat_horario_aluno();
+
+-- oferta_semestre: mudança de sala, dia, horário, semestre ou professor
+CREATE OR REPLACE FUNCTION horario_mat_oferta_semestre() RETURNS trigger AS $$
+BEGIN
+  PERFORM horario_mat_recalcular(ARRAY(
+    SELECT id FROM horario_aluno WHERE id_oferta_semestre = NEW.id
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "oferta_semestre_mat_sync" ON "oferta_semestre";
+CREATE TRIGGER "oferta_semestre_mat_sync"
+  AFTER UPDATE ON "oferta_semestre"
+  FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+  EXECUTE FUNCTION horario_mat_oferta_semestre();
+
+-- afinidade_professor: troca do professor ou da disciplina
+CREATE OR REPLACE FUNCTION horario_mat_afinidade_professor() RETURNS trigger AS $$
+BEGIN
+  PERFORM horario_mat_recalcular(ARRAY(
+    SELECT ha.id
+    FROM oferta_semestre os
+    JOIN horario_aluno ha ON ha.id_oferta_semestre = os.id
+    WHERE os.id_afinidade_professor = NEW.id
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "afinidade_professor_mat_sync" ON "afinidade_professor";
+CREATE TRIGGER "afinidade_professor_mat_sync"
+  AFTER UPDATE OF "matricula_professor", "cod_disciplina" ON "afinidade_professor"
+  FOR EACH ROW
+  WHEN (OLD.matricula_professor IS DISTINCT FROM NEW.matricula_professor
+        OR OLD.cod_disciplina IS DISTINCT FROM NEW.cod_disciplina)
+  EXECUTE FUNCTION horario_mat_afinidade_professor();
+
+-- disciplina: nome da disciplina
+CREATE OR REPLACE FUNCTION horario_mat_disciplina() RETURNS trigger AS $$
+BEGIN
+  UPDATE horario_aluno_mat
+     SET disciplina = NEW.nome, cod_disciplina = NEW.cod_disciplina
+   WHERE cod_disciplina = OLD.cod_disciplina;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "disciplina_mat_sync" ON "disciplina";
+CREATE TRIGGER "disciplina_mat_sync"
+  AFTER UPDATE OF "nome", "cod_disciplina" ON "disciplina"
+  FOR EACH ROW
+  WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.cod_disciplina IS DISTINCT FROM NEW.cod_disciplina)
+  EXECUTE FUNCTION horario_mat_disciplina();
+
+-- pessoa: nome do professor
+CREATE OR REPLACE FUNCTION horario_mat_pessoa() RETURNS trigger AS $$
+BEGIN
+  UPDATE horario_aluno_mat
+     SET professor = NEW.nome
+   WHERE matricula_professor IN (SELECT matricula FROM professor WHERE cpf = NEW.cpf);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "pessoa_mat_sync" ON "pessoa";
+CREATE TRIGGER "pessoa_mat_sync"
+  AFTER UPDATE OF "nome" ON "pessoa"
+  FOR EACH ROW WHEN (OLD.nome IS DISTINCT FROM NEW.nome)
+  EXECUTE FUNCTION horario_mat_pessoa();
+
+-- professor: troca da pessoa (cpf) ligada à matrícula
+CREATE OR REPLACE FUNCTION horario_mat_professor() RETURNS trigger AS $$
+BEGIN
+  UPDATE horario_aluno_mat
+     SET professor = (SELECT nome FROM pessoa WHERE cpf = NEW.cpf)
+   WHERE matricula_professor = NEW.matricula;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "professor_mat_sync" ON "professor";
+CREATE TRIGGER "professor_mat_sync"
+  AFTER UPDATE OF "cpf" ON "professor"
+  FOR EACH ROW WHEN (OLD.cpf IS DISTINCT FROM NEW.cpf)
+  EXECUTE FUNCTION horario_mat_professor();
+
+-- Carga inicial (ou reconstrução completa) a partir das tabelas de origem
+TRUNCATE "horario_aluno_mat";
+SELECT horario_mat_recalcular(ARRAY(SELECT id FROM horario_aluno));
+ANALYZE "horario_aluno_mat";
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- --------------------------------------------------------
+-- Índices para a paginação por chave ("keyset")
+-- --------------------------------------------------------
+--
+-- A paginação de connect_operations/paginacao.py busca a próxima página com
+--   WHERE (nome, cod_mec) > (<última linha>) ORDER BY nome, cod_mec LIMIT n
+-- Com um índice na MESMA ordem, o Postgres desce direto até a última linha
+-- vista e lê só 'n' linhas: a página 1.000 custa o mesmo que a página 1.
+--
+-- 'aluno' (matricula), 'salas' (codigo) e 'disciplina' (cod_disciplina) já
+-- são ordenadas pela chave primária.
+--
+-- Este arquivo pode ser executado mais de uma vez sem erro.
+
+CREATE INDEX IF NOT EXISTS "idx_curso_nome_cod_mec" ON "curso" ("nome", "cod_mec");
+CREATE INDEX IF NOT EXISTS "idx_pessoa_nome_cpf" ON "pessoa" ("nome", "cpf");
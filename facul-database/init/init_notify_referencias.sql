@@ -0,0 +1,41 @@
+-- --------------------------------------------------------
+-- Avisos de alteração nas tabelas de referência
+-- --------------------------------------------------------
+--
+-- 'curso', 'disciplina' e 'salas' mudam poucas vezes por semestre, então a
+-- aplicação guarda essas tabelas em cache (connect_operations/cache_referencias.py).
+-- Estes gatilhos mandam um NOTIFY no canal 'referencias_alteradas' com o
+-- nome da tabela sempre que houver INSERT, UPDATE ou DELETE, para que o
+-- cache seja invalidado na hora.
+--
+-- O NOTIFY só é entregue quando a transação faz COMMIT, então quem escuta
+-- nunca recebe aviso de uma alteração que foi desfeita (rollback).
+--
+-- Este arquivo pode ser executado mais de uma vez sem erro.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION notificar_referencia_alterada() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('referencias_alteradas', TG_TABLE_NAME);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- FOR EACH STATEMENT: um aviso por comando, mesmo que ele altere várias linhas
+DROP TRIGGER IF EXISTS "curso_notificar_alteracao" ON "curso";
+CREATE TRIGGER "curso_notificar_alteracao"
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "curso"
+  FOR EACH STATEMENT EXECUTE FUNCTION notificar_referencia_alterada();
+
+DROP TRIGGER IF EXISTS "disciplina_notificar_alteracao" ON "disciplina";
+CREATE TRIGGER "disciplina_notificar_alteracao"
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "disciplina"
+  FOR EACH STATEMENT EXECUTE FUNCTION notificar_referencia_alterada();
+
+DROP TRIGGER IF EXISTS "salas_notificar_alteracao" ON "salas";
+CREATE TRIGGER "salas_notificar_alteracao"
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "salas"
+  FOR EACH STATEMENT EXECUTE FUNCTION notificar_referencia_alterada();
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- --------------------------------------------------------
+-- Chave natural de "oferta_semestre"
+-- --------------------------------------------------------
+--
+-- O 'id' da oferta é um SERIAL, gerado pelo banco. Um sistema externo (ex:
+-- a grade enviada pela secretaria) não conhece esse id: ele identifica a
+-- oferta pelo semestre, pela afinidade (professor + disciplina) e pelo
+-- dia/horário de início.
+--
+-- Este índice único permite o 'INSERT ... ON CONFLICT' usado na
+-- sincronização em massa (connect_operations/sincronizacao.py).
+-- NULLS NOT DISTINCT: ofertas sem dia/horário também não se repetem.
+--
+-- Este arquivo pode ser executado mais de uma vez sem erro.
+
+CREATE UNIQUE INDEX IF NOT EXISTS "oferta_semestre_chave_natural"
+  ON "oferta_semestre" ("semestre", "id_afinidade_professor", "dia_semana", "horario_ini")
+  NULLS NOT DISTINCT;
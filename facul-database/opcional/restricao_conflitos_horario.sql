@@ -0,0 +1,85 @@
+-- --------------------------------------------------------
+-- Restrições de choque de horário em "oferta_semestre" (OPCIONAL)
+-- --------------------------------------------------------
+--
+-- Mesma regra do 'conflitos_horario.py', garantida pelo próprio banco:
+-- no mesmo semestre e dia, uma SALA e um PROFESSOR não podem ter duas
+-- ofertas com horários sobrepostos. Encostar não é choque (08-10 e 10-12).
+--
+-- Este arquivo NÃO fica em 'init/' porque os dados do init.sql já têm
+-- alguns choques; com eles, a restrição não pode ser criada. Instale com
+-- 'instalar_restricoes(conn)' do conflitos_horario.py, que confere os
+-- dados antes, ou diretamente:
+--   psql -h localhost -U admin -d faculdatabase -f restricao_conflitos_horario.sql
+
+BEGIN;
+
+-- Permite usar '=' com colunas comuns (varchar, char) em um índice GiST
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Intervalo de horários do dia (o Postgres não tem um "timerange" pronto)
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'timerange') THEN
+    CREATE TYPE timerange AS RANGE (subtype = time);
+  END IF;
+END
+$$;
+
+-- 1. SALA: restrição de exclusão ('&&' = intervalos se sobrepõem)
+ALTER TABLE "oferta_semestre" DROP CONSTRAINT IF EXISTS "oferta_semestre_sala_sem_choque";
+ALTER TABLE "oferta_semestre"
+  ADD CONSTRAINT "oferta_semestre_sala_sem_choque" EXCLUDE USING gist (
+    "semestre" WITH =,
+    "codigo_sala" WITH =,
+    "dia_semana" WITH =,
+    timerange("horario_ini", "horario_fim") WITH &&
+  ) WHERE ("dia_semana" IS NOT NULL AND "horario_ini" IS NOT NULL AND "horario_fim" IS NOT NULL);
+
+-- 2. PROFESSOR: o professor está em "afinidade_professor", e uma restrição
+-- de exclusão só enxerga uma tabela. Usamos um gatilho que faz a mesma
+-- verificação e devolve o mesmo erro (exclusion_violation).
+CREATE OR REPLACE FUNCTION verificar_choque_professor() RETURNS trigger AS $$
+DECLARE
+  professor varchar(20);
+  choque integer;
+BEGIN
+  IF NEW.dia_semana IS NULL OR NEW.horario_ini IS NULL OR NEW.horario_fim IS NULL THEN
+    RETURN NEW;
+  END IF;
+
+  SELECT matricula_professor INTO professor
+  FROM afinidade_professor WHERE id = NEW.id_afinidade_professor;
+
+  -- Duas transações cadastrando o mesmo professor ao mesmo tempo esperam
+  -- uma pela outra (sem isso, nenhuma veria a oferta da outra)
+  PERFORM pg_advisory_xact_lock(hashtext('oferta_professor:' || professor || ':' || NEW.semestre));
+
+  SELECT os.id INTO choque
+  FROM oferta_semestre os
+  JOIN afinidade_professor ap ON os.id_afinidade_professor = ap.id
+  WHERE ap.matricula_professor = professor
+    AND os.semestre = NEW.semestre
+    AND os.dia_semana = NEW.dia_semana
+    AND os.horario_ini < NEW.horario_fim
+    AND os.horario_fim > NEW.horario_ini
+    AND os.id <> NEW.id
+  LIMIT 1;
+
+  IF choque IS NOT NULL THEN
+    RAISE EXCEPTION 'Professor % já tem a oferta % nesse horário (% % a %).',
+      professor, choque, NEW.dia_semana, NEW.horario_ini, NEW.horario_fim
+      USING ERRCODE = 'exclusion_violation',
+            CONSTRAINT = 'oferta_semestre_professor_sem_choque';
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "oferta_semestre_professor_sem_choque" ON "oferta_semestre";
+CREATE TRIGGER "oferta_semestre_professor_sem_choque"
+  BEFORE INSERT OR UPDATE OF "semestre", "id_afinidade_professor", "dia_semana", "horario_ini", "horario_fim"
+  ON "oferta_semestre"
+  FOR EACH ROW EXECUTE FUNCTION verificar_choque_professor();
+
+COMMIT;